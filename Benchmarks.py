@@ -0,0 +1,629 @@
+import gc
+import json
+import time
+import numpy as np
+from pyo import *
+from Effects import (MAX_VOICES, NoEFF, DistortionEFF, AutoWahEFF, ChordsEFF, SineEFF, BlitEFF, SuperSawEFF, PhasorEFF, RCOscEFF, LFOEff, ReverbEFF, DelayEFF)
+from Glovox import Glovox, MAIN_EFFECTS
+from PitchTracker import PitchTracker, PITCH_METHODS
+
+# BENCHMARKS
+"""Benchmarks of the processing chain. The server runs with the 'manual' audio backend,
+so that buffers are computed one by one on demand, without any audio hardware.
+Run this file to print the results."""
+
+def bootOfflineServer(bufferSize=256, sr=44100):
+	""" Function to boot and start a server whose buffers are computed by calling process() """
+	server = Server(sr=sr, nchnls=1, buffersize=bufferSize, duplex=0, audio='manual')
+	server.boot()
+	server.start()
+	return server
+
+def timeBuffers(server, buffers, clock=time.perf_counter):
+	""" Function to get the mean time, in seconds, needed to compute one buffer. By default it is wall time,
+	pass clock=time.thread_time to get the CPU time of the thread computing the buffers (as the load meter of Glovox) """
+	start = clock()
+	for i in range(buffers):
+		server.process()
+	return (clock() - start) / buffers
+
+def referenceVoice():
+	""" Function to get a signal roughly resembling a sung note, used in place of the microphone """
+	return Sine(freq=220, mul=0.3) * Sine(freq=3, mul=0.5, add=0.5)
+
+def buildAllPedals(cleanS):
+	""" Function to build every effect, as Glovox did at startup before the lazy registry """
+	gated = Gate(cleanS, thresh=-40, outputAmp=True)
+	freq = Yin(cleanS, cutoff=3000)
+	return [gated, freq, NoEFF(cleanS), DistortionEFF(cleanS), AutoWahEFF(cleanS), ChordsEFF(cleanS),
+			SineEFF(gated, freq), BlitEFF(gated, freq), SuperSawEFF(gated, freq), PhasorEFF(gated, freq),
+			RCOscEFF(gated, freq), LFOEff(gated, freq), ReverbEFF(cleanS), DelayEFF(cleanS)]
+
+def benchLazyGraph(buffers=4000, bufferSize=256):
+	""" Function to compare the cost of a buffer when every effect is built (eager)
+	and when only the audible one is built (lazy) """
+	server = bootOfflineServer(bufferSize)
+	voice = referenceVoice()
+
+	pedals = buildAllPedals(voice)
+	pedals[3].enable()
+	eager = timeBuffers(server, buffers)
+	del pedals
+	gc.collect()
+
+	distortion = DistortionEFF(voice)
+	distortion.enable()
+	lazy = timeBuffers(server, buffers)
+	del distortion
+
+	server.stop()
+	server.shutdown()
+
+	deadline = bufferSize / 44100
+	print('Per-buffer cost (%d samples, deadline %.3f ms)' % (bufferSize, deadline * 1000))
+	print('  eager: %.4f ms (%.1f%% of deadline)' % (eager * 1000, eager / deadline * 100))
+	print('  lazy:  %.4f ms (%.1f%% of deadline)' % (lazy * 1000, lazy / deadline * 100))
+	return {'eager': eager, 'lazy': lazy}
+
+class SwitchProbe():
+	""" Block listener switching the main effect of the model every few blocks, from the callback as MIDI does,
+		and counting the blocks from each switch until the output of the model is the new effect alone.
+
+		Attributes:
+			model       reference to the model
+			names       main effects switched to, in turn
+			spacing     blocks between the end of a switch and the next switch
+			taps        blocks of the output of the model and of the active effect
+			writers     TableFill objects filling taps
+			output      numpy view on the block of the output
+			effect      numpy view on the block of the active effect
+			previous    block of the active effect before the last one, the mixer may read its inputs one block late
+			callTimes   time taken by each switchTo call, in seconds
+			latencies   blocks needed by each switch
+			switches    number of switches to make
+			switching   True until the output is the new effect alone
+			wait        blocks left before the next switch
+	"""
+	def __init__(self, model, names, switches, spacing=8):
+		""" Init Method """
+		self.model = model
+		self.names = names
+		self.spacing = spacing
+		size = model.server.getBufferSize()
+		self.taps = [DataTable(size=size), DataTable(size=size)]
+		self.writers = [TableFill(model.mixer[0], self.taps[0]), TableFill(model.getActive().getSignal(), self.taps[1])]
+		self.output, self.effect = [np.asarray(tap.getBuffer()) for tap in self.taps]
+		self.previous = np.zeros(size, dtype=self.effect.dtype)
+		self.callTimes = []
+		self.latencies = []
+		self.switches = switches
+		self.switching = False
+		self.wait = spacing
+
+	def processBlock(self, start):
+		""" Method called by the callback of the model after every block """
+		if self.switching:
+			self.latencies[-1] += 1
+			if np.allclose(self.output, self.effect, atol=1e-6) or np.allclose(self.output, self.previous, atol=1e-6):
+				self.switching = False
+				self.wait = self.spacing
+		elif self.wait > 0:
+			self.wait -= 1
+		elif len(self.latencies) < self.switches:
+			name = self.names[len(self.latencies) % len(self.names)]
+			begin = time.perf_counter()
+			self.model.switchTo(name)
+			self.callTimes.append(time.perf_counter() - begin)
+			self.writers[1].setInput(self.model.getActive().getSignal(), 0)
+			self.latencies.append(0)
+			self.switching = True
+		self.previous[:] = self.effect
+
+def benchSwitchLatency(switches=100, fadeSamples=256, bufferSize=256, sr=44100):
+	""" Function to measure the switch between two main effects: the time taken by switchTo and the number of buffers
+	from the switch until the output is the new effect alone (the end of the crossfade). A sung note is rendered
+	offline, the switches being made from the callback. The effects are staged first, as the GUI and MIDI do.
+	The count includes the block the mixer lags behind the effects, and the callback at which the probe sees
+	the last block: a crossfade of one buffer counts 3 buffers """
+	import os
+	import tempfile
+
+	names = [name for name, label in MAIN_EFFECTS]
+	spacing = 8
+	seconds = (switches + 1) * (spacing + fadeSamples // bufferSize + 4) * bufferSize / sr
+	folder = tempfile.mkdtemp()
+	infile = os.path.join(folder, 'note.wav')
+	writeMelody(infile, [(220, seconds)], sr)
+	model = Glovox(mode='offline', infile=infile, outfile=os.path.join(folder, 'out.wav'), bufferSize=bufferSize,
+				   fadeSamples=fadeSamples)
+	for name in names:
+		model.stageEffect(name)
+	probe = SwitchProbe(model, names[1:] + names[:1], switches, spacing)
+	model.addBlockListener(probe)
+	model.render()
+	model.removeBlockListener(probe)
+	model.close()
+	model.server.shutdown()
+
+	callTimes = probe.callTimes
+	latencies = probe.latencies
+	print('Switch latency (%d samples crossfade, %d samples buffers, %d switches)' % (fadeSamples, bufferSize, len(latencies)))
+	print('  switchTo call: mean %.3f ms, max %.3f ms' % (sum(callTimes) / len(callTimes) * 1000, max(callTimes) * 1000))
+	print('  buffers until the output is the new effect alone: min %d, max %d' % (min(latencies), max(latencies)))
+	return {'callTimes': callTimes, 'latencies': latencies}
+
+def benchWaveformFrame(sizes=(256, 512, 1024, 2048, 4096, 8192), frames=300):
+	""" Function to measure the time needed by WaveformWidget to get a frame and paint it, for several waveform sizes.
+	Set QT_QPA_PLATFORM=offscreen to run it without a display """
+	from PyQt5.QtGui import QImage
+	from PyQt5.QtWidgets import QApplication
+	from MyWidgets import WaveformWidget
+
+	app = QApplication.instance() or QApplication([])
+	results = {}
+	print('Waveform frame time (1000x350 pixels)')
+	for size in sizes:
+		model = Glovox(audio='manual', waveformSize=size)
+		for i in range(size // model.server.getBufferSize() + 1):
+			model.server.process()
+
+		widget = WaveformWidget(model)
+		widget.timer.stop()
+		widget.resize(1000, 350)
+		image = QImage(widget.size(), QImage.Format_RGB32)
+
+		start = time.perf_counter()
+		for i in range(frames):
+			widget.handleNewData()
+			widget.render(image)
+		results[size] = (time.perf_counter() - start) / frames
+
+		del widget
+		model.close()
+		model.server.shutdown()
+		print('  %5d samples: %.3f ms' % (size, results[size] * 1000))
+	return results
+
+def benchSpectrum(sizes=(1024, 2048, 4096, 8192), frames=1000):
+	""" Function to measure the time needed by SpectrumAnalyzer to compute one spectrum, with log binning """
+	from Spectrum import SpectrumAnalyzer
+
+	model = Glovox(audio='manual')
+	for i in range(model.getWaveformSize() // model.server.getBufferSize() + 1):
+		model.server.process()
+
+	results = {}
+	print('Spectrum frame time (128 log bands)')
+	for size in sizes:
+		analyzer = SpectrumAnalyzer(model, size=size, logBands=128)
+		start = time.perf_counter()
+		for i in range(frames):
+			analyzer.compute()
+		results[size] = (time.perf_counter() - start) / frames
+		print('  %5d points: %.3f ms' % (size, results[size] * 1000))
+
+	model.close()
+	model.server.shutdown()
+	return results
+
+def firstOnset(samples, threshold=0.05):
+	""" Function to get the index of the first sample whose absolute value reaches threshold """
+	above = np.nonzero(np.abs(samples) >= threshold)[0]
+	return above[0] if len(above) else None
+
+def benchHarmonizerTopology(buffers=4000, bufferSize=256, sr=44100):
+	""" Function to compare the cascaded Harmonizer voices used before and the parallel ones of ChordsEFF.
+	It measures the cost of a buffer and the latency of the last note of the chord, aligning the onset of
+	a tone burst at the input and at the output """
+	server = bootOfflineServer(bufferSize, sr)
+	# silence, then a burst starting at 0.1 seconds
+	envelope = Linseg([(0, 0), (0.1, 0), (0.1 + 1. / sr, 0.5), (2, 0.5)]).play()
+	burst = Sine(freq=220, mul=envelope)
+	length = int(0.5 * sr)
+
+	def render(signals):
+		tables = [NewTable(length=length / sr) for signal in signals]
+		recorders = [TableRec(signal, table).play() for signal, table in zip(signals, tables)]
+		for i in range(length // bufferSize + 1):
+			server.process()
+		return [np.asarray(table.getTable()) for table in tables]
+
+	results = {}
+	for topology in ('cascaded', 'parallel'):
+		if topology == 'cascaded':
+			graph = [Harmonizer(burst, transpo=4)]
+			graph.append(Harmonizer(graph[0], transpo=3))
+			graph.append(Harmonizer(graph[1], transpo=5))
+			graph.append(burst + graph[0] + graph[1] + graph[2])
+			lastNote = graph[2]
+		else:
+			graph = [Harmonizer(burst, transpo=[4, 7, 12])]
+			graph.append(burst + Mix(graph[0], voices=1))
+			lastNote = Mix([graph[0][2]], voices=1)
+
+		# dry and wet are recorded in the same pass, starting from silence
+		envelope.play()
+		dry, wet = render([burst, lastNote])
+		latency = (firstOnset(wet) - firstOnset(dry)) / sr
+		cost = timeBuffers(server, buffers)
+		results[topology] = {'cost': cost, 'latency': latency}
+		del graph, lastNote
+		gc.collect()
+
+	server.stop()
+	server.shutdown()
+
+	print('Harmonizer topologies (major chord)')
+	for topology, result in results.items():
+		print('  %s: %.4f ms per buffer, last note latency %.1f ms' % (topology, result['cost'] * 1000, result['latency'] * 1000))
+	return results
+
+def benchHarmonizerVoices(buffers=2000, bufferSize=256):
+	""" Function to measure the cost of a buffer of the Harmonizer effect for 1 to MAX_VOICES voices """
+	server = bootOfflineServer(bufferSize)
+	chords = ChordsEFF(referenceVoice())
+	chords.enable()
+
+	results = {}
+	print('Harmonizer cost per number of voices')
+	for voices in range(1, MAX_VOICES + 1):
+		chords.setIntervals([3 * (i + 1) for i in range(voices)])
+		results[voices] = timeBuffers(server, buffers)
+		print('  %d voices: %.4f ms per buffer' % (voices, results[voices] * 1000))
+
+	del chords
+	server.stop()
+	server.shutdown()
+	return results
+
+def benchChain(buffers=4000):
+	""" Function to measure the cost of a buffer of the chain Distortion -> Auto-Wah -> Delay -> Reverb,
+	then with Auto-Wah and Delay bypassed, and the cost of reordering the chain """
+	model = Glovox(audio='manual')
+	chain = ['distortion', 'wah', 'delay', 'reverb']
+	model.setChain(chain)
+	model.switchToChain()
+	for i in range(100):
+		model.server.process()
+	full = timeBuffers(model.server, buffers)
+
+	model.setChainBypass('wah', True)
+	model.setChainBypass('delay', True)
+	# the bypassed stages are paused once they have faded out
+	for i in range(100):
+		model.server.process()
+	bypassed = timeBuffers(model.server, buffers)
+
+	start = time.perf_counter()
+	model.setChain(['reverb', 'delay', 'wah', 'distortion'])
+	reorder = time.perf_counter() - start
+
+	model.close()
+	model.server.shutdown()
+
+	print('Chain %s' % ' -> '.join(chain))
+	print('  all stages: %.4f ms per buffer' % (full * 1000))
+	print('  wah and delay bypassed: %.4f ms per buffer' % (bypassed * 1000))
+	print('  reordering: %.3f ms' % (reorder * 1000))
+	return {'full': full, 'bypassed': bypassed, 'reorder': reorder}
+
+def benchParamUpdates(buffers=2000, ticksPerBuffer=20):
+	""" Function to compare the cost of slider ticks written directly to the Disto object, through the raw pyo setter
+	(as before the parameters were smoothed), and coalesced by setParam, written once per buffer by the callback """
+	model = Glovox(audio='manual')
+	model.switchToDistortion()
+	distortion = model.getDistortion()
+	results = {}
+	for mode in ('direct', 'coalesced'):
+		start = time.perf_counter()
+		for i in range(buffers):
+			for tick in range(ticksPerBuffer):
+				drive = (i * ticksPerBuffer + tick) % 1000 / 1000
+				if mode == 'direct':
+					distortion.dist.setDrive(drive)
+				else:
+					model.setParam('distortion', 'drive', drive)
+			model.server.process()
+		results[mode] = (time.perf_counter() - start) / buffers
+		# the raw setter replaced the smoothed drive
+		distortion.dist.setDrive(distortion.params['drive'].signal)
+
+	model.close()
+	model.server.shutdown()
+
+	print('Parameter updates (%d slider ticks per buffer)' % ticksPerBuffer)
+	for mode, cost in results.items():
+		print('  %s: %.4f ms per buffer' % (mode, cost * 1000))
+	return results
+
+def benchPresetRecall(recalls=200):
+	""" Function to measure the time needed by recallPreset (staging) and by the callback applying the preset """
+	model = Glovox(audio='manual')
+	model.switchToDistortion()
+	model.getDistortion().setDrive(0.3)
+	model.enableReverb()
+	model.getReverb().setRevTime(3.0)
+	distortion = model.getPreset()
+	model.switchToChords()
+	model.getChords().setChord('Minor 7th')
+	chords = model.getPreset()
+	model.server.process()
+
+	callTimes = []
+	bufferTimes = []
+	for i in range(recalls):
+		preset = distortion if i % 2 == 0 else chords
+		start = time.perf_counter()
+		model.recallPreset(preset)
+		callTimes.append(time.perf_counter() - start)
+		start = time.perf_counter()
+		model.server.process()
+		bufferTimes.append(time.perf_counter() - start)
+
+	model.close()
+	model.server.shutdown()
+
+	print('Preset recall (%d recalls)' % recalls)
+	print('  recallPreset call: mean %.3f ms, max %.3f ms' % (sum(callTimes) / recalls * 1000, max(callTimes) * 1000))
+	print('  buffer applying it: mean %.3f ms, max %.3f ms' % (sum(bufferTimes) / recalls * 1000, max(bufferTimes) * 1000))
+	return {'callTimes': callTimes, 'bufferTimes': bufferTimes}
+
+def benchMidi(messages=1000):
+	""" Function to measure the time needed to handle an injected MIDI message, Program Change or Control Change """
+	from Midi import MidiControl
+
+	model = Glovox(audio='manual')
+	midi = MidiControl(model, listen=False)
+	names = [name for name, label in MAIN_EFFECTS]
+	handleTimes = []
+	for i in range(messages):
+		start = time.perf_counter()
+		if i % 2 == 0:
+			midi.programChange((i // 2) % len(names))
+		else:
+			midi.controlChange(1, i % 128)
+		handleTimes.append(time.perf_counter() - start)
+		# the first message for an effect builds it in the stager thread
+		midi.waitStaged()
+		model.server.process()
+
+	midi.stop()
+	model.close()
+	model.server.shutdown()
+
+	print('MIDI messages (%d injected)' % messages)
+	print('  handling: mean %.4f ms, max %.4f ms' % (sum(handleTimes) / messages * 1000, max(handleTimes) * 1000))
+	return {'handleTimes': handleTimes}
+
+def benchPitchTracker(rates=(0.005, 0.01, 0.03), seconds=2, bufferSize=256, sr=44100):
+	""" Function to compare the pitch detectors and analysis rates: cost of a buffer, error and jitter (in cents)
+	of the pitch of a 220 Hz voice with harmonics, and time needed to lock onto it after its onset """
+	server = bootOfflineServer(bufferSize, sr)
+	envelope = Linseg([(0, 0), (0.1, 0), (0.1 + 1. / sr, 0.3), (seconds, 0.3)])
+	# a fundamental and its octave, the usual cause of octave errors
+	voice = Sine(freq=220, mul=envelope) + Sine(freq=440, mul=envelope * 0.6)
+	buffers = int(seconds * sr / bufferSize)
+
+	results = {}
+	print('Pitch tracker (220 Hz voice, %d samples buffers)' % bufferSize)
+	for method in PITCH_METHODS:
+		for rate in rates:
+			tracker = PitchTracker(voice, method=method, rate=rate)
+			tracker.play()
+			envelope.play()
+			pitches = np.zeros(buffers)
+			start = time.perf_counter()
+			for i in range(buffers):
+				server.process()
+				pitches[i] = tracker.get()
+			cost = (time.perf_counter() - start) / buffers
+
+			onset = int(0.1 * sr / bufferSize)
+			locked = np.nonzero(np.abs(1200 * np.log2(np.maximum(pitches[onset:], 1) / 220)) < 50)[0]
+			lockTime = locked[0] * bufferSize / sr if len(locked) else None
+			cents = 1200 * np.log2(np.maximum(pitches[buffers // 2:], 1) / 220)
+			results[(method, rate)] = {'cost': cost, 'error': float(np.median(np.abs(cents))),
+									   'jitter': float(np.std(cents)), 'lockTime': lockTime}
+			print('  %-14s every %4.1f ms: %.4f ms per buffer, error %.1f cents, jitter %.1f cents, lock %s' %
+				  (method, rate * 1000, cost * 1000, results[(method, rate)]['error'], results[(method, rate)]['jitter'],
+				   '%.1f ms' % (lockTime * 1000) if lockTime is not None else 'never'))
+			tracker.stop()
+			del tracker
+			gc.collect()
+
+	server.stop()
+	server.shutdown()
+	return results
+
+def writeMelody(path, notes, sr=44100):
+	""" Function to write a mono 16 bits WAV file of sine notes, notes being (frequency in Hz, duration in seconds),
+	a frequency of 0 being a silence. The notes follow one another without any gap """
+	import wave
+	chunks = []
+	phase = 0.0
+	for freq, duration in notes:
+		n = int(duration * sr)
+		phases = phase + 2 * np.pi * freq * np.arange(n) / sr
+		chunks.append(0.3 * np.sin(phases) if freq > 0 else np.zeros(n))
+		phase = (phase + 2 * np.pi * freq * n / sr) % (2 * np.pi)
+	samples = (np.concatenate(chunks) * 32767).astype('<i2')
+	with wave.open(path, 'wb') as melody:
+		melody.setnchannels(1)
+		melody.setsampwidth(2)
+		melody.setframerate(sr)
+		melody.writeframes(samples.tobytes())
+
+def benchVoicePool(counts=(0, 1, 2, 4, 8), sizes=(8, 32), buffers=2000):
+	""" Function to measure the cost of a buffer of the Poly Synth with a given number of held voices,
+	for several pool sizes: the cost should follow the voices heard, not the size of the pool """
+	from PolySynth import PolySynthEFF
+
+	model = Glovox(audio='manual')
+	results = {}
+	print('Poly Synth voices (%d buffers)' % buffers)
+	for size in sizes:
+		poly = PolySynthEFF(model, size=size)
+		poly.disable()
+		poly.enable()
+		poly.setIntervals([0])
+		for count in counts:
+			for note in range(count):
+				poly.noteOn(model.samples, 48 + note, 100)
+			timeBuffers(model.server, 10)
+			results[(size, count)] = timeBuffers(model.server, buffers)
+			print('  pool of %2d, %d voices held: %.4f ms per buffer' % (size, count, results[(size, count)] * 1000))
+			poly.setMode('latch')
+			poly.setMode('interval')
+			# release over, every voice is stopped
+			timeBuffers(model.server, int(poly.getRelease() * model.server.getSamplingRate() / model.server.getBufferSize()) + 2)
+		poly.disable()
+		del poly
+		gc.collect()
+
+	model.close()
+	model.server.shutdown()
+	return results
+
+def benchConvolutionReverb(lengths=(0.5, 1, 2, 5), seconds=5, bufferSize=256, sr=44100):
+	""" Function to measure the CPU time needed to render one second through the convolution reverb, for impulse
+	responses of several lengths (exponentially decaying noise), against the STRev of the Reverb.
+	The buffers are computed in this thread, so its CPU time doesn't count the time the process is descheduled.
+	It also reports the wall time needed to load each impulse response (disk included), the first time and from the cache """
+	import os
+	import tempfile
+	from ConvolutionReverb import ConvolutionReverbEFF
+
+	folder = tempfile.mkdtemp()
+	cacheDir = os.path.join(folder, 'cache')
+	server = bootOfflineServer(bufferSize, sr)
+	voice = referenceVoice()
+	buffers = int(seconds * sr / bufferSize)
+	noise = np.random.RandomState(0)
+
+	results = {}
+	print('Convolution reverb (%d samples buffers, CPU time per rendered second)' % bufferSize)
+	reverb = ReverbEFF(voice)
+	reverb.enable(voice)
+	timeBuffers(server, 10)
+	results['STRev'] = timeBuffers(server, buffers, time.thread_time) * buffers / seconds
+	print('  %-14s %.2f ms' % ('STRev', results['STRev'] * 1000))
+	reverb.disable()
+	del reverb
+	gc.collect()
+
+	for length in lengths:
+		n = int(length * sr)
+		# -60 dB at the end of the impulse response
+		impulse = noise.randn(n) * np.exp(-6.9 * np.arange(n) / n)
+		path = os.path.join(folder, 'impulse-%g.wav' % length)
+		savefile((0.5 * impulse / np.max(np.abs(impulse))).tolist(), path, sr=sr, channels=1, fileformat=0, sampletype=3)
+
+		loads = []
+		for i in range(2):
+			start = time.perf_counter()
+			reverb = ConvolutionReverbEFF(voice, path, size=bufferSize, cacheDir=cacheDir)
+			loads.append(time.perf_counter() - start)
+			if i == 0:
+				reverb.disable()
+				del reverb
+		reverb.enable(voice)
+		timeBuffers(server, 10)
+		cost = timeBuffers(server, buffers, time.thread_time) * buffers / seconds
+		results[length] = {'timePerSecond': cost, 'firstLoad': loads[0], 'cachedLoad': loads[1]}
+		print('  IR of %4.1f s   %.2f ms, loaded in %.1f ms, %.1f ms from the cache' %
+			  (length, cost * 1000, loads[0] * 1000, loads[1] * 1000))
+		reverb.disable()
+		del reverb
+		gc.collect()
+
+	server.stop()
+	server.shutdown()
+	return results
+
+# parameter settings profiled for each effect: (setting, function applying it to the effect)
+EFFECT_SETTINGS = {
+	'DistortionEFF': [('drive %.2f' % drive, lambda effect, drive=drive: effect.setDrive(drive)) for drive in (0.25, 0.75, 0.99)],
+	'AutoWahEFF': [('default', lambda effect: None)],
+	'ChordsEFF': [(chord, lambda effect, chord=chord: effect.setChord(chord)) for chord in ('Major', 'Major 7th')] +
+				 [('scale Major', lambda effect: effect.setScale(0, 'Major'))],
+	'SineEFF': [('default', lambda effect: None)],
+	'BlitEFF': [('harms %d' % harms, lambda effect, harms=harms: effect.setHarms(harms)) for harms in (1, 10, 40, 100)],
+	'SuperSawEFF': [('detune %.2f' % detune, lambda effect, detune=detune: effect.setDetune(detune)) for detune in (0.0, 0.5, 1.0)],
+	'PhasorEFF': [('default', lambda effect: None)],
+	'RCOscEFF': [('sharp %.2f' % sharp, lambda effect, sharp=sharp: effect.setSharp(sharp)) for sharp in (0.0, 0.5, 1.0)],
+	'LFOEff': [('saw up', lambda effect: effect.setSawUp()), ('modulated sine', lambda effect: effect.setModSine())],
+	'ReverbEFF': [('revtime %.1f' % revTime, lambda effect, revTime=revTime: effect.setRevTime(revTime)) for revTime in (1.0, 5.0)],
+	'DelayEFF': [('feedback %.1f' % feedback, lambda effect, feedback=feedback: effect.setFeedback(feedback)) for feedback in (0.0, 0.8)],
+}
+
+def buildEffect(name, cleanS, gated, freq):
+	""" Function to build an effect by class name and start it as Glovox does """
+	effectClass = globals()[name]
+	if name in ('ReverbEFF', 'DelayEFF'):
+		effect = effectClass(cleanS)
+		effect.enable(cleanS)
+	elif name == 'ChordsEFF':
+		effect = effectClass(cleanS, freq)
+		effect.enable()
+	elif name in ('SineEFF', 'BlitEFF', 'SuperSawEFF', 'PhasorEFF', 'RCOscEFF', 'LFOEff'):
+		effect = effectClass(gated, freq)
+		effect.enable()
+	else:
+		effect = effectClass(cleanS)
+		effect.enable()
+	return effect
+
+def profileEffects(seconds=10, bufferSizes=(64, 256, 1024), sr=44100, voiceFile=None, outfile='effects_profile.json'):
+	""" Function to measure, for each effect of Effects.py and each setting of EFFECT_SETTINGS, the wall time needed
+	to render one second of a reference vocal, for several buffer sizes. voiceFile is looped as the vocal,
+	referenceVoice is used if it isn't given. The results are written as JSON into outfile, to compare commits """
+	results = []
+	for bufferSize in bufferSizes:
+		server = bootOfflineServer(bufferSize, sr)
+		voice = SfPlayer(voiceFile, loop=True).mix(1) if voiceFile else referenceVoice()
+		gated = Gate(voice, thresh=-40, outputAmp=True)
+		freq = Yin(voice, cutoff=3000)
+		buffers = int(seconds * sr / bufferSize)
+
+		# cost of the input and of the pitch tracking alone, every effect below includes it
+		baseline = timeBuffers(server, buffers) * buffers / seconds
+		results.append({'effect': None, 'setting': 'baseline', 'bufferSize': bufferSize, 'timePerSecond': baseline})
+
+		for name, settings in EFFECT_SETTINGS.items():
+			effect = buildEffect(name, voice, gated, freq)
+			for setting, apply in settings:
+				apply(effect)
+				timeBuffers(server, 10)
+				cost = timeBuffers(server, buffers) * buffers / seconds
+				results.append({'effect': name, 'setting': setting, 'bufferSize': bufferSize, 'timePerSecond': cost})
+			effect.disable()
+			del effect
+			gc.collect()
+
+		del voice, gated, freq
+		server.stop()
+		server.shutdown()
+
+	print('Effect cost, wall time per rendered second (%d s of vocal)' % seconds)
+	for result in results:
+		print('  %-12s %-16s %5d samples: %.2f ms' % (result['effect'] or '', result['setting'], result['bufferSize'],
+													   result['timePerSecond'] * 1000))
+	with open(outfile, 'w') as profile:
+		json.dump({'seconds': seconds, 'sr': sr, 'voiceFile': voiceFile, 'results': results}, profile, indent=1)
+	return results
+
+if __name__ == '__main__':
+	benchLazyGraph()
+	benchSwitchLatency()
+	benchWaveformFrame()
+	benchSpectrum()
+	benchHarmonizerTopology()
+	benchHarmonizerVoices()
+	benchChain()
+	benchParamUpdates()
+	benchPresetRecall()
+	benchMidi()
+	benchPitchTracker()
+	benchVoicePool()
+	benchConvolutionReverb()
+	profileEffects()
@@ -0,0 +1,200 @@
+from pyo import *
+from Effects import Effect, SMOOTH_TIME
+import numpy as np
+import hashlib
+import os
+
+def resample(samples, ratio):
+	""" Function to resample a signal by ratio (new rate / old rate), band-limited through its spectrum """
+	n = max(1, int(round(len(samples) * ratio)))
+	if n == len(samples):
+		return samples
+	return np.fft.irfft(np.fft.rfft(samples), n) * (n / len(samples))
+
+def prepareImpulse(path, sr, size, cacheDir='ir_cache', maxLength=10.0, floor=-60):
+	""" Function to get the impulse response read from path as CvlVerb needs it: mono, at the sampling rate sr
+	of the server, without the tail quieter than floor dB below its peak, at most maxLength seconds long,
+	and normalised to unit energy, so that the reverb is about as loud as its input.
+	The result is cached as a WAV file in cacheDir, named after the content of the file, sr and size:
+	loading the same impulse again only reads the cached file. It returns the path of the cached file """
+	with open(path, 'rb') as impulseFile:
+		digest = hashlib.sha1(impulseFile.read()).hexdigest()[:16]
+	cached = os.path.join(cacheDir, '%s-%d-%d-%g.wav' % (digest, sr, size, maxLength))
+	if os.path.exists(cached):
+		return cached
+
+	info = sndinfo(path)
+	channels = [np.asarray(SndTable(path, chnl=chnl).getTable()) for chnl in range(info[3])]
+	samples = resample(np.mean(channels, axis=0), sr / info[2])
+	peak = np.max(np.abs(samples))
+	if peak > 0:
+		audible = np.flatnonzero(np.abs(samples) > peak * 10 ** (floor / 20.))
+		samples = samples[:audible[-1] + 1]
+	samples = samples[:int(maxLength * sr)]
+	energy = np.sqrt(np.sum(samples ** 2))
+	if energy > 0:
+		samples = samples / energy
+
+	os.makedirs(cacheDir, exist_ok=True)
+	# written under another name first, so that an interrupted write is never taken for a cached impulse
+	temporary = cached + '.tmp'
+	savefile(samples.astype(np.float32).tolist(), temporary, sr=sr, channels=1, fileformat=0, sampletype=3)
+	os.replace(temporary, cached)
+	return cached
+
+class ConvolutionReverbEFF(Effect):
+	""" Class that implements the Convolution Reverb effect, an alternative to the Reverb using a recorded room.
+		The input is convolved with an impulse response read from a sound file, with a uniformly partitioned
+		FFT convolution (CvlVerb): the partitions are one block long, so that the latency is one block
+		while long impulse responses stay affordable. The impulse response is prepared once and cached
+		(see prepareImpulse). It has the same enable, setInput and getSignal methods as the Reverb,
+		so that it can be enabled on the active effect or used as a stage of a chain.
+
+		Attributes:
+			source     input of the reverb
+			impulse    path of the impulse response
+			size       length of the partitions, in samples, a power of 2
+			cacheDir   folder of the prepared impulse responses
+			wet        input convolved with the impulse response
+			previous   convolution replaced by setImpulse, stopped and dropped at the end of the crossfade
+			dropper    call stopping previous at the end of the crossfade
+			staged     (impulse, convolution, dropper) built paused by stageImpulse for the next setImpulse, None if there is none
+			filtered   wet signal low-passed at cutoff
+			reverb     reverb effect signal, a mix of the input and of the filtered wet signal
+	"""
+	DISCRETE_PARAMS = ('impulse',)
+
+	def __init__(self, cleanS, impulse, size = 256, cacheDir = 'ir_cache'):
+		""" Init Methdod """
+		super().__init__()
+		# CvlVerb needs a power of 2
+		self.size = 1 << max(0, int(size - 1).bit_length())
+		self.cacheDir = cacheDir
+		self.impulse = impulse
+		self.source = InputFader(cleanS)
+		self.wet = self.convolve(impulse)
+		self.previous = None
+		self.dropper = None
+		self.staged = None
+		self.filtered = Tone(self.wet, freq = self.addParam('cutoff', 5000))
+		self.reverb = Interp(self.source, self.filtered, interp = self.addParam('bal', 0.5))
+
+	def convolve(self, impulse):
+		""" Method to create the convolution of the input with an impulse response """
+		sr = self.source.getSamplingRate()
+		return CvlVerb(self.source, prepareImpulse(impulse, sr, self.size, self.cacheDir), size = self.size, bal = 1)
+
+	def stageImpulse(self, impulse):
+		""" Method to prepare an impulse response and to build its convolution, paused, so that setImpulse only swaps it in.
+		It reads and may write files: it must not run in the callback (see Glovox.stagePreset) """
+		if impulse == self.impulse or (self.staged is not None and self.staged[0] == impulse):
+			return
+		wet = self.convolve(impulse)
+		wet.stop()
+		# one block more than the crossfade, the timer may already have run for a block when it is stopped
+		dropper = CallAfter(self.dropPrevious, time = SMOOTH_TIME + self.size / self.source.getSamplingRate())
+		dropper.stop()
+		self.staged = (impulse, wet, dropper)
+
+	def isImpulseStaged(self, impulse):
+		""" Method to get if setImpulse(impulse) would only swap a convolution in """
+		return impulse == self.impulse or (self.staged is not None and self.staged[0] == impulse)
+
+	def setImpulse(self, impulse):
+		""" Method to set the impulse response, the path of a sound file. The new reverb crossfades with the previous one,
+		which is stopped at the end of the crossfade. An impulse response staged by stageImpulse is only swapped in """
+		# a preset recalling the same impulse response must not rebuild the convolution
+		if impulse == self.impulse:
+			return
+		self.stageImpulse(impulse)
+		impulse, wet, dropper = self.staged
+		self.staged = None
+		if self.reverb.isPlaying():
+			wet.play()
+		# a crossfade still running is cut short
+		if self.previous is not None:
+			self.previous.stop()
+		self.impulse = impulse
+		self.previous = self.wet
+		self.wet = wet
+		self.filtered.setInput(wet, SMOOTH_TIME)
+		self.dropper = dropper
+		dropper.play()
+
+	def dropPrevious(self):
+		""" Method called at the end of the crossfade of setImpulse, to stop and drop the convolution replaced """
+		if self.previous is not None:
+			self.previous.stop()
+			self.previous = None
+
+	def stage(self, name, value):
+		""" Method to prepare a parameter before it is set from the callback, the impulse response is built ahead """
+		if name == 'impulse':
+			self.stageImpulse(value)
+
+	def isStaged(self, name, value):
+		""" Method to get if setting a parameter from the callback creates no pyo object and reads no file """
+		return name != 'impulse' or self.isImpulseStaged(value)
+
+	def getImpulse(self):
+		""" Method to get the path of the impulse response """
+		return self.impulse
+
+	def setCutoff(self, cutoff):
+		""" Method to set the cutoff frequency of the reverb """
+		self.params['cutoff'].set(cutoff)
+
+	def getCutoff(self):
+		""" Method to get the cutoff frequency of the reverb """
+		return self.params['cutoff'].get()
+
+	def setBal(self, bal):
+		""" Method to set the balance between the input (0) and the reverb (1) """
+		self.params['bal'].set(bal)
+
+	def getBal(self):
+		""" Method to get the balance between the input and the reverb """
+		return self.params['bal'].get()
+
+	def reset(self):
+		""" Method to reset the parameters of Convolution Reverb effect """
+		self.setCutoff(5000)
+		self.setBal(0.5)
+
+	def enable(self, output = None):
+		""" Method to output the Convolution Reverb effect signal applied to output.
+		Without output, the reverb only processes its input, its signal being read by the next stage of a chain """
+		self.playParams()
+		self.source.play()
+		self.wet.play()
+		self.filtered.play()
+		if output is None:
+			self.reverb.play()
+			return
+		self.source.setInput(output)
+		self.reverb.out()
+
+	def disable(self):
+		""" Method to stop outputting the Convolution Reverb effect signal """
+		self.reverb.stop()
+		self.filtered.stop()
+		self.wet.stop()
+		self.dropPrevious()
+		self.source.stop()
+		self.stopParams()
+
+	def isPlaying(self):
+		""" Method to get if the Convolution Reverb effect signal is processing or not """
+		return self.reverb.isPlaying()
+
+	def setInput(self, x, fadetime = 0.05):
+		""" Method to set Convolution Reverb input, crossfading over fadetime seconds """
+		self.source.setInput(x, fadetime)
+
+	def getSignal(self):
+		""" Method to get the Convolution Reverb effect signal """
+		return self.reverb
+
+	def getSendSignal(self):
+		""" Method to get the signal output by the Convolution Reverb when it is enabled on the active effect """
+		return self.reverb
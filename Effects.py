@@ -1,37 +1,140 @@
 from pyo import *
+import math
 
 #EFFECTS
 """Each effect has the related signal as attribute, getter and setter methods for each effect's parameters, 
-enabling, disabling and resetting method. A description of each effect can be found in effects.json file."""
-
-class NoEFF():
+enabling, disabling and resetting method. A description of each effect can be found in effects.json file.
+Enabling a main effect only starts its processing: Glovox mixes the signal of the active effect into its output stage.
+Reverb and Delay are sends, their enable method outputs them directly.
+Effects processing a signal can be rewired with setInput, so that they can be chained in series (see Pedalboard);
+the synth effects generate their signal from the pitch of the input and have no input to rewire.
+Every parameter can be set by name with set(name, value); the continuous ones glide to their new value."""
+
+# time, in seconds, taken by a continuous parameter to glide to a new value
+SMOOTH_TIME = 0.05
+
+class Parameter():
+	""" Continuous parameter of an effect. The pyo objects of the effect read its signal instead of a float,
+		so that a new value glides over SMOOTH_TIME seconds instead of jumping (zipper noise).
+
+		Attributes:
+			value     last value set, the one the signal is gliding to
+			signal    smoothed value
+	"""
+	def __init__(self, value, time = SMOOTH_TIME):
+		""" Init Methdod """
+		self.value = value
+		self.signal = SigTo(value, time = time, init = value)
+
+	def set(self, value):
+		""" Method to set the value the signal glides to """
+		self.value = value
+		self.signal.setValue(value)
+
+	def get(self):
+		""" Method to get the last value set """
+		return self.value
+
+	def setTime(self, time):
+		""" Method to set the time, in seconds, taken by the signal to glide to a new value """
+		self.signal.setTime(time)
+
+class Effect():
+	""" Base class of the effects, it gives a uniform access to their parameters:
+		set('drive', 0.5) calls setDrive(0.5) and get('drive') calls getDrive().
+		The continuous parameters are kept in params, they are started and stopped with the effect;
+		the discrete ones (e.g. a waveform or a chord) are listed in DISCRETE_PARAMS.
+
+		Attributes:
+			params     continuous parameters, keyed by name
+	"""
+	DISCRETE_PARAMS = ()
+
+	def __init__(self):
+		""" Init Methdod """
+		self.params = {}
+
+	def addParam(self, name, value):
+		""" Method to create a continuous parameter, it returns the signal to give to the pyo objects """
+		self.params[name] = Parameter(value)
+		return self.params[name].signal
+
+	def accessor(self, prefix, name):
+		""" Method to get the setter or the getter of a parameter """
+		method = getattr(self, prefix + name[:1].upper() + name[1:], None)
+		if method is None:
+			raise ValueError('%s has no parameter %s' % (type(self).__name__, name))
+		return method
+
+	def set(self, name, value):
+		""" Method to set a parameter by name """
+		self.accessor('set', name)(value)
+
+	def get(self, name):
+		""" Method to get a parameter by name """
+		return self.accessor('get', name)()
+
+	def stage(self, name, value):
+		""" Method to prepare, outside the callback, a parameter whose setter would create pyo objects or read files,
+		so that setting it from the callback only swaps the prepared objects in. Most parameters need nothing """
+		pass
+
+	def isStaged(self, name, value):
+		""" Method to get if setting a parameter to value needs no preparation """
+		return True
+
+	def getParamNames(self):
+		""" Method to get the names of every parameter of the effect """
+		return list(self.params) + list(self.DISCRETE_PARAMS)
+
+	def setSmoothTime(self, time):
+		""" Method to set the time, in seconds, taken by every continuous parameter to glide to a new value """
+		for param in self.params.values():
+			param.setTime(time)
+
+	def playParams(self):
+		""" Method to start the continuous parameters, before the objects reading them """
+		for param in self.params.values():
+			param.signal.play()
+
+	def stopParams(self):
+		""" Method to stop the continuous parameters """
+		for param in self.params.values():
+			param.signal.stop()
+
+class NoEFF(Effect):
 	""" Class that implements the clean signal effect.
         
         Attributes:
-            signal     clean signal
+            signal     clean signal, a unity gain copy of the input so that stopping it doesn't stop the shared input
     """
 
 	def __init__(self, cleanS):
 		""" Init Methdod """
-		self.signal = cleanS
+		super().__init__()
+		self.signal = InputFader(cleanS)
+
+	def setInput(self, x, fadetime=0.05):
+		""" Method to set the signal copied, crossfading over fadetime seconds """
+		self.signal.setInput(x, fadetime)
 
 	def enable(self):
-		""" Method to output the clean signal """
-		self.signal.out()
+		""" Method to start processing the clean signal """
+		self.signal.play()
 
 	def disable(self):
-		""" Method to stop outputting the clean signal """
+		""" Method to stop processing the clean signal """
 		self.signal.stop()
 
-	def isOutputting(self):
-		""" Method to get if the clean signal is outputting or not """
-		return self.signal.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the clean signal is processing or not """
+		return self.signal.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the clean signal """
 		return self.signal
 
-class DistortionEFF():
+class DistortionEFF(Effect):
 	""" Class that implements the distortion effect.
         
         Attributes:
@@ -39,23 +142,28 @@ class DistortionEFF():
     """
 	def __init__(self, cleanS):
 		""" Init Methdod """
-		self.dist = Disto(cleanS, drive = 0.75, slope = 0.5)
+		super().__init__()
+		self.dist = Disto(cleanS, drive = self.addParam('drive', 0.75), slope = self.addParam('slope', 0.5))
 
 	def setDrive(self, drive):
 		""" Method to set Disto's drive """
-		self.dist.setDrive(drive)
+		self.params['drive'].set(drive)
 
 	def getDrive(self):
 		""" Method to get Disto's drive """
-		return self.dist.drive
+		return self.params['drive'].get()
+
+	def setInput(self, x, fadetime=0.05):
+		""" Method to set Disto's input, crossfading over fadetime seconds """
+		self.dist.setInput(x, fadetime)
 
 	def setSlope(self, slope):
 		""" Method to set Disto's slope """
-		self.dist.setSlope(slope)
+		self.params['slope'].set(slope)
 
 	def getSlope(self):
 		""" Method to get Disto's slope """
-		return self.dist.slope
+		return self.params['slope'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of distortion effect """
@@ -63,22 +171,24 @@ class DistortionEFF():
 		self.setSlope(0.5)
 
 	def enable(self):
-		""" Method to output the distortion effect signal """
-		self.dist.out()
+		""" Method to start processing the distortion effect signal """
+		self.playParams()
+		self.dist.play()
 
 	def disable(self):
-		""" Method to stop outputting the distortion effect signal """
+		""" Method to stop processing the distortion effect signal """
 		self.dist.stop()
+		self.stopParams()
 
-	def isOutputting(self):
-		""" Method to get if the distortion effect signal is outputting or not """
-		return self.dist.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the distortion effect signal is processing or not """
+		return self.dist.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the distortion effect signal """
 		return self.dist
 
-class AutoWahEFF():
+class AutoWahEFF(Effect):
 	""" Class that implements the Auto-wah effect.
         
         Attributes:
@@ -86,143 +196,290 @@ class AutoWahEFF():
     """
 	def __init__(self, cleanS):
 		""" Init Methdod """
-		fol = Follower(cleanS, freq=30, mul=4000, add=40)
-		self.wah = Biquad(cleanS, freq=fol, q=5, type=2)
+		super().__init__()
+		self.fol = Follower(cleanS, freq=30, mul=4000, add=40)
+		self.wah = Biquad(cleanS, freq=self.fol, q=5, type=2)
+
+	def setInput(self, x, fadetime=0.05):
+		""" Method to set the input of the filter and of its envelope follower, crossfading over fadetime seconds """
+		self.fol.setInput(x, fadetime)
+		self.wah.setInput(x, fadetime)
 
 	def enable(self):
-		""" Method to output the auto-wah effect signal """
-		self.wah.out()
+		""" Method to start processing the auto-wah effect signal """
+		self.fol.play()
+		self.wah.play()
 
 	def disable(self):
-		""" Method to stop outputting the Autowah effect signal """
+		""" Method to stop processing the Autowah effect signal and its envelope follower """
 		self.wah.stop()
+		self.fol.stop()
 
-	def isOutputting(self):
-		""" Method to get if the Auto-wah signal is outputting or not """
-		return self.wah.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the Auto-wah signal is processing or not """
+		return self.wah.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the Auto-wah effect signal """
 		return self.wah
 
-class ChordsEFF():
+# intervals, in semitones from the first of the chord, of the other voices of each chord of the Harmonizer effect
+CHORDS = {
+	'Major': [4, 7, 12],
+	'Major 7th': [4, 7, 10],
+	'Major 7th-Maj': [4, 7, 11],
+	'Minor': [3, 7, 12],
+	'Minor 7th': [3, 7, 10],
+	'Minor 7th-Maj': [3, 7, 11],
+	'Diminished': [3, 6, 9],
+}
+
+# steps, in semitones from the key, of each scale available in the scale mode of the Harmonizer effect
+SCALES = {
+	'Major': [0, 2, 4, 5, 7, 9, 11],
+	'Minor': [0, 2, 3, 5, 7, 8, 10],
+	'Harmonic Minor': [0, 2, 3, 5, 7, 8, 11],
+	'Dorian': [0, 2, 3, 5, 7, 9, 10],
+	'Mixolydian': [0, 2, 4, 5, 7, 9, 10],
+}
+
+# maximum number of voices added by the Harmonizer effect to the clean signal
+MAX_VOICES = 8
+
+class ChordsEFF(Effect):
 	""" Class that implements the Harmonizer effect.
+		Every voice is transposed directly from the clean signal by its interval from the first of the chord,
+		so that pitch-shift artifacts and latency don't pile up from one voice to the next.
+		A fixed pool of MAX_VOICES voices is created once: changing chord only glides the transpositions
+		to the new intervals, and the voices that are not used (or whose gain is 0) are stopped, so that
+		the cost grows with the number of voices heard.
+		In scale mode, the intervals follow the note sung: each voice is a number of degrees
+		of a scale above it, the note being detected by the pitch tracker of the model
+		(use Glovox.setHarmonizerScale, which starts the pitch tracker). The scale mode is left by choosing a chord.
         
         Attributes:
-            first      clean signal, representing the first of the chord
-            third      clean signal, representing the third of the chord
-            fifth	   clean signal, representing the fifth of the chord
-            lastNote   clean signal, representing the last note of the chord
+            first      clean signal, representing the first of the chord. Every voice reads it, so that setInput rewires them all
+            freq       pitch of the clean signal, used in scale mode
+            transpo    transposition of each voice, smoothed over portamento seconds
+            voices     one harmonizer for each voice
+            gains      gain of each voice
+            harmony    voices mixed down to a single stream
             chords     chord signal
+            chord      name of the current chord, a key of CHORDS, None if the intervals are custom
+            intervals  intervals, in semitones, of the voices in use
+            scale      name of the scale in scale mode, a key of SCALES, None otherwise
+            key        pitch class (0 is C) of the first degree of the scale
+            degrees    number of degrees of the scale between the note sung and each voice, in scale mode
+            follower   periodic call updating the intervals in scale mode
     """
-	def __init__(self, cleanS):
-		""" Init Methdod """
-		self.first = cleanS
-
-		self.third = Harmonizer(self.first, transpo = 4)
-		self.fifth = Harmonizer(self.third, transpo = 3)
-		self.lastNote = Harmonizer(self.fifth, transpo = 5) #Default major chords
+	DISCRETE_PARAMS = ('chord', 'scaleMode')
 
-		self.chords = self.first + self.third + self.fifth + self.lastNote
+	def __init__(self, cleanS, freqS = None, portamento = 0.05, rate = 0.02):
+		""" Init Methdod """
+		super().__init__()
+		self.first = InputFader(cleanS)
+		self.freq = freqS
+
+		self.transpo = [SigTo(0, time = portamento) for i in range(MAX_VOICES)]
+		self.voices = [Harmonizer(self.first, transpo = transpo) for transpo in self.transpo]
+		self.gains = [1.0] * MAX_VOICES
+		self.harmony = Mix(self.voices, voices = 1)
+		self.chords = self.first + self.harmony
+
+		self.scale = None
+		self.key = 0
+		self.degrees = []
+		self.follower = Pattern(self.followScale, time = rate)
+		self.follower.stop()
+
+		self.intervals = []
+		self.setChord('Major') #Default major chords
+
+	def isVoiceAudible(self, voice):
+		""" Method to get if a voice is used and has a non-zero gain """
+		return voice < len(self.intervals) and self.gains[voice] > 0
+
+	def updateVoices(self):
+		""" Method to run the audible voices and stop the other ones """
+		running = self.chords.isPlaying()
+		for i in range(MAX_VOICES):
+			if running and self.isVoiceAudible(i):
+				self.transpo[i].play()
+				self.voices[i].play()
+			else:
+				self.voices[i].stop()
+				self.transpo[i].stop()
+
+	def setIntervals(self, intervals):
+		""" Method to set the voices of the chord, intervals are in semitones from the first of the chord.
+		It leaves the scale mode """
+		if not 1 <= len(intervals) <= MAX_VOICES:
+			raise ValueError('the Harmonizer needs between 1 and %d intervals' % MAX_VOICES)
+		self.scale = None
+		self.follower.stop()
+		self.chord = None
+		self.applyIntervals(intervals)
+
+	def applyIntervals(self, intervals):
+		""" Method to glide the voices to new intervals """
+		for transpo, interval in zip(self.transpo, intervals):
+			transpo.setValue(interval)
+		if len(intervals) != len(self.intervals):
+			self.intervals = list(intervals)
+			self.updateVoices()
+		else:
+			self.intervals = list(intervals)
+
+	def getIntervals(self):
+		""" Method to get the intervals of the voices in use """
+		return self.intervals
+
+	def setVoiceGain(self, voice, gain):
+		""" Method to set the gain of a voice, a voice with gain 0 is stopped """
+		self.gains[voice] = gain
+		self.voices[voice].setMul(gain)
+		self.updateVoices()
+
+	def getVoiceGain(self, voice):
+		""" Method to get the gain of a voice """
+		return self.gains[voice]
+
+	def setChord(self, chord):
+		""" Method to set the chord called chord """
+		self.setIntervals(CHORDS[chord])
+		self.chord = chord
+
+	def getChord(self):
+		""" Method to get the name of the current chord """
+		return self.chord
+
+	def setScale(self, key, scale, degrees = (2, 4)):
+		""" Method to enter the scale mode: each voice is degrees above the note sung, in the scale of the given key.
+		By default the voices are a third and a fifth above """
+		if self.freq is None:
+			raise ValueError('the scale mode needs the pitch of the clean signal')
+		if not 1 <= len(degrees) <= MAX_VOICES:
+			raise ValueError('the Harmonizer needs between 1 and %d voices' % MAX_VOICES)
+		self.key = key % 12
+		self.scale = scale
+		self.degrees = list(degrees)
+		self.chord = None
+		self.applyIntervals([0] * len(degrees))
+		if self.chords.isPlaying():
+			self.follower.play()
+
+	def getScale(self):
+		""" Method to get the name of the scale, None if the Harmonizer isn't in scale mode """
+		return self.scale
+
+	def setScaleMode(self, mode):
+		""" Method to set the scale mode as a whole, e.g. from a preset: a dict with the key, the scale and the degrees
+		(see setScale), or None to leave the scale mode for the Major chord """
+		if mode is None:
+			if self.scale is not None:
+				self.setMajor()
+			return
+		self.setScale(mode['key'], mode['scale'], mode['degrees'])
+
+	def getScaleMode(self):
+		""" Method to get the scale mode as a dict with the key, the scale and the degrees, None if the Harmonizer isn't in scale mode """
+		if self.scale is None:
+			return None
+		return {'key': self.key, 'scale': self.scale, 'degrees': list(self.degrees)}
+
+	def usesPitch(self):
+		""" Method to get if the effect needs the pitch tracker of the model """
+		return self.scale is not None
+
+	def scaleIntervals(self, freq):
+		""" Method to get the intervals of the voices for a note sung at freq Hz """
+		steps = SCALES[self.scale]
+		pitchClass = (round(69 + 12 * math.log2(freq / 440.0)) - self.key) % 12
+		# degree of the scale of the note sung, or of the closest one below it
+		degree = max(i for i, step in enumerate(steps) if step <= pitchClass)
+		intervals = []
+		for degrees in self.degrees:
+			octave, target = divmod(degree + degrees, len(steps))
+			intervals.append(steps[target] + 12 * octave - pitchClass)
+		return intervals
+
+	def followScale(self):
+		""" Method called periodically in scale mode to follow the note sung """
+		freq = self.freq.get()
+		if freq <= 0:
+			return
+		intervals = self.scaleIntervals(freq)
+		if intervals != self.intervals:
+			self.applyIntervals(intervals)
 
 	def setMajor(self):
 		""" Method to set Major Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 4)
-		self.fifth = Harmonizer(self.third, transpo = 3)
-		self.lastNote = Harmonizer(self.fifth, transpo = 5)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Major')
 
 	def setMajor7th(self):
 		""" Method to set Major 7th Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 4)
-		self.fifth = Harmonizer(self.third, transpo = 3)
-		self.lastNote = Harmonizer(self.fifth, transpo = 3)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Major 7th')
 
 	def setMajor7thMaj(self):
 		""" Method to set Major 7thMaj Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 4)
-		self.fifth = Harmonizer(self.third, transpo = 3)
-		self.lastNote = Harmonizer(self.fifth, transpo = 4)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Major 7th-Maj')
 
 	def setMinor(self):
 		""" Method to set minor Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 3)
-		self.fifth = Harmonizer(self.third, transpo = 4)
-		self.lastNote = Harmonizer(self.fifth, transpo = 5)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Minor')
 
 	def setMinor7th(self):
 		""" Method to set Minor 7th Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 3)
-		self.fifth = Harmonizer(self.third, transpo = 4)
-		self.lastNote = Harmonizer(self.fifth, transpo = 3)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Minor 7th')
 
 	def setMinor7thMaj(self):
 		""" Method to set Minor 7thMaj Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 3)
-		self.fifth = Harmonizer(self.third, transpo = 4)
-		self.lastNote = Harmonizer(self.fifth, transpo = 4)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Minor 7th-Maj')
 
 	def setDiminished(self):
 		""" Method to set Diminished Chords """
-		self.chords.stop()
-
-		self.third = Harmonizer(self.first, transpo = 3)
-		self.fifth = Harmonizer(self.third, transpo = 3)
-		self.lastNote = Harmonizer(self.fifth, transpo = 3)
-
-		self.chords = self.first + self.third + self.fifth + self.lastNote
-		self.chords.out()
+		self.setChord('Diminished')
 
 	def reset(self):
-		""" Method to reset the output chord of Harmonizer effect """
-		self.setMajor()
+		""" Method to reset the output chord of Harmonizer effect. The scale mode is kept: it is left by choosing a chord """
+		for voice in range(MAX_VOICES):
+			self.gains[voice] = 1.0
+			self.voices[voice].setMul(1.0)
+		if self.scale is None:
+			self.setMajor()
+		else:
+			self.updateVoices()
+
+	def setInput(self, x, fadetime=0.05):
+		""" Method to set the clean signal, crossfading over fadetime seconds """
+		self.first.setInput(x, fadetime)
 
 	def enable(self):
-		""" Method to output the Harmonizer effect signal """
-		self.chords.out()
+		""" Method to start processing the Harmonizer effect signal """
+		self.first.play()
+		self.harmony.play()
+		self.chords.play()
+		self.updateVoices()
+		if self.scale is not None:
+			self.follower.play()
 		
 	def disable(self):
-		""" Method to stop outputting the Harmonizer effect signal """
+		""" Method to stop processing the Harmonizer effect signal and the voices feeding it """
+		self.follower.stop()
 		self.chords.stop()
+		self.harmony.stop()
+		self.updateVoices()
+		self.first.stop()
 
-	def isOutputting(self):
-		""" Method to get if the Harmonizer effect signal is outputting or not """
-		return self.chords.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the Harmonizer effect signal is processing or not """
+		return self.chords.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the Harmonizer effect signal """
 		return self.chords
 
-class SineEFF():
+class SineEFF(Effect):
 	""" Class that implements the Sinusoidal Oscillator effect.
         
         Attributes:
@@ -230,37 +487,40 @@ class SineEFF():
     """
 	def __init__(self, gatedS, freqS):
 		""" Init Methdod """
-		self.sine = Sine(freqS, phase = 0, mul = 0.2*gatedS)
+		super().__init__()
+		self.sine = Sine(freqS, phase = self.addParam('phase', 0), mul = 0.2*gatedS)
 
 	def setPhase(self, phase):
 		""" Method to set Sine's phase """
-		self.sine.setPhase(phase)
+		self.params['phase'].set(phase)
 
 	def getPhase(self):
 		""" Method to get Sine's phase """
-		return self.sine.phase
+		return self.params['phase'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of Sinusoidal Oscillator effect """
 		self.setPhase(0)
 
 	def enable(self):
-		""" Method to output the Sinusoidal Oscillator effect signal """
-		self.sine.out()
+		""" Method to start processing the Sinusoidal Oscillator effect signal """
+		self.playParams()
+		self.sine.play()
 
 	def disable(self):
-		""" Method to stop outputting the Sinusoidal Oscillator effect signal """
+		""" Method to stop processing the Sinusoidal Oscillator effect signal """
 		self.sine.stop()
+		self.stopParams()
 
-	def isOutputting(self):
-		""" Method to get if the Sinusoidal Oscillator effect signal is outputting or not """
-		return self.sine.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the Sinusoidal Oscillator effect signal is processing or not """
+		return self.sine.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the Sinusoidal Oscillator effect signal """
 		return self.sine
 
-class BlitEFF():
+class BlitEFF(Effect):
 	""" Class that implements the BLIT effect.
         
         Attributes:
@@ -268,37 +528,40 @@ class BlitEFF():
     """
 	def __init__(self, gatedS, freqS):
 		""" Init Methdod """
-		self.blit = Blit(freqS, harms=40, mul=0.2*gatedS)
+		super().__init__()
+		self.blit = Blit(freqS, harms=self.addParam('harms', 40), mul=0.2*gatedS)
 
 	def setHarms(self, harms):
 		""" Method to set Blit's harms """
-		self.blit.setHarms(harms)
+		self.params['harms'].set(harms)
 
 	def getHarms(self):
 		""" Method to get Blit's harms """
-		return self.blit.harms
+		return self.params['harms'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of Blit effect """
 		self.setHarms(40)
 
 	def enable(self):
-		""" Method to output the Blit effect signal """
-		self.blit.out()
+		""" Method to start processing the Blit effect signal """
+		self.playParams()
+		self.blit.play()
 
 	def disable(self):
-		""" Method to stop outputting the Blit effect signal """
+		""" Method to stop processing the Blit effect signal """
 		self.blit.stop()
+		self.stopParams()
 
-	def isOutputting(self):
-		""" Method to get if the Blit effect signal is outputting or not """
-		return self.blit.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the Blit effect signal is processing or not """
+		return self.blit.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the Blitn effect signal """
 		return self.blit
 
-class SuperSawEFF():
+class SuperSawEFF(Effect):
 	""" Class that implements the Super Saw effect.
         
         Attributes:
@@ -306,23 +569,24 @@ class SuperSawEFF():
     """
 	def __init__(self, gatedS, freqS):
 		""" Init Methdod """
-		self.superSaw = SuperSaw(freqS, detune = 0.5, bal = 0.7, mul = 0.2*gatedS)
+		super().__init__()
+		self.superSaw = SuperSaw(freqS, detune = self.addParam('detune', 0.5), bal = self.addParam('bal', 0.7), mul = 0.2*gatedS)
 
 	def setDetune(self, detune):
 		""" Method to set SuperSaw's detune """
-		self.superSaw.setDetune(detune)
+		self.params['detune'].set(detune)
 
 	def getDetune(self):
 		""" Method to get SuperSaw's detune """
-		return self.superSaw.detune
+		return self.params['detune'].get()
 
 	def setBal(self, bal):
 		""" Method to set SuperSaw's Bal """
-		self.superSaw.setBal(bal)
+		self.params['bal'].set(bal)
 
 	def getBal(self):
 		""" Method to get SuperSaw's Bal """
-		return self.superSaw.bal
+		return self.params['bal'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of Super Saw effect """
@@ -330,22 +594,24 @@ class SuperSawEFF():
 		self.setBal(0.7)
 
 	def enable(self):
-		""" Method to output the Super Saw effect signal """
-		self.superSaw.out()
+		""" Method to start processing the Super Saw effect signal """
+		self.playParams()
+		self.superSaw.play()
 
 	def disable(self):
-		""" Method to stop outputting the Super Saw effect signal """
+		""" Method to stop processing the Super Saw effect signal """
 		self.superSaw.stop()
+		self.stopParams()
 
-	def isOutputting(self):
-		""" Method to get if the Super Saw effect signal is outputting or not """
-		return self.superSaw.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the Super Saw effect signal is processing or not """
+		return self.superSaw.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the SuperSaw effect signal """
 		return self.superSaw
 
-class PhasorEFF():
+class PhasorEFF(Effect):
 	""" Class that implements the Phasor effect.
         
         Attributes:
@@ -353,37 +619,40 @@ class PhasorEFF():
     """
 	def __init__(self, gatedS, freqS):
 		""" Init Methdod """
-		self.phasor = Phasor(freqS, phase = 0, mul = 0.2*gatedS)
+		super().__init__()
+		self.phasor = Phasor(freqS, phase = self.addParam('phase', 0), mul = 0.2*gatedS)
 
 	def setPhase(self, phase):
 		""" Method to set Phasor's phase """
-		self.phasor.setPhase(phase)
+		self.params['phase'].set(phase)
 
 	def getPhase(self):
 		""" Method to get Phasor's phase """
-		return self.phasor.phase
+		return self.params['phase'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of Phasor effect """
 		self.setPhase(0.0)
 
 	def enable(self):
-		""" Method to output the Phasor effect signal """
-		self.phasor.out()
+		""" Method to start processing the Phasor effect signal """
+		self.playParams()
+		self.phasor.play()
 
 	def disable(self):
-		""" Method to stop outputting the Phasor effect signal """
+		""" Method to stop processing the Phasor effect signal """
 		self.phasor.stop()
+		self.stopParams()
 
-	def isOutputting(self):
-		""" Method to get if the Phasor effect signal is outputting or not """
-		return self.phasor.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the Phasor effect signal is processing or not """
+		return self.phasor.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the Phasor effect signal """
 		return self.phasor
 
-class RCOscEFF():
+class RCOscEFF(Effect):
 	""" Class that implements the Rc oscillator effect.
         
         Attributes:
@@ -391,46 +660,60 @@ class RCOscEFF():
     """
 	def __init__(self, gatedS, freqS):
 		""" Init Methdod """
-		self.rc = RCOsc(freqS, sharp = 0.25, mul = 0.2*gatedS)
+		super().__init__()
+		self.rc = RCOsc(freqS, sharp = self.addParam('sharp', 0.25), mul = 0.2*gatedS)
 
 	def setSharp(self, sharp):
 		""" Method to set RCOsc's sharp """
-		self.rc.setSharp(sharp)
+		self.params['sharp'].set(sharp)
 
 	def getSharp(self):
 		""" Method to get RCOsc's sharp """
-		return self.rc.sharp
+		return self.params['sharp'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of RC Oscillator effect """
 		self.setSharp(0.25)
 
 	def enable(self):
-		""" Method to output the RC Oscillator effect signal """
-		self.rc.out()
+		""" Method to start processing the RC Oscillator effect signal """
+		self.playParams()
+		self.rc.play()
 
 	def disable(self):
-		""" Method to stop outputting the RC Oscillator effect signal """
+		""" Method to stop processing the RC Oscillator effect signal """
 		self.rc.stop()
+		self.stopParams()
 
-	def isOutputting(self):
-		""" Method to get if the RC Oscillator effect signal is outputting or not """
-		return self.rc.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the RC Oscillator effect signal is processing or not """
+		return self.rc.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the RC Oscillator effect signal """
 		return self.rc
 
-class LFOEff():
+class LFOEff(Effect):
 	""" Class that implements the LF oscillator effect.
         
         Attributes:
             lfo     lf oscillator effect signal
     """
+	DISCRETE_PARAMS = ('type',)
+
 	def __init__(self, gatedS, freqS):
 		""" Init Methdod """
+		super().__init__()
 		self.lfo = LFO(freqS, type = 0, mul = 0.2*gatedS)
 
+	def setType(self, type):
+		""" Method to set LFO's waveform, from 0 (saw up) to 7 (modulated sine) """
+		self.lfo.setType(type)
+
+	def getType(self):
+		""" Method to get LFO's waveform """
+		return self.lfo.type
+
 	def setSawUp(self):
 		""" Method to set saw up waveform """
 		self.lfo.setType(0)
@@ -468,46 +751,53 @@ class LFOEff():
 		self.setSawUp()
 
 	def enable(self):
-		""" Method to output the LF Oscillator effect signal """
-		self.lfo.out()
+		""" Method to start processing the LF Oscillator effect signal """
+		self.lfo.play()
 
 	def disable(self):
-		""" Method to stop outputting the LF Oscillator effect signal """
+		""" Method to stop processing the LF Oscillator effect signal """
 		self.lfo.stop()
 
-	def isOutputting(self):
-		""" Method to get if the LF Oscillator effect signal is outputting or not """
-		return self.lfo.isOutputting()
+	def isPlaying(self):
+		""" Method to get if the LF Oscillator effect signal is processing or not """
+		return self.lfo.isPlaying()
 
 	def getSignal(self):
 		""" Method to get the LF Oscillator effect signal """
 		return self.lfo
 
-class ReverbEFF():
+class ReverbEFF(Effect):
 	""" Class that implements the Reverb effect.
         
         Attributes:
             stereoRev     reverb effect signal
+            mono          stereoRev mixed down to one channel, the signal of the reverb used as a stage of a chain
     """
+	DISCRETE_PARAMS = ('roomSize',)
+
 	def __init__(self, cleanS):
 		""" Init Methdod """
-		self.stereoRev = STRev(cleanS, revtime = 1.0, cutoff = 5000, roomSize = 1.0, bal = 0.5)
+		super().__init__()
+		self.stereoRev = STRev(cleanS, revtime = self.addParam('revTime', 1.0), cutoff = self.addParam('cutoff', 5000),
+							   roomSize = 1.0, bal = self.addParam('bal', 0.5))
+		self.mono = Mix(self.stereoRev, voices = 1, mul = 0.5)
+		self.mono.stop()
 
 	def setRevTime(self, revTime):
 		""" Method to set STRev's revtime """
-		self.stereoRev.setRevtime(revTime)
+		self.params['revTime'].set(revTime)
 
 	def getRevTime(self):
 		""" Method to get STRev's revtime """
-		return self.stereoRev.revtime
+		return self.params['revTime'].get()
 
 	def setCutoff(self, cutoff):
 		""" Method to set STRev's cutoff """
-		self.stereoRev.setCutoff(cutoff)
+		self.params['cutoff'].set(cutoff)
 
 	def getCutoff(self):
 		""" Method to get STRev's cutoff """
-		return self.stereoRev.cutoff
+		return self.params['cutoff'].get()
 
 	def setRoomSize(self, roomSize):
 		""" Method to set STRev's roomSize """
@@ -519,11 +809,11 @@ class ReverbEFF():
 
 	def setBal(self, bal):
 		""" Method to set STRev's bal """
-		self.stereoRev.setBal(bal)
+		self.params['bal'].set(bal)
 
 	def getBal(self):
 		""" Method to get STRev's bal """
-		return self.stereoRev.bal
+		return self.params['bal'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of Reverb effect """
@@ -532,62 +822,110 @@ class ReverbEFF():
 		self.setRoomSize(1.0)
 		self.setBal(0.5)
 
-	def enable(self, output):
-		""" Method to output the Reverb effect signal """
+	def enable(self, output = None):
+		""" Method to output the Reverb effect signal applied to output.
+		Without output, the reverb only processes its input, its signal being read by the next stage of a chain """
+		self.playParams()
+		if output is None:
+			self.stereoRev.play()
+			self.mono.play()
+			return
 		self.stereoRev.setInput(output)
 		self.stereoRev.out()
 
 	def disable(self):
 		""" Method to stop outputting the Reverb effect signal """
+		self.mono.stop()
 		self.stereoRev.reset()
 		self.stereoRev.stop()
+		self.stopParams()
+
+	def isPlaying(self):
+		""" Method to get if the Reverb effect signal is processing or not """
+		return self.stereoRev.isPlaying()
+
+	def setInput(self, x, fadetime = 0.05):
+		""" Method to set Reverb input, crossfading over fadetime seconds """
+		self.stereoRev.setInput(x, fadetime)
+
+	def getSignal(self):
+		""" Method to get the Reverb effect signal, mixed down to one channel """
+		return self.mono
 
-	def setInput(self, x):
-		""" Method to set Reverb input """
-		self.stereoRev.setInput(x)
+	def getSendSignal(self):
+		""" Method to get the signal output by the Reverb when it is enabled on the active effect """
+		return self.stereoRev
 
 
-class DelayEFF():
+class DelayEFF(Effect):
 	""" Class that implements the Delay effect.
         
         Attributes:
-            d     delay effect signal
+            source   input of the delay
+            d        delay effect signal
+            echoes   input followed by its echoes, the signal of the delay used as a stage of a chain
     """
 	def __init__(self, cleanS):
 		""" Init Methdod """
-		self.d = Delay(cleanS, delay = 0.25, feedback = 0)
+		super().__init__()
+		self.source = InputFader(cleanS)
+		self.d = Delay(self.source, delay = self.addParam('delayAmount', 0.25), feedback = self.addParam('feedback', 0))
+		self.echoes = self.source + self.d
+		self.echoes.stop()
 
 	def setDelayAmount(self, delayAmount):
 		""" Method to set Delay's delay """
-		self.d.setDelay(delayAmount)
+		self.params['delayAmount'].set(delayAmount)
 
 	def getDelayAmount(self):
 		""" Method to get Delay's delay """
-		return self.d.delay
+		return self.params['delayAmount'].get()
 
 	def setFeedback(self, feedback):
 		""" Method to set Delay's feedback """
-		self.d.setFeedback(feedback)
+		self.params['feedback'].set(feedback)
 
 	def getFeedback(self):
 		""" Method to get Delay's feedback """
-		return self.d.feedback
+		return self.params['feedback'].get()
 
 	def reset(self):
 		""" Method to reset the parameters of Delay effect """
 		self.setDelayAmount(0.25)
 		self.setFeedback(0.0)
 
-	def enable(self, output):
-		""" Method to output the Delay effect signal """
-		self.d.setInput(output)
+	def enable(self, output = None):
+		""" Method to output the Delay effect signal applied to output.
+		Without output, the delay only processes its input, its signal being read by the next stage of a chain """
+		self.playParams()
+		self.source.play()
+		if output is None:
+			self.d.play()
+			self.echoes.play()
+			return
+		self.source.setInput(output)
 		self.d.out()
 
 	def disable(self):
 		""" Method to stop outputting the Delay effect signal """
+		self.echoes.stop()
 		self.d.reset()# this reset is Pyo's reset function, not our custom one
 		self.d.stop()
+		self.source.stop()
+		self.stopParams()
+
+	def isPlaying(self):
+		""" Method to get if the Delay effect signal is processing or not """
+		return self.d.isPlaying()
+
+	def setInput(self, x, fadetime = 0.05):
+		""" Method to set Delay input, crossfading over fadetime seconds """
+		self.source.setInput(x, fadetime)
+
+	def getSignal(self):
+		""" Method to get the input followed by its echoes """
+		return self.echoes
 
-	def setInput(self, x):
-		""" Method to set Delay input """
-		self.d.setInput(x)
+	def getSendSignal(self):
+		""" Method to get the signal output by the Delay when it is enabled on the active effect """
+		return self.d
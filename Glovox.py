@@ -1,491 +1,888 @@
 from pyo import *
+from pyo import PyoObjectBase
+from RingBuffer import RingBuffer
+from Pedalboard import Pedalboard
+from PitchTracker import PitchTracker
+from PolySynth import PolySynthEFF
+from ConvolutionReverb import ConvolutionReverbEFF
 from Effects import (NoEFF, DistortionEFF, AutoWahEFF, ChordsEFF, SineEFF, BlitEFF, SuperSawEFF, PhasorEFF, RCOscEFF, LFOEff, ReverbEFF, DelayEFF)
 import numpy as np
-import threading
 import atexit
+import time
+import gc
+import json
+import threading
 
 # The Model
 
+# main effects, in the order they are shown to the user, with their displayed name
+MAIN_EFFECTS = (('noEffect', 'No Effect'), ('distortion', 'Distortion'), ('wah', 'Auto-Wah'), ('chords', 'Harmonizer'),
+				('sine', 'Sine Oscillator'), ('blit', 'BLIT'), ('superSaw', 'Super Saw'), ('phasor', 'Phasor'),
+				('rc', 'RC Oscillator'), ('lfo', 'LF Oscillator'), ('poly', 'Poly Synth'))
+
+# effects driven by the pitch and the gate of the input, instead of by the input itself
+SYNTH_EFFECTS = ('sine', 'blit', 'superSaw', 'phasor', 'rc', 'lfo', 'poly')
+
+# effects applied on top of the main effect
+SEND_EFFECTS = ('reverb', 'delay')
+
+# effects that can only be stages of the chain, with their displayed name
+CHAIN_ONLY_EFFECTS = (('reverb', 'Reverb'), ('delay', 'Delay'))
+
+# bins of the load histogram, they cover 0 to 2 times the buffer deadline, the last bin counts everything above
+LOAD_BINS = 40
+LOAD_RANGE = 2.0
+
+def loadConfig(path):
+	""" Function to read the keyword arguments of Glovox (audio backend, buffer size, sampling rate...) from a JSON file """
+	with open(path) as configFile:
+		return json.load(configFile)
+
 class Glovox():
 	""" Class that implements the model. It handles the comunication with audio drivers and keeps track of processing chain.
-        
+
         Attributes:
-            input     input used for no Effect
-            input2	  input used for Distortion and Auto-wah effect
-            input3	  input used for Harmonizer effect
-            input4	  input used to compute a gate signal and its frequency
-            gated	  gated signal of input4, it is used to gate inpu4 so that not to listen to it, if it is under a threshold
-            freq      frequency of the input4, it is used as an input parameter of signal generators effect
-            input5    input used to initialize Reverb and Delay effect
+            mode      'realtime' to process the microphone, 'offline' to render infile into outfile as fast as possible
+            infile    sound file processed in offline mode
+            outfile   sound file written in offline mode
+            input     microphone input (or infile, in offline mode), shared by every effect
+            gated	  gated signal of input, it is used to gate the synth effects so that not to listen to them, if the input is under a threshold
+            tracker   pitch detection stage of the input (see PitchTracker)
+            freq      frequency of the input, it is used as an input parameter of signal generators effect
+            factories     functions building each effect, keyed by effect name. 'chain' builds a Pedalboard,
+                          a main effect processing other effects in series
+            effects       effects built so far, keyed by effect name. An effect is built on its first use
+            idleSince     time at which each built effect has been disabled
+            idleTimeout   seconds after which a disabled effect is destroyed, None to keep it (paused) forever
+            active        name of the main effect that is audible
+            mixer         output stage, the main effects are crossfaded into it
+            mixerInputs   signal plugged into the mixer for each main effect
+            fadeSamples   duration, in samples, of the crossfade between two main effects
+            fades         index of the sample at which each effect fading out is paused, keyed by effect name
+            lock          guards the switching state (active, fades, mixerInputs, the sends and the chain) between the GUI
+                          thread and the callback. The callback never waits for it: while another thread holds it,
+                          the pending switch or preset is applied at the next buffer
             t     	  TO COMMENT - Ciolo
-            arr 	  ...
-            lock 	  ...
-            stop  	  ...
+            rec       waveform tap, it fills t with the signal of the active effect. It is created once and retargeted with setInput
+            arr 	  numpy view on t, it holds the last block of samples written by rec
+            ring      ring buffer with the last waveformSize samples of the active effect
+            stop  	  True once the model is closed, the callback doesn't touch the waveform anymore and close does nothing
+            pendingParams   parameter values set since the last buffer, keyed by (effect name, parameter name).
+                            They are written once per buffer by the callback, the last value set wins
+            pendingPreset   preset to apply at the next buffer, None if there is none
+            pendingSwitch   main effect to switch to at the next buffer, None if there is none
+            blockListeners  objects whose processBlock(start) is called by the callback after every block.
+                            The list is replaced, never modified, so that the callback can go through it while it changes
+            samples         index of the first sample of the block held by t, negative until a block has been computed
+            callbackStats   number of callbacks, total and maximum time spent in them, in seconds
+            roundTrip       last round-trip latency measured by measureRoundTrip, in seconds, None if never measured
+            deadline        duration of a buffer, in seconds
+            loadHistogram   number of buffers per load bin, the load being the time needed to compute a buffer divided by the deadline
+            overruns        number of buffers that took longer than the deadline
+            lastCallback    CPU time of the audio thread at the last callback, None until the first one
+            lastLoad        load of the last buffer
+
+        Server settings (they can be read from a JSON file with loadConfig):
+            audio         audio backend: 'portaudio', 'jack', 'coreaudio', 'offline' or 'manual'
+            bufferSize    samples computed at each callback, smaller values lower the latency but raise the CPU load
+            sr            sampling rate, in Hz
+            duplex        1 to open the input as well as the output, 0 for output only
+            midiDevice    MIDI input device, None for the default one
+            midiOutputDevice  MIDI output device, used by PitchToMidi, None for the default one
+            pitchMethod   pitch detection algorithm, one of PITCH_METHODS
+            pitchRate     time, in seconds, between two pitch estimates
+            reverbImpulse impulse response (a sound file) of a convolution reverb used instead of the Reverb, None for the Reverb
     """
-	def __init__(self):
+	def __init__(self, idleTimeout=None, fadeSamples=256, audio='portaudio', waveformSize=None, mode='realtime', infile=None, outfile=None,
+				 bufferSize=256, sr=44100, duplex=1, midiDevice=None, midiOutputDevice=None,
+				 pitchMethod='yin', pitchRate=0.01, reverbImpulse=None):
 		""" Init Method """
-		self.server = Server(nchnls=1)
+		self.mode = mode
+		self.audio = 'offline' if mode == 'offline' else audio
+		self.infile = infile
+		self.outfile = outfile
+		if mode == 'offline':
+			if infile is None or outfile is None:
+				raise ValueError('offline mode needs an infile and an outfile')
+			# the server runs at the sampling rate of the file and renders it without audio hardware
+			self.server = Server(sr=sndinfo(infile)[2], nchnls=1, buffersize=bufferSize, duplex=0, audio='offline')
+		else:
+			self.server = Server(sr=sr, nchnls=1, buffersize=bufferSize, duplex=duplex, audio=audio)
+			if midiDevice is not None:
+				self.server.setMidiInputDevice(midiDevice)
+			if midiOutputDevice is not None:
+				self.server.setMidiOutputDevice(midiOutputDevice)
 		self.server.boot()
 
-		# setting microphones as input
-		# more inputs are used because calling stop() on just a single input disables all the pedals' output 
-		self.input = Input(chnl=0)
-
-		self.input2 = Input(chnl=0)
-
-		self.input3 = Input(chnl=0)
-
-		self.input4 = Input(chnl=0)
-		self.gated = Gate(self.input4, thresh=-40, outputAmp=True)
-		self.freq = Yin(self.input4, cutoff=3000)
-
-		self.input5 = Input(chnl=0)
-
+		# setting microphone (or the file to render) as input
+		# the input is read once and fanned out to every effect: effects never stop it,
+		# they stop only the objects they own (see NoEFF)
+		if mode == 'offline':
+			self.input = SfPlayer(infile).mix(1)
+		else:
+			self.input = Input(chnl=0)
+
+		# analysis used by the synth effects, it runs only while one of them is active
+		self.gated = Gate(self.input, thresh=-40, outputAmp=True)
+		self.tracker = PitchTracker(self.input, method=pitchMethod, rate=pitchRate)
+		self.freq = self.tracker.getSignal()
+		self.stopAnalysis()
+
+		self.idleTimeout = idleTimeout
+		self.reverbImpulse = reverbImpulse
 		self.createPedals()
 
-		#TO COMMENT - Ciolo 
+		# every main effect is an input of the mixer, only the active one has a non-zero amplitude
+		self.active = None
+		self.fades = {}
+		self.lock = threading.RLock()
+		self.fadeSamples = fadeSamples
+		self.mixer = Mixer(outs=1, chnls=1, time=self.getFadeTime())
+		self.mixerInputs = {}
+		self.mixer.out()
+
+		#TO COMMENT - Ciolo
 		# Create a table of length `buffer size` and read it in loop.
 		self.t = DataTable(size=self.server.getBufferSize())
 		# Share the table's memory with a numpy array.
 		self.arr = np.asarray(self.t.getBuffer())
+		# the one and only table writer, switching effect only changes its input
+		self.rec = TableFill(self.input, self.t)
+		# every block written into t is appended here by the callback
+		# by default the waveform holds at least 8192 samples, and always a whole number of buffers
+		if waveformSize is None:
+			waveformSize = max(8192, 4 * bufferSize)
+		waveformSize = -(-waveformSize // bufferSize) * bufferSize
+		self.ring = RingBuffer(waveformSize)
+		# the first callback comes before the first block
+		self.samples = -2 * bufferSize
+		self.callbackStats = [0, 0.0, 0.0]
+		self.roundTrip = None
+		self.pendingParams = {}
+		self.pendingPreset = None
+		self.pendingSwitch = None
+		self.blockListeners = []
+
+		# DSP load: the callback runs in the audio thread once per buffer, so the CPU time used by that thread
+		# between two callbacks is the time spent computing a buffer, without the time spent waiting for the driver
+		self.deadline = self.getBufferDuration()
+		self.loadHistogram = np.zeros(LOAD_BINS + 1, dtype=np.int64)
+		self.overruns = 0
+		self.lastCallback = None
+		self.lastLoad = 0.0
 		# callback necessary for waveform
 		self.server.setCallback(self.process)
 
-		self.lock = threading.Lock()
 		self.stop = False
-		"""This class runs in a thread. 
+		"""This class runs in a thread.
 		So to make sure it stops correctly, a call to atexit is registered at startup"""
 		atexit.register(self.close)
 
-		self.start()
+		if mode == 'offline':
+			# the server starts (and renders) only when render() is called
+			self.switchToNoEff()
+		else:
+			self.start()
 
 	def close(self):
-		""" Method to stop the server and reset the table containing information for the waveform """
-		with self.lock:
-			self.stop = True
+		""" Method to stop the server and reset the table containing information for the waveform.
+		Only the first call does something: the server may already be shut down at the next one """
+		if self.stop:
+			return
+		self.stop = True
+		atexit.unregister(self.close)
 		self.t.reset()
+		self.ring.reset()
 		self.server.stop()
 
 	def start(self):
 		""" Method to start the server and set the active effect as the clean input """
+		# the time the server was stopped is not a buffer
+		self.lastCallback = None
 		self.server.start()
 		self.switchToNoEff()
 
+	def render(self):
+		""" Method to render infile through the active effect into outfile, in offline mode.
+		It returns the rendering speed, as a multiple of real time """
+		duration = sndinfo(self.infile)[1]
+		self.server.recordOptions(dur=duration, filename=self.outfile, fileformat=0, sampletype=1)
+		start = time.perf_counter()
+		# in offline mode start() returns when the whole file has been rendered
+		self.server.start()
+		elapsed = time.perf_counter() - start
+		return duration / elapsed if elapsed > 0 else float('inf')
+
 	def createPedals(self):
-		""" Method to create all the available effect """
-		self.noEffect = NoEFF(self.input)
-		self.distortion = DistortionEFF(self.input2)
-		self.wah = AutoWahEFF(self.input2)
-		self.chords = ChordsEFF(self.input3)
-		self.sine = SineEFF(self.gated, self.freq)
-		self.blit = BlitEFF(self.gated, self.freq)
-		self.superSaw = SuperSawEFF(self.gated, self.freq)
-		self.phasor = PhasorEFF(self.gated, self.freq)
-		self.rc = RCOscEFF(self.gated, self.freq)
-		self.lfo = LFOEff(self.gated, self.freq)
-		self.reverb = ReverbEFF(self.input5)
-		self.delay = DelayEFF(self.input5)
+		""" Method to register all the available effects.
+		Pyo objects of an effect are created only when the effect is used for the first time,
+		so that the server doesn't process effects that are not audible """
+		self.factories = {
+			'noEffect': lambda: NoEFF(self.input),
+			'distortion': lambda: DistortionEFF(self.input),
+			'wah': lambda: AutoWahEFF(self.input),
+			'chords': lambda: ChordsEFF(self.input, self.freq),
+			'sine': lambda: SineEFF(self.gated, self.freq),
+			'blit': lambda: BlitEFF(self.gated, self.freq),
+			'superSaw': lambda: SuperSawEFF(self.gated, self.freq),
+			'phasor': lambda: PhasorEFF(self.gated, self.freq),
+			'rc': lambda: RCOscEFF(self.gated, self.freq),
+			'lfo': lambda: LFOEff(self.gated, self.freq),
+			'poly': lambda: PolySynthEFF(self),
+			'reverb': lambda: ConvolutionReverbEFF(self.input, self.reverbImpulse, self.server.getBufferSize())
+							  if self.reverbImpulse else ReverbEFF(self.input),
+			'delay': lambda: DelayEFF(self.input),
+			'chain': lambda: Pedalboard(self),
+		}
+		self.effects = {}
+		self.idleSince = {}
+
+	def getEffect(self, name):
+		""" Method to get an effect by name, building it (paused) if it has never been used """
+		if name not in self.effects:
+			effect = self.factories[name]()
+			# pyo objects start processing as soon as they are created
+			effect.disable()
+			self.effects[name] = effect
+			self.idleSince[name] = time.time()
+		return self.effects[name]
+
+	def isBuilt(self, name):
+		""" Method to get if the pyo objects of an effect have been created """
+		return name in self.effects
+
+	def releaseIdleEffects(self):
+		""" Method to destroy the effects that have been paused for longer than idleTimeout.
+		The effects staged for the pending switch or preset are kept """
+		if self.idleTimeout is None:
+			return
+		now = time.time()
+		with self.lock:
+			pending = self.getPendingNames()
+			for name in list(self.effects):
+				if name == self.active or name in self.fades or self.effects[name].isPlaying() or name == 'chain' or name in pending:
+					continue
+				if now - self.idleSince[name] > self.idleTimeout:
+					if name in self.mixerInputs:
+						self.mixer.delInput(name)
+						del self.mixerInputs[name]
+					del self.effects[name]
+					del self.idleSince[name]
+
+	def getPendingNames(self):
+		""" Method to get the names of the effects used by the pending switch and by the pending preset """
+		names = set()
+		if self.pendingSwitch is not None:
+			names.add(self.pendingSwitch)
+		if self.pendingPreset is not None:
+			names.update(self.getPresetNames(self.pendingPreset))
+		return names
+
+	def getFadeTime(self):
+		""" Method to get the duration, in seconds, of the crossfade between two main effects """
+		return self.fadeSamples / self.server.getSamplingRate()
+
+	def setFadeSamples(self, fadeSamples):
+		""" Method to set the duration, in samples, of the crossfade between two main effects """
+		self.fadeSamples = fadeSamples
+		self.mixer.setTime(self.getFadeTime())
+
+	def setSmoothTime(self, time):
+		""" Method to set the time, in seconds, taken by the continuous parameters of every effect built to glide to a new value.
+		Offline renders use one sample, so that the parameters set before rendering hold from the first sample """
+		for effect in self.effects.values():
+			if hasattr(effect, 'setSmoothTime'):
+				effect.setSmoothTime(time)
+
+	def getActiveName(self):
+		""" Method to get the name of the active main effect """
+		return self.active
+
+	def getActive(self):
+		""" Method to get the active main effect """
+		return self.effects[self.active]
+
+	def switchTo(self, name):
+		""" Method to switch to the main effect called name, from any thread but the one of the server (see requestSwitch).
+		The new effect fades in while the old one fades out, the old one is paused by the callback when the fade is over """
+		with self.lock:
+			self.stageEffect(name)
+			self.applySwitch(name)
+			self.releaseIdleEffects()
+
+	def stageEffect(self, name):
+		""" Method to build a main effect, paused, and to plug it into the mixer, so that switching to it creates no pyo object """
+		with self.lock:
+			self.getEffect(name)
+			self.plugIntoMixer(name)
+
+	def isStaged(self, name):
+		""" Method to get if a main effect is built and plugged into the mixer """
+		return name in self.effects and self.mixerInputs.get(name) is self.effects[name].getSignal()
+
+	def applySwitch(self, name):
+		""" Method to switch to a staged main effect, it runs in the callback or under the lock """
+		old = self.active
+		self.disableReverb()
+		self.disableDelay()
+		for send in SEND_EFFECTS:
+			if self.isBuilt(send):
+				self.effects[send].reset()
+
+		effect = self.getEffect(name)
+		self.detachFromChain(name)
+		if hasattr(effect, 'reset'):
+			effect.reset()
+		if self.needsAnalysis(name):
+			self.startAnalysis()
+		# switching back to an effect that is still fading out: it must not be paused
+		self.fades.pop(name, None)
+		effect.enable()
+		# staged effects are already plugged, this only replugs an effect that replaced its signal
+		self.plugIntoMixer(name)
+		self.mixer.setAmp(name, 0, 1)
+		self.active = name
+
+		if old is not None and old != name:
+			self.mixer.setAmp(old, 0, 0)
+			self.fades[old] = self.getNextSample() + self.fadeSamples
+
+		self.rec.setInput(effect.getSignal())
+
+	def plugIntoMixer(self, name):
+		""" Method to make the mixer read the current signal of a main effect.
+		The mixer is replugged only if the effect has replaced its signal object since the last time """
+		signal = self.effects[name].getSignal()
+		if self.mixerInputs.get(name) is signal:
+			return
+		if name in self.mixerInputs:
+			self.mixer.delInput(name)
+		self.mixer.addInput(name, signal)
+		self.mixerInputs[name] = signal
+
+	def pause(self, name):
+		""" Method to pause a main effect that has faded out """
+		if name == self.active or self.inChain(name):
+			return
+		self.effects[name].disable()
+		self.idleSince[name] = time.time()
+		if not self.needsAnalysis(self.active) and not any(self.needsAnalysis(fading) for fading in self.fades) \
+				and not self.listenersNeedAnalysis():
+			self.stopAnalysis()
+
+	def pauseFaded(self):
+		""" Method to pause the main effects and the stages of the chain whose fade out is over, it runs in the callback """
+		end = self.getNextSample()
+		for name in [name for name, deadline in self.fades.items() if deadline <= end]:
+			del self.fades[name]
+			self.pause(name)
+		if self.isBuilt('chain'):
+			self.effects['chain'].pauseFaded(end)
+
+	def getNextSample(self):
+		""" Method to get the index of the first sample of the next block computed by the server """
+		return self.samples + len(self.arr)
+
+	def needsAnalysis(self, name):
+		""" Method to get if the effect called name uses the gate or the pitch of the input """
+		if name in SYNTH_EFFECTS:
+			return True
+		return self.isBuilt(name) and hasattr(self.effects[name], 'usesPitch') and self.effects[name].usesPitch()
+
+	def updateAnalysis(self):
+		""" Method to start or stop the analysis of the input, after the active effect changed its needs
+		(e.g. the Harmonizer entering or leaving scale mode) """
+		if self.needsAnalysis(self.active) or self.listenersNeedAnalysis():
+			self.startAnalysis()
+		else:
+			self.stopAnalysis()
+
+	def startAnalysis(self):
+		""" Method to start the gate and the pitch tracker of the input """
+		self.gated.play()
+		self.tracker.play()
+
+	def stopAnalysis(self):
+		""" Method to stop the gate and the pitch tracker of the input, when no synth effect needs them """
+		self.gated.stop()
+		self.tracker.stop()
+
+	def addBlockListener(self, listener):
+		""" Method to call listener.processBlock(start) after every block, start being the index of its first sample.
+		If listener.usesPitch() is True, the analysis of the input runs while it is registered.
+		A listener already registered is not added twice """
+		if listener in self.blockListeners:
+			return
+		self.blockListeners = self.blockListeners + [listener]
+		self.updateAnalysis()
+
+	def removeBlockListener(self, listener):
+		""" Method to stop calling a block listener, if it is registered """
+		if listener in self.blockListeners:
+			self.blockListeners = [registered for registered in self.blockListeners if registered is not listener]
+		self.updateAnalysis()
+
+	def listenersNeedAnalysis(self):
+		""" Method to get if a block listener uses the gate or the pitch of the input """
+		return any(hasattr(listener, 'usesPitch') and listener.usesPitch() for listener in self.blockListeners)
+
+	def getPitchTracker(self):
+		""" Method to get the pitch detection stage, to change its algorithm or its analysis rate """
+		return self.tracker
 
 	def getNoEffect(self):
 		""" Method to get NoEffect signal """
-		return self.noEffect
+		return self.getEffect('noEffect')
 
 	def switchToNoEff(self):
 		""" Method to switch to no effect """
-		if self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.noEffect.enable()
-		self.rec = TableFill(self.noEffect.getSignal(), self.t)
+		self.switchTo('noEffect')
 
 	def getDistortion(self):
 		""" Method to get Distortion signal """
-		return self.distortion
+		return self.getEffect('distortion')
 
 	def switchToDistortion(self):
 		""" Method to switch to Distortion effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.distortion.reset()
-		self.distortion.enable()
-		self.rec = TableFill(self.distortion.getSignal(), self.t)
+		self.switchTo('distortion')
 
 	def getWah(self):
 		""" Method to get Auto-Wah signal """
-		return self.wah
+		return self.getEffect('wah')
 
 	def switchToWah(self):
 		""" Method to switch to Auto-Wah effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.wah.enable()
-		self.rec = TableFill(self.wah.getSignal(), self.t)
+		self.switchTo('wah')
 
 	def getChords(self):
 		""" Method to get Harmonizer signal """
-		return self.chords
+		return self.getEffect('chords')
 
 	def switchToChords(self):
 		""" Method to switch to Harmonizer effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
+		self.switchTo('chords')
 
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.chords.reset()
-		self.chords.enable()
-		self.rec = TableFill(self.chords.getSignal(), self.t)
+	def setHarmonizerChord(self, chord):
+		""" Method to set the chord of the Harmonizer, a key of CHORDS. It leaves the scale mode, and the analysis
+		of the input stops if nothing else needs it """
+		with self.lock:
+			self.getChords().setChord(chord)
+			self.updateAnalysis()
 
-	def updateTableChords(self):
-		""" Method to update the wavefrm table, when the user change the chord of harmonizer """
-		self.rec = TableFill(self.chords.getSignal(), self.t)
+	def setHarmonizerScale(self, key, scale, degrees=(2, 4)):
+		""" Method to put the Harmonizer in scale mode (see ChordsEFF.setScale) and to start the analysis of the input,
+		so that the voices follow the note sung """
+		with self.lock:
+			self.getChords().setScale(key, scale, degrees)
+			self.updateAnalysis()
 
 	def getSine(self):
 		""" Method to get the Sine signal """
-		return self.sine
+		return self.getEffect('sine')
 
 	def switchToSine(self):
 		""" Method to switch to the Sine effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.sine.enable()
-		self.rec = TableFill(self.sine.getSignal(), self.t)
+		self.switchTo('sine')
 
 	def getBlit(self):
 		""" Method to get the BLIT signal """
-		return self.blit
+		return self.getEffect('blit')
 
 	def switchToBlit(self):
 		""" Method to switch to the BLIT effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.blit.enable()
-		self.rec = TableFill(self.blit.getSignal(), self.t)
+		self.switchTo('blit')
 
 	def getSuperSaw(self):
 		""" Method to get the Super Saw signal """
-		return self.superSaw
+		return self.getEffect('superSaw')
 
 	def switchToSuperSaw(self):
 		""" Method to switch to the Super Saw Effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.superSaw.enable()
-		self.rec = TableFill(self.superSaw.getSignal(), self.t)
+		self.switchTo('superSaw')
 
 	def getPhasor(self):
 		""" Method to get the Phasor signal """
-		return self.phasor
+		return self.getEffect('phasor')
 
 	def switchToPhasor(self):
 		""" Method to switch to the Phasor Effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.phasor.enable()
-		self.rec = TableFill(self.phasor.getSignal(), self.t)
+		self.switchTo('phasor')
 
 	def getRC(self):
 		""" Method to get the RC Osc signal """
-		return self.rc
+		return self.getEffect('rc')
 
 	def switchToRC(self):
 		""" Method to switch to the RC Osc Effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.lfo.isOutputting():
-			self.lfo.disable()
-
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.rc.enable()
-		self.rec = TableFill(self.rc.getSignal(), self.t)
+		self.switchTo('rc')
 
 	def getLFO(self):
 		""" Method to get the LFO signal """
-		return self.lfo
+		return self.getEffect('lfo')
 
 	def switchToLFO(self):
 		""" Method to switch to the LFO effect """
-		if self.noEffect.isOutputting():
-			self.noEffect.disable()
-		elif self.distortion.isOutputting():
-			self.distortion.disable()
-		elif self.wah.isOutputting():
-			self.wah.disable()
-		elif self.chords.isOutputting():
-			self.chords.disable()
-		elif self.sine.isOutputting():
-			self.sine.disable()
-		elif self.blit.isOutputting():
-			self.blit.disable()
-		elif self.superSaw.isOutputting():
-			self.superSaw.disable()
-		elif self.phasor.isOutputting():
-			self.phasor.disable()
-		elif self.rc.isOutputting():
-			self.rc.disable()
+		self.switchTo('lfo')
 
-		self.disableReverb()
-		self.reverb.reset()
-		self.disableDelay()
-		self.delay.reset()
-		self.lfo.reset()
-		self.lfo.enable()
-		self.rec = TableFill(self.lfo.getSignal(), self.t)
+	def getPolySynth(self):
+		""" Method to get the Poly Synth effect """
+		return self.getEffect('poly')
+
+	def switchToPolySynth(self):
+		""" Method to switch to the Poly Synth effect """
+		self.switchTo('poly')
 
 	def getReverb(self):
 		""" Method to get the Reverb signal """
-		return self.reverb
+		return self.getEffect('reverb')
 
 	def enableReverb(self):
-		""" Method to enable the Reverb on the active effect """
-		if self.noEffect.isOutputting():
-			self.reverb.enable(self.noEffect.getSignal())
-		elif self.distortion.isOutputting():
-			self.reverb.enable(self.distortion.getSignal())
-		elif self.wah.isOutputting():
-			self.reverb.enable(self.wah.getSignal())
-		elif self.chords.isOutputting():
-			self.reverb.enable(self.chords.getSignal())
-		elif self.sine.isOutputting():
-			self.reverb.enable(self.sine.getSignal())
-		elif self.blit.isOutputting():
-			self.reverb.enable(self.blit.getSignal())
-		elif self.superSaw.isOutputting():
-			self.reverb.enable(self.superSaw.getSignal())
-		elif self.phasor.isOutputting():
-			self.reverb.enable(self.phasor.getSignal())
-		elif self.rc.isOutputting():
-			self.reverb.enable(self.rc.getSignal())
-		elif self.lfo.isOutputting():
-			self.reverb.enable(self.lfo.getSignal())
+		""" Method to enable the Reverb on the active effect, it does nothing while the Reverb is a stage of the chain """
+		with self.lock:
+			if self.inChain('reverb'):
+				return
+			self.detachFromChain('reverb')
+			# the streams of the output, as the Recorder taps it: pyo effects can't take the Mixer object as input
+			self.getReverb().enable(self.mixer[0])
 
 	def disableReverb(self):
 		""" Method to disable the Reverb """
-		self.reverb.disable()
+		with self.lock:
+			if self.isBuilt('reverb') and not self.inChain('reverb'):
+				self.effects['reverb'].disable()
+				self.idleSince['reverb'] = time.time()
 
 	def getDelay(self):
 		""" Method to get the Delay signal """
-		return self.delay
+		return self.getEffect('delay')
 
 	def enableDelay(self):
-		""" Method to enable the Delay on the active effect """
-		if self.noEffect.isOutputting():
-			self.delay.enable(self.noEffect.getSignal())
-		elif self.distortion.isOutputting():
-			self.delay.enable(self.distortion.getSignal())
-		elif self.wah.isOutputting():
-			self.delay.enable(self.wah.getSignal())
-		elif self.chords.isOutputting():
-			self.delay.enable(self.chords.getSignal())
-		elif self.sine.isOutputting():
-			self.delay.enable(self.sine.getSignal())
-		elif self.blit.isOutputting():
-			self.delay.enable(self.blit.getSignal())
-		elif self.superSaw.isOutputting():
-			self.delay.enable(self.superSaw.getSignal())
-		elif self.phasor.isOutputting():
-			self.delay.enable(self.phasor.getSignal())
-		elif self.rc.isOutputting():
-			self.delay.enable(self.rc.getSignal())
-		elif self.lfo.isOutputting():
-			self.delay.enable(self.lfo.getSignal())
+		""" Method to enable the Delay on the active effect, it does nothing while the Delay is a stage of the chain """
+		with self.lock:
+			if self.inChain('delay'):
+				return
+			self.detachFromChain('delay')
+			self.getDelay().enable(self.mixer[0])
 
 	def disableDelay(self):
 		""" Method to disable the Delay """
-		self.delay.disable()
+		with self.lock:
+			if self.isBuilt('delay') and not self.inChain('delay'):
+				self.effects['delay'].disable()
+				self.idleSince['delay'] = time.time()
+
+	def isSendOutput(self, name):
+		""" Method to get if a send effect ('reverb' or 'delay') is output on top of the main effect """
+		return self.isBuilt(name) and self.effects[name].isPlaying() and not self.inChain(name)
+
+	def getChain(self):
+		""" Method to get the chain of effects """
+		return self.getEffect('chain')
+
+	def switchToChain(self):
+		""" Method to switch to the chain of effects """
+		self.switchTo('chain')
+
+	def setChain(self, names):
+		""" Method to set the effects processed in series by the chain, in order. Only the links that changed are rewired """
+		for name in names:
+			if name not in self.factories or name == 'chain':
+				raise ValueError('%s is not an effect that can be chained' % name)
+		with self.lock:
+			self.getChain().setOrder(names)
+			if self.active == 'chain':
+				self.updateAnalysis()
 
-	def process(self):
-		"""Fill the array with last samples of current input or current effect."""
-		self.samples = self.t.getTable()
+	def setChainBypass(self, name, bypassed):
+		""" Method to skip an effect of the chain, or to process it again """
+		with self.lock:
+			self.getChain().setBypass(name, bypassed)
+			if self.active == 'chain':
+				self.updateAnalysis()
+
+	def inChain(self, name):
+		""" Method to get if an effect is processed by the chain """
+		return self.isBuilt('chain') and self.effects['chain'].uses(name)
+
+	def detachFromChain(self, name):
+		""" Method to make an effect that has been a stage of the chain read the input again """
+		if name != 'chain' and self.isBuilt('chain'):
+			self.effects['chain'].detach(name)
+
+	def setParam(self, effect, name, value):
+		""" Method to set a parameter of an effect by name, e.g. setParam('distortion', 'drive', 0.5).
+		The value is written at the next buffer: moving a slider sets each parameter at most once per buffer """
+		# the effect is built here, never in the audio thread
+		self.getEffect(effect)
+		self.pendingParams[(effect, name)] = value
+
+	def requestParam(self, effect, name, value):
+		""" Method to set a parameter like setParam, from the thread of the server, which must not build effects.
+		It returns False, without setting it, if the effect isn't built """
+		if not self.isBuilt(effect):
+			return False
+		self.pendingParams[(effect, name)] = value
+		return True
+
+	def getParam(self, effect, name):
+		""" Method to get a parameter of an effect by name, including a value not written yet """
+		if (effect, name) in self.pendingParams:
+			return self.pendingParams[(effect, name)]
+		preset = self.pendingPreset
+		if preset is not None and preset['params'].get(effect, {}).get(name) is not None:
+			return preset['params'][effect][name]
+		return self.getEffect(effect).get(name)
+
+	def flushParams(self):
+		""" Method to write the parameters set since the last buffer, it runs in the callback """
+		# popitem is atomic: a value set meanwhile is either written now or at the next buffer, never lost
+		while self.pendingParams:
+			(effect, name), value = self.pendingParams.popitem()
+			# the effect may have been released meanwhile by another thread
+			target = self.effects.get(effect)
+			if target is not None:
+				target.set(name, value)
+
+	def requestSwitch(self, name, stage=False):
+		""" Method to switch to a main effect at the next buffer, from the thread of the server (e.g. MIDI), which must never wait.
+		It returns False, without switching, if the effect isn't staged (see stageEffect) or if another thread holds the lock.
+		With stage, the effect is staged first and the lock is waited for: it must not be used from the thread of the server """
+		if stage:
+			with self.lock:
+				self.stageEffect(name)
+				self.pendingSwitch = name
+				return True
+		if not self.lock.acquire(blocking=False):
+			return False
+		try:
+			if not self.isStaged(name):
+				return False
+			self.pendingSwitch = name
+			return True
+		finally:
+			self.lock.release()
+
+	def isReverbEnabled(self):
+		""" Method to get if the Reverb is enabled on the active effect, or will be by the preset not applied yet """
+		preset = self.pendingPreset
+		if preset is not None:
+			return preset['sends']['reverb']
+		return self.isBuilt('reverb') and self.effects['reverb'].isPlaying() and not self.inChain('reverb')
+
+	def isDelayEnabled(self):
+		""" Method to get if the Delay is enabled on the active effect, or will be by the preset not applied yet """
+		preset = self.pendingPreset
+		if preset is not None:
+			return preset['sends']['delay']
+		return self.isBuilt('delay') and self.effects['delay'].isPlaying() and not self.inChain('delay')
+
+	def getPreset(self):
+		""" Method to get the state of the model as a preset: the active effect (with the stages of the chain),
+		the parameters of the effects heard and the state of the Reverb and of the Delay. It can be saved as JSON """
+		preset = {'effect': self.active, 'params': {}, 'sends': {'reverb': self.isReverbEnabled(), 'delay': self.isDelayEnabled()}}
+		heard = [self.active] + list(SEND_EFFECTS)
+		if self.active == 'chain':
+			chain = self.getChain()
+			preset['chain'] = {'order': chain.getOrder(), 'bypassed': sorted(chain.bypassed)}
+			heard += chain.getOrder()
+		for name in heard:
+			effect = self.getEffect(name)
+			if hasattr(effect, 'getParamNames'):
+				preset['params'][name] = {param: effect.get(param) for param in effect.getParamNames()}
+		return preset
+
+	def getPresetNames(self, preset):
+		""" Method to get the names of the effects used by a preset """
+		return [preset['effect']] + list(preset['params']) + list(preset.get('chain', {}).get('order', []))
+
+	def stagePreset(self, preset):
+		""" Method to build, paused, the effects used by a preset, so that recalling it only switches and sets them """
 		with self.lock:
-			self.arr[1:] = self.arr[:-1]
-			self.arr[0] = self.samples[-1]
-			if self.stop:
-				return None
+			for name in self.getPresetNames(preset):
+				self.getEffect(name)
+			self.stageEffect(preset['effect'])
+			# e.g. the convolution of an impulse response, so that the callback only swaps it in
+			for name, params in preset['params'].items():
+				effect = self.effects[name]
+				if hasattr(effect, 'stage'):
+					for param, value in params.items():
+						if value is not None and param in effect.getParamNames():
+							effect.stage(param, value)
+
+	def isPresetStaged(self, preset):
+		""" Method to get if the effects used by a preset are built, its main effect is plugged into the mixer
+		and its parameters are prepared (see stagePreset) """
+		if not all(self.isBuilt(name) for name in self.getPresetNames(preset)) or not self.isStaged(preset['effect']):
+			return False
+		for name, params in preset['params'].items():
+			effect = self.effects[name]
+			if hasattr(effect, 'isStaged') and not all(effect.isStaged(param, value) for param, value in params.items()):
+				return False
+		return True
+
+	def requestPreset(self, preset):
+		""" Method to recall a preset at the next buffer, from the thread of the server (e.g. MIDI), which must never wait.
+		It returns False, without recalling it, if the preset isn't staged (see stagePreset) or if another thread holds the lock """
+		if not self.lock.acquire(blocking=False):
+			return False
+		try:
+			if not self.isPresetStaged(preset):
+				return False
+			self.pendingPreset = preset
+			return True
+		finally:
+			self.lock.release()
+
+	def recallPreset(self, preset):
+		""" Method to recall a preset, from any thread but the one of the server. The effects are staged now,
+		the preset is applied as a whole by the callback, before the next buffer """
+		with self.lock:
+			self.stagePreset(preset)
+			self.pendingPreset = preset
+			self.releaseIdleEffects()
+
+	def applyPreset(self, preset):
+		""" Method to apply a staged preset, it runs in the callback """
+		if 'chain' in preset:
+			chain = self.getChain()
+			chain.bypassed = set(preset['chain']['bypassed'])
+			chain.setOrder(preset['chain']['order'])
+		if preset['effect'] != self.active:
+			self.applySwitch(preset['effect'])
+		for name, params in preset['params'].items():
+			effect = self.getEffect(name)
+			names = effect.getParamNames()
+			for param, value in params.items():
+				# the chord of the Harmonizer is None when its intervals are custom,
+				# a preset saved with the other reverb has parameters this one doesn't have
+				if value is not None and param in names:
+					effect.set(param, value)
+		if preset['sends']['reverb']:
+			self.enableReverb()
+		else:
+			self.disableReverb()
+		if preset['sends']['delay']:
+			self.enableDelay()
+		else:
+			self.disableDelay()
+		self.updateAnalysis()
+
+	def countPyoObjects(self):
+		""" Method to get the number of pyo objects alive in the interpreter, useful to find objects leaking in the audio graph """
+		gc.collect()
+		return sum(1 for obj in gc.get_objects() if isinstance(obj, PyoObjectBase))
+
+	def process(self):
+		"""Append the last block of samples of current input or current effect to the ring buffer,
+		then apply the parameters, the preset and the switch pending and pause the effects that have faded out."""
+		if self.stop:
+			return None
+		start = time.perf_counter()
+		cpu = time.thread_time()
+		if self.lastCallback is not None:
+			load = (cpu - self.lastCallback) / self.deadline
+			self.loadHistogram[min(int(load * LOAD_BINS / LOAD_RANGE), LOAD_BINS)] += 1
+			if load > 1:
+				self.overruns += 1
+			self.lastLoad = load
+		self.lastCallback = cpu
+
+		# the callback runs before the server computes a new block, so t holds the whole previous block
+		self.ring.write(self.arr)
+		self.samples += len(self.arr)
+		self.flushParams()
+		# another thread holding the lock is switching: its switch is heard at the next buffer, so is the pending one
+		if self.lock.acquire(blocking=False):
+			try:
+				preset = self.pendingPreset
+				if preset is not None:
+					self.pendingPreset = None
+					self.applyPreset(preset)
+				name = self.pendingSwitch
+				if name is not None:
+					self.pendingSwitch = None
+					self.applySwitch(name)
+				self.pauseFaded()
+			finally:
+				self.lock.release()
+		if self.samples >= 0:
+			for listener in self.blockListeners:
+				listener.processBlock(self.samples)
+
+		elapsed = time.perf_counter() - start
+		self.callbackStats[0] += 1
+		self.callbackStats[1] += elapsed
+		self.callbackStats[2] = max(self.callbackStats[2], elapsed)
 		return None
 
-	def getFrames(self):
-		"""Get array of samples"""
-		with self.lock:
-			return self.arr
+	def getBufferDuration(self):
+		"""Get the duration of a buffer, in seconds: the time the server has to compute it"""
+		return self.server.getBufferSize() / self.server.getSamplingRate()
+
+	def measureRoundTrip(self, threshold=0.1, timeout=1.0):
+		"""Measure the round-trip latency, in seconds, by sending a click to the output and timing its arrival at the input.
+		The output must be looped back to the input (cable or loopback device). It returns None if no click came back before timeout"""
+		click = Trig()
+		detector = Thresh(self.input, threshold=threshold)
+		# sample accurate: the timer starts with the click and stops when the input crosses the threshold
+		timer = Timer(detector, click)
+		click.out()
+		time.sleep(timeout)
+		elapsed = timer.get()
+		self.roundTrip = elapsed if 0 < elapsed < timeout else None
+		return self.roundTrip
+
+	def getLatencyReport(self):
+		"""Get the server settings, the nominal and measured latencies (in seconds) and the load of the callback,
+		as a fraction of the buffer duration"""
+		calls, total, longest = self.callbackStats
+		deadline = self.deadline
+		return {
+			'audio': self.audio,
+			'bufferSize': self.server.getBufferSize(),
+			'sr': self.server.getSamplingRate(),
+			'bufferLatency': deadline,
+			'nominalRoundTrip': 2 * deadline,
+			'measuredRoundTrip': self.roundTrip,
+			'callbackLoad': total / calls / deadline if calls else 0.0,
+			'callbackPeakLoad': longest / deadline,
+			'overruns': self.overruns,
+		}
+
+	def getLoad(self):
+		"""Get the load of the last buffer, as a fraction of the deadline"""
+		return self.lastLoad
+
+	def getLoadHistogram(self, out=None):
+		"""Copy the load histogram into out (allocated if not given). Bin i counts the buffers whose load is
+		between i and i + 1 times LOAD_RANGE / LOAD_BINS, the last bin counts the buffers above LOAD_RANGE"""
+		if out is None:
+			out = np.empty_like(self.loadHistogram)
+		np.copyto(out, self.loadHistogram)
+		return out
+
+	def getOverruns(self):
+		"""Get the number of buffers that missed their deadline"""
+		return self.overruns
+
+	def resetLoadStats(self):
+		"""Method to clear the load histogram, the overrun count and the callback statistics"""
+		self.loadHistogram[:] = 0
+		self.overruns = 0
+		self.callbackStats = [0, 0.0, 0.0]
+		self.lastCallback = None
+		self.lastLoad = 0.0
+
+	def getFrames(self, n=None, out=None):
+		"""Get a consistent copy of the last n samples, by default all the samples in the ring buffer.
+		It never blocks the audio callback. Pass a preallocated out array to avoid allocating a new one.
+		It returns None if the callback kept interrupting the copy: keep the previous frame"""
+		return self.ring.snapshot(n, out)
+
+	def getFrameCount(self):
+		"""Get the number of samples written into the ring buffer since the model started"""
+		return self.ring.written
+
+	def getWaveformSize(self):
+		"""Get the number of samples kept for the waveform"""
+		return self.ring.capacity
@@ -1,7 +1,13 @@
 import json
+import os
+import time
 from PyQt5.QtGui import QFont
-from PyQt5.QtWidgets import (QListWidgetItem, QFrame, QSlider, QListWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QCheckBox, QGroupBox, QDesktopWidget)
-from MyWidgets import (EffectWidget, MainEffectLayout, ReverbLayout, DelayLayout, WaveformWidget)
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QAbstractItemView, QComboBox, QInputDialog, QListWidgetItem, QFrame, QSlider, QListWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QCheckBox, QGroupBox, QDesktopWidget)
+from MyWidgets import (EffectWidget, MainEffectLayout, ReverbLayout, DelayLayout, WaveformWidget, LoadMeterWidget, SpectrumWidget)
+from Glovox import MAIN_EFFECTS, CHAIN_ONLY_EFFECTS
+from Presets import PresetStore
+from Recorder import Recorder
 
 ### THE GUI
 
@@ -12,6 +18,13 @@ class MainWindow(QWidget):
             model         reference to the model
             size          dimension of the computer screen
             effectsFile   contains descriptions of each effect
+            effectNames   names of the effects in the model, keyed by the name shown in the effect list
+            chainOnly     names shown in the effect list of the effects that can only be stages of the chain (the sends)
+            chainMode     checkbox processing the checked effects of the list in series, in the order of the list
+            presets       presets saved in presets.json
+            presetList    names of the presets
+            recordButton  button starting and stopping the recording of the output into the recordings folder
+            recorder      recorder running, None when not recording
     """
 	def __init__(self, model, size):
 		""" Init Method """
@@ -20,6 +33,10 @@ class MainWindow(QWidget):
 		self.model = model
 		self.size = size
 		self.effectsFile = json.load(open('effects.json'))
+		self.effectNames = {label: name for name, label in MAIN_EFFECTS + CHAIN_ONLY_EFFECTS}
+		self.chainOnly = [label for name, label in CHAIN_ONLY_EFFECTS]
+		self.presets = PresetStore('presets.json')
+		self.recorder = None
 
 		self.init_ui()
 		self.centerOnScreen()
@@ -72,6 +89,16 @@ class MainWindow(QWidget):
 		lfo = QListWidgetItem('LF Oscillator')
 		lfo.setToolTip(self.effectsFile["effects"][9]["LF Oscillator"])
 
+		poly = QListWidgetItem('Poly Synth')
+		poly.setToolTip(self.effectsFile["effects"][10]["Poly Synth"])
+
+		# the sends can be stages of the chain, e.g. Distortion -> Auto-Wah -> Delay -> Reverb
+		reverb = QListWidgetItem('Reverb')
+		reverb.setToolTip(self.effectsFile["effects"][11]["Reverb"])
+
+		delay = QListWidgetItem('Delay')
+		delay.setToolTip(self.effectsFile["effects"][12]["Delay"])
+
 		self.effectList.addItem(noEff)
 		self.effectList.addItem(dist)
 		self.effectList.addItem(wah)
@@ -82,21 +109,51 @@ class MainWindow(QWidget):
 		self.effectList.addItem(phasor)
 		self.effectList.addItem(rc)
 		self.effectList.addItem(lfo)
+		self.effectList.addItem(poly)
+		self.effectList.addItem(reverb)
+		self.effectList.addItem(delay)
 		self.effectList.setCurrentItem(self.effectList.item(0))
 
+		# the effects can be dragged to reorder the chain, the checked ones are its stages
+		self.effectList.setDragDropMode(QAbstractItemView.InternalMove)
+		for row in range(self.effectList.count()):
+			item = self.effectList.item(row)
+			item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+			item.setCheckState(Qt.Unchecked)
+		self.chainMode = QCheckBox('Chain the checked effects')
+
+		# presets: the whole state of the model is saved and recalled at once
+		self.presetList = QComboBox()
+		self.presetList.addItems(self.presets.getNames())
+		savePreset = QPushButton('Save preset')
+		recallPreset = QPushButton('Recall preset')
+		presetButtons = QHBoxLayout()
+		presetButtons.addWidget(savePreset)
+		presetButtons.addWidget(recallPreset)
+		self.recordButton = QPushButton('Record')
+		self.recordButton.setCheckable(True)
+
 		effectListLayout = QVBoxLayout()
 		effectListLayout.addWidget(self.effectList)
+		effectListLayout.addWidget(self.chainMode)
+		effectListLayout.addWidget(self.presetList)
+		effectListLayout.addLayout(presetButtons)
+		effectListLayout.addWidget(self.recordButton)
 
 		effectListBox = QGroupBox('Effects')
 		effectListBox.setMaximumWidth(300)
 		effectListBox.setMinimumWidth(150)
 		effectListBox.setLayout(effectListLayout)
 
-		#Box displaying the waveform of the active effect
+		#Box displaying the waveform and the spectrum of the active effect
 		self.waveform = WaveformWidget(self.model)
-		analyzerLayout = QVBoxLayout()
+		self.spectrum = SpectrumWidget(self.model)
+		self.loadMeter = LoadMeterWidget(self.model)
+		analyzerLayout = QHBoxLayout()
 		analyzerLayout.addWidget(self.waveform)
-		analyzerBox = QGroupBox('Waveform')
+		analyzerLayout.addWidget(self.loadMeter)
+		analyzerLayout.addWidget(self.spectrum)
+		analyzerBox = QGroupBox('Waveform and Spectrum')
 		analyzerBox.setMinimumHeight(350)
 		analyzerBox.setMaximumHeight(500)
 		analyzerBox.setLayout(analyzerLayout)
@@ -149,6 +206,12 @@ class MainWindow(QWidget):
 
 		#Connecting widgets
 		self.effectList.itemSelectionChanged.connect(self.changeEffect)
+		self.effectList.itemChanged.connect(self.updateChain)
+		self.effectList.model().rowsMoved.connect(self.updateChain)
+		self.chainMode.stateChanged.connect(self.changeChainMode)
+		savePreset.clicked.connect(self.savePreset)
+		recallPreset.clicked.connect(self.recallPreset)
+		self.recordButton.toggled.connect(self.record)
 
 	def centerOnScreen(self):
 		""" Method to center the GUI on the user screen """
@@ -160,51 +223,112 @@ class MainWindow(QWidget):
 	def closeEvent(self, event):
 		""" Overloading of close event. Overloading has been necessary to stop Pyo's Server """
 		self.model.switchToNoEff()# Necessary, because sometimes the app doesn't stop when we close it
+		self.spectrum.stop()
+		self.loadMeter.stop()
+		if self.recorder is not None:
+			self.recorder.stop()
 		self.model.close()
 
 	def changeEffect(self):
-		""" Method to change the effect"""
-		if self.effectList.currentItem().text() == 'No Effect':
-			self.effect.getLayout().changeEffect('No Effect')
-			self.model.switchToNoEff()
-		elif self.effectList.currentItem().text() == 'Distortion':
-			self.effect.getLayout().changeEffect('Distortion')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToDistortion()
-
-		elif self.effectList.currentItem().text() == 'Auto-Wah':
-			self.effect.getLayout().changeEffect('Auto-Wah')
-			self.model.switchToWah()
-
-		elif self.effectList.currentItem().text() == 'Harmonizer':
-			self.effect.getLayout().changeEffect('Harmonizer')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToChords()
-
-		elif self.effectList.currentItem().text() == 'Sine Oscillator':
-			self.effect.getLayout().changeEffect('Sine Oscillator')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToSine()
-		elif self.effectList.currentItem().text() == 'BLIT':
-			self.effect.getLayout().changeEffect('BLIT')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToBlit()
-		elif self.effectList.currentItem().text() == 'Super Saw':
-			self.effect.getLayout().changeEffect('Super Saw')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToSuperSaw()
-		elif self.effectList.currentItem().text() == 'Phasor':
-			self.effect.getLayout().changeEffect('Phasor')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToPhasor()
-		elif self.effectList.currentItem().text() == 'RC Oscillator':
-			self.effect.getLayout().changeEffect('RC Oscillator')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToRC()
-		elif self.effectList.currentItem().text() == 'LF Oscillator':
-			self.effect.getLayout().changeEffect('LF Oscillator')
-			self.effect.getLayout().currentWidget().reset()
-			self.model.switchToLFO()
+		""" Method to change the effect, in chain mode it only shows the parameters of the selected effect.
+		The sends are not main effects: selecting them only matters in chain mode, their parameters are in their own boxes """
+		effect = self.effectList.currentItem().text()
+		if effect in self.chainOnly:
+			return
+		self.effect.getLayout().changeEffect(effect)
+		if self.chainMode.isChecked():
+			return
+		widget = self.effect.getLayout().currentWidget()
+		if hasattr(widget, 'reset'):
+			widget.reset()
+		self.model.switchTo(self.effectNames[effect])
 
 		self.rev.getLayout().reset()
-		self.delay.getLayout().reset()
\ No newline at end of file
+		self.delay.getLayout().reset()
+
+	def getChainOrder(self):
+		""" Method to get the names of the checked effects, in the order of the list """
+		items = [self.effectList.item(row) for row in range(self.effectList.count())]
+		return [self.effectNames[item.text()] for item in items if item.checkState() == Qt.Checked]
+
+	def updateChain(self, *args):
+		""" Method to send the order of the chain to the model, after an effect has been checked or moved """
+		if self.chainMode.isChecked():
+			self.model.setChain(self.getChainOrder())
+
+	def changeChainMode(self):
+		""" Method to switch between the chain of the checked effects and the selected effect """
+		if self.chainMode.isChecked():
+			self.model.setChain(self.getChainOrder())
+			self.model.switchToChain()
+		elif self.effectList.currentItem().text() not in self.chainOnly:
+			self.model.switchTo(self.effectNames[self.effectList.currentItem().text()])
+		else:
+			self.model.switchToNoEff()
+
+	def savePreset(self):
+		""" Method to save the state of the model as a preset """
+		name, accepted = QInputDialog.getText(self, 'Save preset', 'Preset name:', text=self.presetList.currentText())
+		if not accepted or not name:
+			return
+		self.presets.save(name, self.model.getPreset())
+		if self.presetList.findText(name) < 0:
+			self.presetList.addItem(name)
+		self.presetList.setCurrentText(name)
+
+	def recallPreset(self):
+		""" Method to recall the selected preset and show its effect and parameters """
+		name = self.presetList.currentText()
+		if not name:
+			return
+		preset = self.presets.get(name)
+		self.model.recallPreset(preset)
+		self.showPreset(preset)
+
+	def showPreset(self, preset):
+		""" Method to show a preset in the effect list and in the parameter boxes, without changing the model """
+		labels = {name: label for label, name in self.effectNames.items()}
+		self.effectList.blockSignals(True)
+		self.chainMode.blockSignals(True)
+
+		chain = preset.get('chain')
+		self.chainMode.setChecked(chain is not None)
+		if chain is not None:
+			# the stages go to the top of the list, in order, and are the only checked items
+			stages = [name for name in chain['order'] if name in labels]
+			for row, name in enumerate(stages):
+				item = self.effectList.findItems(labels[name], Qt.MatchExactly)[0]
+				self.effectList.insertItem(row, self.effectList.takeItem(self.effectList.row(item)))
+			for row in range(self.effectList.count()):
+				item = self.effectList.item(row)
+				item.setCheckState(Qt.Checked if self.effectNames[item.text()] in chain['order'] else Qt.Unchecked)
+			shown = [name for name in stages if labels[name] not in self.chainOnly]
+			selected = labels[shown[0]] if shown else self.effectList.currentItem().text()
+		else:
+			selected = labels[preset['effect']]
+		self.effectList.setCurrentItem(self.effectList.findItems(selected, Qt.MatchExactly)[0])
+
+		self.chainMode.blockSignals(False)
+		self.effectList.blockSignals(False)
+
+		if selected not in self.chainOnly:
+			self.effect.getLayout().changeEffect(selected)
+		for name in preset['params']:
+			if name in labels and labels[name] not in self.chainOnly:
+				widget = self.effect.getLayout().widgets[labels[name]]
+				if hasattr(widget, 'refresh'):
+					widget.refresh()
+		self.rev.getLayout().refresh()
+		self.delay.getLayout().refresh()
+
+	def record(self, checked):
+		""" Method to start recording the output into a new file of the recordings folder, or to stop recording """
+		if checked:
+			os.makedirs('recordings', exist_ok=True)
+			self.recorder = Recorder(self.model, os.path.join('recordings', time.strftime('glovox-%Y%m%d-%H%M%S')))
+			self.recorder.start()
+			self.recordButton.setText('Stop recording')
+		else:
+			self.recorder.stop()
+			self.recorder = None
+			self.recordButton.setText('Record')
@@ -0,0 +1,118 @@
+from pyo import *
+from Glovox import MAIN_EFFECTS
+import queue
+import threading
+
+# continuous controllers mapped by default: controller number -> (effect, parameter, value at 0, value at 127)
+DEFAULT_CONTROLS = {
+	1: ('distortion', 'drive', 0.0, 1.0),
+	7: ('reverb', 'bal', 0.0, 1.0),
+	11: ('delay', 'feedback', 0.0, 0.95),
+	12: ('superSaw', 'detune', 0.0, 1.0),
+	13: ('blit', 'harms', 1.0, 100.0),
+}
+
+class MidiControl():
+	""" MIDI control of the model, e.g. from a foot controller.
+		Program Change selects a main effect or recalls a preset, Control Change sets any parameter of an effect.
+		The messages are handled by a RawMidi object, in the thread of the server: they never go through the Qt event loop.
+		Parameters go through Glovox.setParam, so that they are smoothed and written once per buffer like the sliders,
+		effect switches and presets are queued and applied by the callback, before the next buffer.
+		The effects are built on their first use, as with the GUI: a message for an effect that isn't built
+		(or that has been released by the idle timeout) is handed to the stager thread, which builds it and queues it,
+		so that the thread of the server never builds pyo objects nor waits for the model.
+
+		Attributes:
+			model      reference to the model
+			channel    MIDI channel listened to (1 to 16), None to listen to every channel
+			programs   effect name or preset recalled by each program number
+			controls   (effect, parameter, value at 0, value at 127) set by each controller number
+			requests   messages waiting for the stager thread: ('switch', name), ('preset', preset) or ('param', effect, name, value)
+			stager     thread building the effects of the messages in requests
+			listener   RawMidi object calling handle, None if the messages are only injected
+	"""
+	def __init__(self, model, channel=None, programs=None, controls=None, listen=True):
+		""" Init Method """
+		self.model = model
+		self.channel = channel
+		self.programs = {}
+		self.controls = {}
+		# by default the programs select the main effects, in the order of the effect list
+		for program, (name, label) in enumerate(MAIN_EFFECTS):
+			self.mapProgram(program, name)
+		for program, target in (programs or {}).items():
+			self.mapProgram(program, target)
+		for controller, (effect, name, low, high) in dict(DEFAULT_CONTROLS, **(controls or {})).items():
+			self.mapControl(controller, effect, name, low, high)
+		self.requests = queue.Queue()
+		self.stager = threading.Thread(target=self.run, daemon=True)
+		self.stager.start()
+		self.listener = RawMidi(self.handle) if listen else None
+
+	def mapProgram(self, program, target):
+		""" Method to make a program number select an effect (by name) or recall a preset (a dict from Glovox.getPreset) """
+		if not isinstance(target, dict) and target not in self.model.factories:
+			raise ValueError('unknown effect %s' % target)
+		self.programs[program] = target
+
+	def mapControl(self, controller, effect, name, low=0.0, high=1.0):
+		""" Method to make a controller number set a parameter of an effect, from low (value 0) to high (value 127) """
+		if effect not in self.model.factories:
+			raise ValueError('unknown effect %s' % effect)
+		self.controls[controller] = (effect, name, low, high)
+
+	def handle(self, status, data1, data2):
+		""" Method called for every MIDI message, in the thread of the server """
+		if self.channel is not None and (status & 0x0F) != self.channel - 1:
+			return
+		kind = status & 0xF0
+		if kind == 0xC0 and data1 in self.programs:
+			target = self.programs[data1]
+			if isinstance(target, dict):
+				if not self.model.requestPreset(target):
+					self.requests.put(('preset', target))
+			elif not self.model.requestSwitch(target):
+				self.requests.put(('switch', target))
+		elif kind == 0xB0 and data1 in self.controls:
+			effect, name, low, high = self.controls[data1]
+			value = low + (high - low) * data2 / 127
+			if not self.model.requestParam(effect, name, value):
+				self.requests.put(('param', effect, name, value))
+
+	def run(self):
+		""" Method run by the stager thread, it builds the effects of the messages the thread of the server couldn't handle """
+		while True:
+			request = self.requests.get()
+			if request is None:
+				self.requests.task_done()
+				return
+			if request[0] == 'switch':
+				self.model.requestSwitch(request[1], stage=True)
+			elif request[0] == 'preset':
+				self.model.recallPreset(request[1])
+			else:
+				self.model.setParam(*request[1:])
+			self.requests.task_done()
+
+	def waitStaged(self):
+		""" Method to wait until the stager thread has handled every message handed to it """
+		self.requests.join()
+
+	def inject(self, status, data1, data2=0):
+		""" Method to handle a message as if it came from a MIDI device, to drive the model without one """
+		self.handle(status, data1, data2)
+
+	def programChange(self, program, channel=1):
+		""" Method to inject a Program Change message """
+		self.inject(0xC0 | (channel - 1), program)
+
+	def controlChange(self, controller, value, channel=1):
+		""" Method to inject a Control Change message """
+		self.inject(0xB0 | (channel - 1), controller, value)
+
+	def stop(self):
+		""" Method to stop listening to MIDI messages """
+		if self.listener is not None:
+			self.listener.stop()
+		self.requests.put(None)
+		self.stager.join()
@@ -1,13 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtWidgets import (QWidget, QStackedLayout, QVBoxLayout, QHBoxLayout, QCheckBox, QGroupBox, QSlider, QLabel, QListWidget, QListWidgetItem)
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from PyQt5.QtGui import QFont, QPainter, QPolygonF, QColor
+from PyQt5.QtCore import Qt, QTimer, QPointF
+from PyQt5.QtWidgets import (QWidget, QStackedLayout, QVBoxLayout, QHBoxLayout, QCheckBox, QComboBox, QGroupBox, QSlider, QLabel, QListWidget, QListWidgetItem)
+from Spectrum import SpectrumAnalyzer
+from Effects import CHORDS, SCALES
+from Glovox import LOAD_BINS, LOAD_RANGE
 
 np.seterr(divide='ignore', invalid='ignore')
 
+# names of the keys of the scale mode of the Harmonizer, from C
+KEY_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
 # MY WIDGETS
 
 class mySlider(QWidget):
@@ -81,6 +84,13 @@ class mySlider(QWidget):
 		""" Method to update the value displayed by the custom slider, according to the QSlider """
 		self.value.setText(str(newValue))
 
+	def setPosition(self, position, newValue):
+		""" Method to move the QSlider and display newValue without setting the parameter in the model """
+		self.slider.blockSignals(True)
+		self.slider.setValue(int(round(position)))
+		self.slider.blockSignals(False)
+		self.updateValue(round(newValue, 2))
+
 class EffectWidget(QGroupBox):
 	""" GroupBox where active effect, reverb or delay parameters will be displayed.
 		
@@ -119,6 +129,8 @@ class MainEffectLayout(QStackedLayout):
 			phasorWidget    reference to Phasor Widget
 			rcWidget        reference to RC OSC widget
 			lfoWidget       reference to LF OSC widget
+			polyWidget      reference to Poly Synth widget
+			widgets         widgets keyed by the name of their effect
 	"""
 	def __init__(self, model):
 		""" Init Method"""
@@ -136,6 +148,7 @@ class MainEffectLayout(QStackedLayout):
 		self.phasorWidget = PhasorWidget(self.model)
 		self.rcWidget = RCOscWidget(self.model)
 		self.lfoWidget = LFOWidget(self.model)
+		self.polyWidget = PolySynthWidget(self.model)
 
 		self.addWidget(self.noEffWidget)
 		self.addWidget(self.distWidget)
@@ -147,29 +160,17 @@ class MainEffectLayout(QStackedLayout):
 		self.addWidget(self.phasorWidget)
 		self.addWidget(self.rcWidget)
 		self.addWidget(self.lfoWidget)
+		self.addWidget(self.polyWidget)
+
+		# widgets keyed by the name of the effect shown in the effect list
+		self.widgets = {'No Effect': self.noEffWidget, 'Distortion': self.distWidget, 'Auto-Wah': self.wahWidget,
+						'Harmonizer': self.chordsWidget, 'Sine Oscillator': self.sineWidget, 'BLIT': self.blitWidget,
+						'Super Saw': self.superSawWidget, 'Phasor': self.phasorWidget, 'RC Oscillator': self.rcWidget,
+						'LF Oscillator': self.lfoWidget, 'Poly Synth': self.polyWidget}
 
 	def changeEffect(self, effect):
 		""" Method to change the effect displayed in the EffectBox """
-		if effect == 'No Effect':
-			self.setCurrentWidget(self.noEffWidget)
-		elif effect == 'Distortion':
-			self.setCurrentWidget(self.distWidget)
-		elif effect == 'Auto-Wah':
-			self.setCurrentWidget(self.wahWidget)
-		elif effect == 'Harmonizer':
-			self.setCurrentWidget(self.chordsWidget)
-		elif effect == 'Sine Oscillator':
-			self.setCurrentWidget(self.sineWidget)
-		elif effect == 'BLIT':
-			self.setCurrentWidget(self.blitWidget)
-		elif effect == 'Super Saw':
-			self.setCurrentWidget(self.superSawWidget)
-		elif effect == 'Phasor':
-			self.setCurrentWidget(self.phasorWidget)
-		elif effect == 'RC Oscillator':
-			self.setCurrentWidget(self.rcWidget)
-		elif effect == 'LF Oscillator':
-			self.setCurrentWidget(self.lfoWidget)
+		self.setCurrentWidget(self.widgets[effect])
 
 	def getEffect(self):
 		""" Method to get the active effectm shown in the EffectBox """
@@ -220,21 +221,28 @@ class DistortionWidget(QWidget):
 
 	def setDrive(self):
 		""" Method to set Drive parameter in the model """
-		self.model.getDistortion().setDrive(self.distDrive.getSlider().value()/1000)
-		self.distDrive.updateValue(round(self.model.getDistortion().getDrive(),2))
+		self.model.setParam('distortion', 'drive', self.distDrive.getSlider().value()/1000)
+		self.distDrive.updateValue(round(self.model.getParam('distortion', 'drive'),2))
 
 	def setLPFSlope(self):
 		""" Method to set Slope parameter in the model  """
-		self.model.getDistortion().setSlope(self.LPFSlope.getSlider().value()/1000)
-		self.LPFSlope.updateValue(round(self.model.getDistortion().getSlope(),2))
+		self.model.setParam('distortion', 'slope', self.LPFSlope.getSlider().value()/1000)
+		self.LPFSlope.updateValue(round(self.model.getParam('distortion', 'slope'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
 		self.distDrive.getSlider().setValue(750)
 		self.LPFSlope.getSlider().setValue(500)
 
-		self.distDrive.updateValue(round(self.model.getDistortion().getDrive(),2))
-		self.LPFSlope.updateValue(round(self.model.getDistortion().getSlope(),2))
+		self.distDrive.updateValue(round(self.model.getParam('distortion', 'drive'),2))
+		self.LPFSlope.updateValue(round(self.model.getParam('distortion', 'slope'),2))
+
+	def refresh(self):
+		""" Method to show the parameters of the model, e.g. after a preset has been recalled """
+		drive = self.model.getParam('distortion', 'drive')
+		slope = self.model.getParam('distortion', 'slope')
+		self.distDrive.setPosition(drive * 1000, drive)
+		self.LPFSlope.setPosition(slope * 1000, slope)
 
 class WahWidget(QWidget):
 	""" Custom Widget related to the effect 'Auto-Wah'. """
@@ -248,6 +256,9 @@ class ChordsWidget(QWidget):
 		Attributes:
 			model       reference to the model
 			chordsList  list of available chords
+			scaleMode   check box making the voices follow the note sung in a scale, instead of playing a chord
+			keyList     key of the scale
+			scaleList   list of available scales
 
 	"""
 	def __init__(self, model):
@@ -258,13 +269,8 @@ class ChordsWidget(QWidget):
 		layout = QVBoxLayout()
 
 		self.chordsList = QListWidget()
-		self.chordsList.addItem(QListWidgetItem('Major'))
-		self.chordsList.addItem(QListWidgetItem('Major 7th'))
-		self.chordsList.addItem(QListWidgetItem('Major 7th-Maj'))
-		self.chordsList.addItem(QListWidgetItem('Minor'))
-		self.chordsList.addItem(QListWidgetItem('Minor 7th'))
-		self.chordsList.addItem(QListWidgetItem('Minor 7th-Maj'))
-		self.chordsList.addItem(QListWidgetItem('Diminished'))
+		for chord in CHORDS:
+			self.chordsList.addItem(QListWidgetItem(chord))
 		self.chordsList.setCurrentItem(self.chordsList.item(0))
 
 		typeFont = QFont(".Lucida Grande UI", 18)
@@ -272,57 +278,59 @@ class ChordsWidget(QWidget):
 
 		layout.addWidget(self.chordsList)
 
+		self.scaleMode = QCheckBox('Follow a scale')
+		self.keyList = QComboBox()
+		self.keyList.addItems(KEY_NAMES)
+		self.scaleList = QComboBox()
+		self.scaleList.addItems(list(SCALES))
+		scaleLayout = QHBoxLayout()
+		scaleLayout.addWidget(self.scaleMode)
+		scaleLayout.addWidget(self.keyList)
+		scaleLayout.addWidget(self.scaleList)
+		layout.addLayout(scaleLayout)
+
 		self.setLayout(layout)
 
 		self.chordsList.itemSelectionChanged.connect(self.changeChords)
+		self.scaleMode.stateChanged.connect(self.changeScale)
+		self.keyList.currentIndexChanged.connect(self.changeScale)
+		self.scaleList.currentIndexChanged.connect(self.changeScale)
 
 	def changeChords(self):
-		""" Method to change the chords in the model """
-		if self.chordsList.currentItem().text() == 'Major':
-			self.model.getChords().setMajor()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-
-		elif self.chordsList.currentItem().text() == 'Major 7th':
-			self.model.getChords().setMajor7th()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-
-		elif self.chordsList.currentItem().text() == 'Major 7th-Maj':
-			self.model.getChords().setMajor7thMaj()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-
-		elif self.chordsList.currentItem().text() == 'Minor':
-			self.model.getChords().setMinor()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-
-		elif self.chordsList.currentItem().text() == 'Minor 7th':
-			self.model.getChords().setMinor7th()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-
-		elif self.chordsList.currentItem().text() == 'Minor 7th-Maj':
-			self.model.getChords().setMinor7thMaj()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-
-		elif self.chordsList.currentItem().text() == 'Diminished':
-			self.model.getChords().setDiminished()
-			self.model.updateTableChords()
-			self.model.getReverb().setInput(self.model.getChords().getSignal())
-			self.model.getDelay().setInput(self.model.getChords().getSignal())
-			
+		""" Method to change the chords in the model, it leaves the scale mode """
+		self.scaleMode.blockSignals(True)
+		self.scaleMode.setChecked(False)
+		self.scaleMode.blockSignals(False)
+		self.model.setHarmonizerChord(self.chordsList.currentItem().text())
+
+	def changeScale(self):
+		""" Method to enter the scale mode in the model, or to leave it for the selected chord """
+		if self.scaleMode.isChecked():
+			self.model.setHarmonizerScale(self.keyList.currentIndex(), self.scaleList.currentText())
+		elif self.sender() is self.scaleMode:
+			self.model.setHarmonizerChord(self.chordsList.currentItem().text())
+
 	def reset(self):
-		""" Method to reset the active chord """
-		self.chordsList.setCurrentItem(self.chordsList.item(0))
+		""" Method to reset the active chord, the scale mode of the model is kept """
+		if self.model.getParam('chords', 'scaleMode') is None:
+			self.chordsList.setCurrentItem(self.chordsList.item(0))
+
+	def refresh(self):
+		""" Method to select the chord or the scale of the model, e.g. after a preset has been recalled """
+		chord = self.model.getParam('chords', 'chord')
+		if chord in CHORDS:
+			self.chordsList.blockSignals(True)
+			self.chordsList.setCurrentRow(list(CHORDS).index(chord))
+			self.chordsList.blockSignals(False)
+		mode = self.model.getParam('chords', 'scaleMode')
+		for widget in (self.scaleMode, self.keyList, self.scaleList):
+			widget.blockSignals(True)
+		self.scaleMode.setChecked(mode is not None)
+		if mode is not None:
+			self.keyList.setCurrentIndex(mode['key'])
+			self.scaleList.setCurrentText(mode['scale'])
+		for widget in (self.scaleMode, self.keyList, self.scaleList):
+			widget.blockSignals(False)
 
 class SineWidget(QWidget):
 	""" Custom Widget related to the effect 'Sinusoidal Oscillator'. 
@@ -358,13 +366,18 @@ class SineWidget(QWidget):
 
 	def setPhase(self):
 		""" Method to set the parameter Phase in the model """
-		self.model.getSine().setPhase(self.sinePhase.getSlider().value()/1000)
-		self.sinePhase.updateValue(round(self.model.getSine().getPhase(),2))
+		self.model.setParam('sine', 'phase', self.sinePhase.getSlider().value()/1000)
+		self.sinePhase.updateValue(round(self.model.getParam('sine', 'phase'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
 		self.sinePhase.getSlider().setValue(0)
-		self.sinePhase.updateValue(round(self.model.getSine().getPhase(), 2))
+		self.sinePhase.updateValue(round(self.model.getParam('sine', 'phase'), 2))
+
+	def refresh(self):
+		""" Method to show the parameters of the model, e.g. after a preset has been recalled """
+		phase = self.model.getParam('sine', 'phase')
+		self.sinePhase.setPosition(phase * 1000, phase)
 
 class BlitWidget(QWidget):
 	""" Custom Widget related to the effect 'BLIT'. 
@@ -399,14 +412,19 @@ class BlitWidget(QWidget):
 
 	def setHarms(self):
 		""" Method to set the parameter Harms in the model """
-		self.model.getBlit().setHarms(self.blitHarm.getSlider().value()/10)
-		self.blitHarm.updateValue(round(self.model.getBlit().getHarms(),2))
+		self.model.setParam('blit', 'harms', self.blitHarm.getSlider().value()/10)
+		self.blitHarm.updateValue(round(self.model.getParam('blit', 'harms'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
 
 		self.blitHarm.getSlider().setValue(400)
-		self.blitHarm.updateValue(round(self.model.getBlit().getHarms(), 2))
+		self.blitHarm.updateValue(round(self.model.getParam('blit', 'harms'), 2))
+
+	def refresh(self):
+		""" Method to show the parameters of the model, e.g. after a preset has been recalled """
+		harms = self.model.getParam('blit', 'harms')
+		self.blitHarm.setPosition(harms * 10, harms)
 
 class SuperSawWidget(QWidget):
 	""" Custom Widget related to the effect 'Super Saw'. 
@@ -445,20 +463,27 @@ class SuperSawWidget(QWidget):
 
 	def setDetune(self):
 		""" Method to set the parameter Detune in the model """
-		self.model.getSuperSaw().setDetune(self.ssDetune.getSlider().value()/1000)
-		self.ssDetune.updateValue(round(self.model.getSuperSaw().getDetune(),2))
+		self.model.setParam('superSaw', 'detune', self.ssDetune.getSlider().value()/1000)
+		self.ssDetune.updateValue(round(self.model.getParam('superSaw', 'detune'),2))
 
 	def setBal(self):
 		""" Method to set the parameter Balance in the model """
-		self.model.getSuperSaw().setBal(self.ssBal.getSlider().value()/1000)
-		self.ssBal.updateValue(round(self.model.getSuperSaw().getBal(),2))
+		self.model.setParam('superSaw', 'bal', self.ssBal.getSlider().value()/1000)
+		self.ssBal.updateValue(round(self.model.getParam('superSaw', 'bal'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
 		self.ssDetune.getSlider().setValue(500)
 		self.ssBal.getSlider().setValue(700)
-		self.ssDetune.updateValue(round(self.model.getSuperSaw().getDetune(), 2))
-		self.ssBal.updateValue(round(self.model.getSuperSaw().getBal(), 2))
+		self.ssDetune.updateValue(round(self.model.getParam('superSaw', 'detune'), 2))
+		self.ssBal.updateValue(round(self.model.getParam('superSaw', 'bal'), 2))
+
+	def refresh(self):
+		""" Method to show the parameters of the model, e.g. after a preset has been recalled """
+		detune = self.model.getParam('superSaw', 'detune')
+		bal = self.model.getParam('superSaw', 'bal')
+		self.ssDetune.setPosition(detune * 1000, detune)
+		self.ssBal.setPosition(bal * 1000, bal)
 
 class PhasorWidget(QWidget):
 	""" Custom Widget related to the effect 'Phasor'. 
@@ -493,13 +518,18 @@ class PhasorWidget(QWidget):
 
 	def setPhase(self):
 		""" Method to set the parameter Phase in the model """
-		self.model.getPhasor().setPhase(self.phase.getSlider().value()/1000)
-		self.phase.updateValue(round(self.model.getPhasor().getPhase(),2))
+		self.model.setParam('phasor', 'phase', self.phase.getSlider().value()/1000)
+		self.phase.updateValue(round(self.model.getParam('phasor', 'phase'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
 		self.phase.getSlider().setValue(0)
-		self.phase.updateValue(round(self.model.getPhasor().getPhase(), 2))
+		self.phase.updateValue(round(self.model.getParam('phasor', 'phase'), 2))
+
+	def refresh(self):
+		""" Method to show the parameters of the model, e.g. after a preset has been recalled """
+		phase = self.model.getParam('phasor', 'phase')
+		self.phase.setPosition(phase * 1000, phase)
 
 class RCOscWidget(QWidget):
 	""" Custom Widget related to the effect 'RC Oscillator'. 
@@ -534,13 +564,18 @@ class RCOscWidget(QWidget):
 
 	def setSharp(self):
 		""" Method to set the parameter Sharp in the model """
-		self.model.getRC().setSharp(self.rcSharp.getSlider().value()/1000)
-		self.rcSharp.updateValue(round(self.model.getRC().getSharp(),2))
+		self.model.setParam('rc', 'sharp', self.rcSharp.getSlider().value()/1000)
+		self.rcSharp.updateValue(round(self.model.getParam('rc', 'sharp'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
 		self.rcSharp.getSlider().setValue(250)
-		self.rcSharp.updateValue(round(self.model.getRC().getSharp(), 2))
+		self.rcSharp.updateValue(round(self.model.getParam('rc', 'sharp'), 2))
+
+	def refresh(self):
+		""" Method to show the parameters of the model, e.g. after a preset has been recalled """
+		sharp = self.model.getParam('rc', 'sharp')
+		self.rcSharp.setPosition(sharp * 1000, sharp)
 
 class LFOWidget(QWidget):
 	""" Custom Widget related to the effect 'LF Oscillator'. 
@@ -581,48 +616,95 @@ class LFOWidget(QWidget):
 		""" Method to change the waveform in the model """
 		if self.lfoWf.currentItem().text() == 'Saw Up':
 			self.model.getLFO().setSawUp()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Saw Down':
 			self.model.getLFO().setSawDown()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Square':
 			self.model.getLFO().setSquare()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Triangle':
 			self.model.getLFO().setTriangle()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Pulse':
 			self.model.getLFO().setPulse()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Bipolar Pulse':
 			self.model.getLFO().setBipolarPulse()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Sample & Hold':
 			self.model.getLFO().setSnH()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 
 		elif self.lfoWf.currentItem().text() == 'Modulated Sine':
 			self.model.getLFO().setModSine()
-			self.model.getReverb().setInput(self.model.getLFO().getSignal())
-			self.model.getDelay().setInput(self.model.getLFO().getSignal())
 			
 	def reset(self):
 		""" Method to reset the active waveform """
 		self.lfoWf.setCurrentItem(self.lfoWf.item(0))
 
+	def refresh(self):
+		""" Method to select the waveform of the model, e.g. after a preset has been recalled """
+		self.lfoWf.blockSignals(True)
+		self.lfoWf.setCurrentRow(self.model.getParam('lfo', 'type'))
+		self.lfoWf.blockSignals(False)
+
+class PolySynthWidget(QWidget):
+	""" Custom Widget related to the effect 'Poly Synth'.
+
+		Attributes:
+			model       reference to the model
+			polyWf      list of available waveforms
+			latch       check box holding the notes while the singer moves on
+			waveforms   waveforms of the effect, in the order of polyWf
+	"""
+	def __init__(self, model):
+		""" Init method """
+		super().__init__()
+
+		self.model = model
+
+		layout = QVBoxLayout()
+
+		self.waveforms = ['sine', 'blit', 'superSaw', 'phasor', 'rc']
+		self.polyWf = QListWidget()
+		for label in ('Sine', 'BLIT', 'Super Saw', 'Phasor', 'RC'):
+			self.polyWf.addItem(QListWidgetItem(label))
+		self.polyWf.setCurrentItem(self.polyWf.item(0))
+		layout.addWidget(self.polyWf)
+
+		typeFont = QFont(".Lucida Grande UI", 18)
+		self.polyWf.setFont(typeFont)
+
+		self.latch = QCheckBox('Latch')
+		layout.addWidget(self.latch)
+
+		self.setLayout(layout)
+
+		self.polyWf.itemSelectionChanged.connect(self.changeWaveform)
+		self.latch.stateChanged.connect(self.changeMode)
+
+	def changeWaveform(self):
+		""" Method to change the waveform of the voices in the model """
+		self.model.setParam('poly', 'waveform', self.waveforms[self.polyWf.currentRow()])
+
+	def changeMode(self):
+		""" Method to latch the notes in the model, or to release them when they stop """
+		self.model.setParam('poly', 'mode', 'latch' if self.latch.isChecked() else 'interval')
+
+	def reset(self):
+		""" Method to reset the active waveform and the mode """
+		self.polyWf.setCurrentItem(self.polyWf.item(0))
+		self.latch.setChecked(False)
+
+	def refresh(self):
+		""" Method to show the waveform and the mode of the model, e.g. after a preset has been recalled """
+		self.polyWf.blockSignals(True)
+		self.polyWf.setCurrentRow(self.waveforms.index(self.model.getParam('poly', 'waveform')))
+		self.polyWf.blockSignals(False)
+		self.latch.blockSignals(True)
+		self.latch.setChecked(self.model.getParam('poly', 'mode') == 'latch')
+		self.latch.blockSignals(False)
+
 class ReverbLayout(QVBoxLayout):
 	""" Custom Layout used to manage Reverb effect.
 
@@ -633,6 +715,7 @@ class ReverbLayout(QVBoxLayout):
 			revCutoff		slider for parameter Cutoff
 			roomSize 		slider for parameter Roomsize
 			revBalance 		slider for parameter revBalance
+			supported       parameters of the reverb of the model, the sliders of the other ones are hidden
 	"""
 	def __init__(self, model):
 		""" Init mehtod """
@@ -662,6 +745,12 @@ class ReverbLayout(QVBoxLayout):
 		
 		self.addWidget(paramWidget)
 
+		# the convolution reverb has neither a reverb time nor a room size
+		self.supported = set(self.model.getReverb().getParamNames())
+		sliders = {'revTime': self.revTime, 'cutoff': self.revCutoff, 'roomSize': self.roomSize, 'bal': self.revBalance}
+		for name, slider in sliders.items():
+			slider.setVisible(name in self.supported)
+
 		self.enableReverb.stateChanged.connect(self.toggleReverbMode)
 		self.revTime.getSlider().valueChanged.connect(self.setRevtime)
 		self.revCutoff.getSlider().valueChanged.connect(self.setCutoff)
@@ -679,23 +768,23 @@ class ReverbLayout(QVBoxLayout):
 
 	def setRevtime(self):
 		""" Method to set the parameter Revtime in the model """
-		self.model.getReverb().setRevTime(self.revTime.getSlider().value()/1000)
-		self.revTime.updateValue(round(self.model.getReverb().getRevTime(),2))
+		self.model.setParam('reverb', 'revTime', self.revTime.getSlider().value()/1000)
+		self.revTime.updateValue(round(self.model.getParam('reverb', 'revTime'),2))
 
 	def setCutoff(self):
 		""" Method to set the parameter Cutoff in the model """
-		self.model.getReverb().setCutoff(self.revCutoff.getSlider().value())
-		self.revCutoff.updateValue(round(self.model.getReverb().getCutoff(),2))
+		self.model.setParam('reverb', 'cutoff', self.revCutoff.getSlider().value())
+		self.revCutoff.updateValue(round(self.model.getParam('reverb', 'cutoff'),2))
 
 	def setRoomSize(self):
 		""" Method to set the parameter RoomSize in the model """
-		self.model.getReverb().setRoomSize(4.25 - self.roomSize.getSlider().value()/1000)
-		self.roomSize.updateValue(round(4.25 - self.model.getReverb().getRoomSize(),2))
+		self.model.setParam('reverb', 'roomSize', 4.25 - self.roomSize.getSlider().value()/1000)
+		self.roomSize.updateValue(round(4.25 - self.model.getParam('reverb', 'roomSize'),2))
 
 	def setRevBalance(self):
 		""" Method to set the parameter Bal in the model """
-		self.model.getReverb().setBal(self.revBalance.getSlider().value()/1000)
-		self.revBalance.updateValue(round(self.model.getReverb().getBal(),2))
+		self.model.setParam('reverb', 'bal', self.revBalance.getSlider().value()/1000)
+		self.revBalance.updateValue(round(self.model.getParam('reverb', 'bal'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
@@ -706,6 +795,25 @@ class ReverbLayout(QVBoxLayout):
 		self.enableReverb.setText('Enable')
 		self.enableReverb.setCheckState(Qt.Unchecked)
 
+	def refresh(self):
+		""" Method to show the parameters and the state of the Reverb in the model, e.g. after a preset has been recalled """
+		if 'revTime' in self.supported:
+			revTime = self.model.getParam('reverb', 'revTime')
+			self.revTime.setPosition(revTime * 1000, revTime)
+		if 'roomSize' in self.supported:
+			roomSize = self.model.getParam('reverb', 'roomSize')
+			self.roomSize.setPosition((4.25 - roomSize) * 1000, 4.25 - roomSize)
+		cutoff = self.model.getParam('reverb', 'cutoff')
+		bal = self.model.getParam('reverb', 'bal')
+		self.revCutoff.setPosition(cutoff, cutoff)
+		self.revBalance.setPosition(bal * 1000, bal)
+
+		enabled = self.model.isReverbEnabled()
+		self.enableReverb.blockSignals(True)
+		self.enableReverb.setCheckState(Qt.Checked if enabled else Qt.Unchecked)
+		self.enableReverb.setText('Disable' if enabled else 'Enable')
+		self.enableReverb.blockSignals(False)
+
 
 class DelayLayout(QVBoxLayout):
 	""" Custom Layout used to manage Reverb effect.
@@ -753,13 +861,13 @@ class DelayLayout(QVBoxLayout):
 
 	def setAmountDelay(self):
 		""" Method to set the parameter Delay in the model """
-		self.model.getDelay().setDelayAmount(self.delayAmount.getSlider().value()/1000)
-		self.delayAmount.updateValue(round(self.model.getDelay().getDelayAmount(),2))
+		self.model.setParam('delay', 'delayAmount', self.delayAmount.getSlider().value()/1000)
+		self.delayAmount.updateValue(round(self.model.getParam('delay', 'delayAmount'),2))
 
 	def setFeedback(self):
 		""" Method to set the parameter Feedback in the model """
-		self.model.getDelay().setFeedback(self.delayFeedback.getSlider().value()/1000)
-		self.delayFeedback.updateValue(round(self.model.getDelay().getFeedback(),2))
+		self.model.setParam('delay', 'feedback', self.delayFeedback.getSlider().value()/1000)
+		self.delayFeedback.updateValue(round(self.model.getParam('delay', 'feedback'),2))
 
 	def reset(self):
 		""" Method to set the parameters at the initial state in the model """
@@ -768,91 +876,243 @@ class DelayLayout(QVBoxLayout):
 		self.enableDelay.setText('Enable')
 		self.enableDelay.setCheckState(Qt.Unchecked)
 
+	def refresh(self):
+		""" Method to show the parameters and the state of the Delay in the model, e.g. after a preset has been recalled """
+		delayAmount = self.model.getParam('delay', 'delayAmount')
+		feedback = self.model.getParam('delay', 'feedback')
+		self.delayAmount.setPosition(delayAmount * 1000, delayAmount)
+		self.delayFeedback.setPosition(feedback * 1000, feedback)
 
-class MplFigure(object):
-	""" Custom widget used to plot waveform.
-
-		Attribute:
-			figure     figure to plot waveform
-			canvas     canvas necessary for figure of matplotlib
-	"""
-	def __init__(self, parent):
-		"""Init method"""
-		self.figure = plt.figure(figsize=(6, 9), dpi=100, facecolor='#31363B')
-		self.canvas = FigureCanvas(self.figure)
+		enabled = self.model.isDelayEnabled()
+		self.enableDelay.blockSignals(True)
+		self.enableDelay.setCheckState(Qt.Checked if enabled else Qt.Unchecked)
+		self.enableDelay.setText('Disable' if enabled else 'Enable')
+		self.enableDelay.blockSignals(False)
 
 
 class WaveformWidget(QWidget):
 	""" Custom widget used to represent waveform.
+		Only the line is repainted: the samples are written in place into a QPolygonF
+		whose memory is shared with a preallocated numpy array, and drawn with QPainter.
 
 		Attribute:
-			mainFigure     reference to MplFigure Class
 			timer          used to refresh waveform
 			model		   reference to the model
-			freqVect       Discrete Fourier Transform sample frequencies
 			timeVect       time signal
+			frames         number of samples shown
+			streams        preallocated array receiving the samples shown
+			polygon        line drawn by paintEvent
+			points         numpy view on the x and y coordinates of polygon
 	"""
-	def __init__(self, model):
+	def __init__(self, model, fps=30):
 		""" Init method """
 		super().__init__()
 
-		self.initUI()
-
 		self.initData(model)
 
 		self.initWaveform()
 
-	def initUI(self):
-		"""Init UI"""
-		vbox = QVBoxLayout()
-
-		# mpl figure
-		self.mainFigure = MplFigure(self)
-		vbox.addWidget(self.mainFigure.canvas)
+		self.initUI(fps)
 
-		self.setLayout(vbox)
+	def initUI(self, fps):
+		"""Init UI"""
+		self.setMinimumHeight(200)
 
-		"""The refreshing part of the app is handled with a QTimer that gets called 10 times a second and 
+		"""The refreshing part of the app is handled with a QTimer that gets called fps times a second and 
 		refreshes the gui at that time by calling the handleNewData function. 
-		That function gets the latest frame from the microphone, plots the time series, 
-		computes the Fourier transform and plots its modulus."""
+		That function gets the latest frame from the model and schedules a repaint of the line."""
 		timer = QTimer()
 		timer.timeout.connect(self.handleNewData)
-		timer.start(100)
+		timer.start(int(1000 / fps))
 		
 		self.timer = timer
 
 	def initData(self, model):
-		"""Init method to set model, frequencies, and time"""
+		"""Init method to set model and time"""
 		self.model = model
 
 		# computes the parameters that will be used during plotting
-		self.freqVect = np.fft.rfftfreq(self.model.server.getBufferSize(), 1./ (self.model.server.getSamplingRate()/10))
-		self.timeVect = np.arange(self.model.server.getBufferSize(), dtype=np.float32) / self.model.server.getSamplingRate() * 100
+		self.frames = self.model.getWaveformSize()
+		self.streams = np.zeros(self.frames, dtype=np.float32)
+		self.timeVect = np.arange(self.frames, dtype=np.float32) / self.model.server.getSamplingRate() * 1000
 
 	def initWaveform(self):
-		"""creates initial matplotlib plots in the main window and keeps 
-		references for further use"""
+		"""creates the polygon of the line and keeps a numpy view on its points for further use"""
+		self.polygon = QPolygonF()
+		self.polygon.fill(QPointF(), self.frames)
+		buffer = self.polygon.data()
+		buffer.setsize(2 * self.frames * np.dtype(np.float64).itemsize)
+		self.points = np.frombuffer(buffer, dtype=np.float64).reshape(self.frames, 2)
+		self.scaleX()
+
+	def scaleX(self):
+		"""maps the time of each sample to the width of the widget"""
+		np.multiply(self.timeVect, self.width() / self.timeVect.max(), out=self.points[:, 0])
+
+	def resizeEvent(self, event):
+		"""rescales the line when the widget is resized"""
+		self.scaleX()
+		super().resizeEvent(event)
+
+	def handleNewData(self):
+		""" handles the asynchroneously collected sound chunks """
+		# the copy has been torn by the callback: the previous line stays on screen
+		if self.model.getFrames(self.frames, self.streams) is None:
+			return
+
+		# the amplitude range shown is [-2, 2]
+		height = self.height()
+		np.multiply(self.streams, -height / 4, out=self.points[:, 1])
+		self.points[:, 1] += height / 2
+
+		# only schedules a repaint, paintEvent draws the line
+		self.update()
+
+	def paintEvent(self, event):
+		"""draws the background, the time axis and the line"""
+		painter = QPainter(self)
+		painter.fillRect(self.rect(), QColor('#18465d'))
+
+		painter.setPen(QColor('#31363B'))
+		painter.drawLine(0, self.height() // 2, self.width(), self.height() // 2)
+		painter.setPen(Qt.white)
+		painter.drawText(self.rect().adjusted(4, 4, -4, -4), Qt.AlignRight | Qt.AlignBottom,
+						 'time (ms): %.1f' % self.timeVect.max())
 
-		self.axTop = self.mainFigure.figure.add_subplot(111)
-		self.axTop.set_ylim(-2000, 2000)
-		self.axTop.set_xlim(0, self.timeVect.max())
-		self.axTop.set_xlabel(u'time (ms)', fontsize=8, color='white')
-		self.axTop.set_facecolor('#18465d')
-		self.axTop.tick_params(axis='x', colors='white')
-		self.axTop.tick_params(axis='y', colors='white')
+		painter.drawPolyline(self.polygon)
+		painter.end()
 
-		# line objects        
-		self.lineTop, = self.axTop.plot(self.timeVect, np.ones_like(self.timeVect), color='white')
+class LoadMeterWidget(QWidget):
+	""" Small meter showing the DSP load of the server: the height of the bar is the worst buffer
+		since the last refresh, relative to the deadline (the line), and the overruns are counted below it.
+
+		Attribute:
+			model          reference to the model
+			timer          used to refresh the meter
+			histogram      load histogram read at the last refresh
+			previous       load histogram read at the refresh before
+			load           worst load since the last refresh, as a fraction of the deadline
+			overruns       number of overruns since the model started
+	"""
+	def __init__(self, model, fps=10):
+		""" Init method """
+		super().__init__()
+		self.model = model
+		self.histogram = self.model.getLoadHistogram()
+		self.previous = self.histogram.copy()
+		self.load = 0.0
+		self.overruns = 0
+
+		self.setFixedWidth(60)
+		self.setMinimumHeight(200)
+
+		timer = QTimer()
+		timer.timeout.connect(self.handleNewData)
+		timer.start(int(1000 / fps))
+		self.timer = timer
 
 	def handleNewData(self):
-		""" handles the asynchroneously collected sound chunks """
-		streams = self.model.getFrames()
-		
-		if len(streams) > 0:
-			
-			# plots the time signal
-			self.lineTop.set_data(self.timeVect, streams*1000)
+		""" finds the highest bin filled since the last refresh """
+		self.previous, self.histogram = self.histogram, self.previous
+		self.model.getLoadHistogram(self.histogram)
+		filled = np.nonzero(self.histogram != self.previous)[0]
+		self.load = (filled[-1] + 1) * LOAD_RANGE / LOAD_BINS if len(filled) else 0.0
+		self.overruns = self.model.getOverruns()
+		self.update()
+
+	def paintEvent(self, event):
+		"""draws the bar, the deadline and the counters"""
+		painter = QPainter(self)
+		painter.fillRect(self.rect(), QColor('#18465d'))
+
+		# the bar area leaves room for two lines of text at the bottom
+		bottom = self.height() - 36
+		top = 4
+		barHeight = int(min(self.load, LOAD_RANGE) / LOAD_RANGE * (bottom - top))
+		if self.load < 0.7:
+			color = QColor('#3daee9')
+		elif self.load <= 1:
+			color = QColor('#f67400')
+		else:
+			color = QColor('#da4453')
+		painter.fillRect(12, bottom - barHeight, self.width() - 24, barHeight, color)
+
+		deadline = bottom - int(1 / LOAD_RANGE * (bottom - top))
+		painter.setPen(Qt.white)
+		painter.drawLine(4, deadline, self.width() - 4, deadline)
+		painter.drawText(0, bottom, self.width(), 18, Qt.AlignCenter, 'DSP %d%%' % (self.load * 100))
+		painter.drawText(0, bottom + 18, self.width(), 18, Qt.AlignCenter, 'xrun %d' % self.overruns)
+		painter.end()
+
+	def stop(self):
+		""" Method to stop the refresh timer """
+		self.timer.stop()
+
+class SpectrumWidget(QWidget):
+	""" Custom widget used to represent the spectrum of the active effect.
+		The FFT is computed by a SpectrumAnalyzer in its own thread, this widget only copies and draws the result.
+
+		Attribute:
+			analyzer       reference to the SpectrumAnalyzer
+			timer          used to refresh the spectrum
+			freqVect       frequency of each value of the spectrum
+			spectrum       preallocated array receiving the spectrum, in dB
+			polygon        line drawn by paintEvent
+			points         numpy view on the x and y coordinates of polygon
+			minDb          level shown at the bottom of the widget
+	"""
+	def __init__(self, model, fps=30, size=None, logBands=128, minDb=-90):
+		""" Init method """
+		super().__init__()
+
+		# by default the FFT size follows the buffer size of the server: the smallest power of two
+		# holding 4096 samples and a whole buffer, without exceeding the samples kept by the model
+		if size is None:
+			size = 1 << (max(4096, model.server.getBufferSize()) - 1).bit_length()
+			size = min(size, 1 << (model.getWaveformSize().bit_length() - 1))
+
+		self.analyzer = SpectrumAnalyzer(model, size=size, logBands=logBands)
+		self.freqVect = self.analyzer.getFrequencies()
+		self.spectrum = np.zeros(len(self.freqVect), dtype=np.float32)
+		self.minDb = minDb
 
-			# refreshes the plots
-			self.mainFigure.canvas.draw()
+		self.polygon = QPolygonF()
+		self.polygon.fill(QPointF(), len(self.freqVect))
+		buffer = self.polygon.data()
+		buffer.setsize(2 * len(self.freqVect) * np.dtype(np.float64).itemsize)
+		self.points = np.frombuffer(buffer, dtype=np.float64).reshape(len(self.freqVect), 2)
+
+		self.setMinimumHeight(200)
+		self.analyzer.start()
+
+		timer = QTimer()
+		timer.timeout.connect(self.handleNewData)
+		timer.start(int(1000 / fps))
+		self.timer = timer
+
+	def resizeEvent(self, event):
+		"""maps the frequencies, on a log scale, to the width of the widget"""
+		logFreq = np.log10(np.maximum(self.freqVect, 1))
+		self.points[:, 0] = (logFreq - logFreq[0]) / (logFreq[-1] - logFreq[0]) * self.width()
+		super().resizeEvent(event)
+
+	def handleNewData(self):
+		""" copies the last spectrum computed by the analyzer """
+		self.analyzer.getSpectrum(self.spectrum)
+		np.clip(self.spectrum, self.minDb, 0, out=self.spectrum)
+		np.multiply(self.spectrum, self.height() / self.minDb, out=self.points[:, 1])
+		self.update()
+
+	def paintEvent(self, event):
+		"""draws the background and the spectrum"""
+		painter = QPainter(self)
+		painter.fillRect(self.rect(), QColor('#18465d'))
+		painter.setPen(Qt.white)
+		painter.drawText(self.rect().adjusted(4, 4, -4, -4), Qt.AlignRight | Qt.AlignBottom, 'frequency (log)')
+		painter.drawPolyline(self.polygon)
+		painter.end()
+
+	def stop(self):
+		""" Method to stop the refresh timer and the analysis thread """
+		self.timer.stop()
+		self.analyzer.stop()
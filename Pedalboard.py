@@ -0,0 +1,145 @@
+from pyo import *
+
+class Pedalboard():
+	""" Chain of effects processed in series, in any order, e.g. Distortion -> Auto-Wah -> Delay -> Reverb.
+		The stages are the effects of the model, the chain only rewires their inputs: each stage reads the signal
+		of the previous one that isn't bypassed, the first one reads the input of the model.
+		When the order changes, only the links that changed are rewired (with a crossfade), and the stages that
+		leave the chain fade out and are paused, so that bypassed effects don't use any CPU.
+		Synth effects have no input: they start a new signal, the stages before them are not heard.
+		The chain is used by the model as a main effect: it has the same enable, disable, isPlaying and getSignal methods.
+
+		Attributes:
+			model      reference to the model, the stages are its effects
+			order      names of the stages, in processing order
+			bypassed   names of the stages of order that are skipped
+			links      signal each stage reads, with the stage itself, keyed by stage name
+			output     signal of the chain, it reads the last stage
+			last       signal read by output
+			fades      index of the sample at which each stage that left the chain is paused, keyed by stage name
+			playing    True while the chain is enabled
+	"""
+	def __init__(self, model):
+		""" Init Method """
+		self.model = model
+		self.order = []
+		self.bypassed = set()
+		self.links = {}
+		self.output = InputFader(self.model.input)
+		self.last = self.model.input
+		self.fades = {}
+		self.playing = False
+
+	def setOrder(self, names):
+		""" Method to set the stages of the chain, in processing order. An effect can be a stage only once """
+		if len(set(names)) != len(names):
+			raise ValueError('an effect appears more than once in the chain %s' % list(names))
+		self.order = list(names)
+		self.update()
+
+	def getOrder(self):
+		""" Method to get the names of the stages, in processing order """
+		return list(self.order)
+
+	def setBypass(self, name, bypassed):
+		""" Method to skip a stage of the chain, or to process it again """
+		if bypassed:
+			self.bypassed.add(name)
+		else:
+			self.bypassed.discard(name)
+		self.update()
+
+	def isBypassed(self, name):
+		""" Method to get if a stage is skipped """
+		return name in self.bypassed
+
+	def getActiveStages(self):
+		""" Method to get the names of the stages processed, in order """
+		return [name for name in self.order if name not in self.bypassed]
+
+	def uses(self, name):
+		""" Method to get if an effect is processed by the chain """
+		return self.playing and name in self.getActiveStages()
+
+	def isSource(self, stage):
+		""" Method to get if a stage generates its signal instead of processing its input """
+		return not hasattr(stage, 'setInput')
+
+	def update(self):
+		""" Method to rewire the links that changed since the last update and to start or pause the stages """
+		if not self.playing:
+			return
+
+		fadeTime = self.model.getFadeTime()
+		active = self.getActiveStages()
+		signal = self.model.input
+		for name in active:
+			stage = self.model.getEffect(name)
+			if not self.isSource(stage):
+				link = self.links.get(name)
+				if link is None or link[0] is not stage or link[1] is not signal:
+					stage.setInput(signal, fadeTime)
+					self.links[name] = (stage, signal)
+			# a stage coming back before the end of its fade must not be paused
+			self.fades.pop(name, None)
+			if not stage.isPlaying():
+				stage.enable()
+			signal = stage.getSignal()
+
+		if signal is not self.last:
+			self.output.setInput(signal, fadeTime)
+			self.last = signal
+
+		# the stages are paused by the callback of the model, update may run in it and must not create pyo objects
+		for name in self.order + list(self.links):
+			if name not in active and name not in self.fades and self.model.getEffect(name).isPlaying():
+				self.fades[name] = self.model.getNextSample() + self.model.fadeSamples
+
+	def pauseFaded(self, end):
+		""" Method to pause the stages whose fade out is over once the block ending at end has been computed """
+		for name in [name for name, deadline in self.fades.items() if deadline <= end]:
+			del self.fades[name]
+			self.pause(name)
+
+	def pause(self, name):
+		""" Method to pause a stage that has faded out of the chain """
+		if self.uses(name) or name == self.model.getActiveName():
+			return
+		self.model.getEffect(name).disable()
+
+	def detach(self, name):
+		""" Method to make a stage read the input of the model again, when it is used outside of the chain """
+		link = self.links.pop(name, None)
+		if link is not None:
+			link[0].setInput(self.model.input, self.model.getFadeTime())
+
+	def usesPitch(self):
+		""" Method to get if a stage of the chain needs the pitch tracker of the model """
+		for name in self.getActiveStages():
+			stage = self.model.getEffect(name)
+			if self.isSource(stage) or (hasattr(stage, 'usesPitch') and stage.usesPitch()):
+				return True
+		return False
+
+	def enable(self):
+		""" Method to start processing the stages of the chain """
+		self.playing = True
+		self.output.play()
+		self.update()
+
+	def disable(self):
+		""" Method to stop processing the chain and its stages, except the main effect of the model """
+		self.playing = False
+		self.fades = {}
+		for name in self.order:
+			if name != self.model.getActiveName() and self.model.isBuilt(name):
+				self.model.getEffect(name).disable()
+		self.output.stop()
+
+	def isPlaying(self):
+		""" Method to get if the chain is processing or not """
+		return self.playing
+
+	def getSignal(self):
+		""" Method to get the signal of the chain """
+		return self.output
@@ -0,0 +1,241 @@
+from pyo import *
+import numpy as np
+
+class MidiSink():
+	""" Receiver of the events of PitchToMidi. Times are sample indexes, counted from the first block of the server """
+	def noteOn(self, time, note, velocity):
+		""" Method called when a note starts """
+		pass
+
+	def noteOff(self, time, note):
+		""" Method called when a note stops """
+		pass
+
+	def pitchBend(self, time, value):
+		""" Method called when the pitch moves within a note, value goes from 0 to 16383, 8192 being the note itself """
+		pass
+
+class RecordingSink(MidiSink):
+	""" Sink keeping every event, e.g. to check the notes detected in an offline render.
+
+		Attributes:
+			events     recorded events: ('noteOn', time, note, velocity), ('noteOff', time, note) or ('pitchBend', time, value)
+	"""
+	def __init__(self):
+		""" Init Method """
+		self.events = []
+
+	def noteOn(self, time, note, velocity):
+		""" Method to record a note on """
+		self.events.append(('noteOn', time, note, velocity))
+
+	def noteOff(self, time, note):
+		""" Method to record a note off """
+		self.events.append(('noteOff', time, note))
+
+	def pitchBend(self, time, value):
+		""" Method to record a pitch bend """
+		self.events.append(('pitchBend', time, value))
+
+	def getNotes(self, sr):
+		""" Method to get the notes recorded, as (note, start, end) with times in seconds """
+		notes = []
+		started = {}
+		for event in self.events:
+			if event[0] == 'noteOn':
+				started[event[2]] = event[1]
+			elif event[0] == 'noteOff' and event[2] in started:
+				notes.append((event[2], started.pop(event[2]) / sr, event[1] / sr))
+		return notes
+
+class ServerMidiSink(MidiSink):
+	""" Sink sending the events to the MIDI output device of the server (see midiOutputDevice of Glovox).
+		The events of a block are sent when the block is over, with their offset in the block as timestamp,
+		so that they keep their spacing.
+
+		Attributes:
+			model      reference to the model, it gives the first sample of the block
+			channel    MIDI channel, 1 to 16
+	"""
+	def __init__(self, model, channel=1):
+		""" Init Method """
+		self.model = model
+		self.channel = channel
+
+	def timestamp(self, time):
+		""" Method to get the timestamp, in ms, of an event of the last block """
+		return int((time - self.model.samples) * 1000 / self.model.server.getSamplingRate())
+
+	def noteOn(self, time, note, velocity):
+		""" Method to send a note on """
+		self.model.server.noteout(note, velocity, self.channel, self.timestamp(time))
+
+	def noteOff(self, time, note):
+		""" Method to send a note off, as a note on with velocity 0 """
+		self.model.server.noteout(note, 0, self.channel, self.timestamp(time))
+
+	def pitchBend(self, time, value):
+		""" Method to send a pitch bend """
+		self.model.server.bendout(value, self.channel, self.timestamp(time))
+
+class PitchToMidi():
+	""" Converts the pitch and the gate of the input of the model into MIDI notes.
+		The pitch, the level of the input and the voicing of the tracker are copied into tables once per block
+		and scanned sample by sample by the callback, so that the events are timestamped to the sample.
+		The gate is open while the level of the input is above threshold dB and the tracker has a pitch for the
+		phrase being sung (see PitchTracker.getVoiced), so that a note never starts on the pitch held from the
+		previous phrase. A note starts when the gate opens, stops when it closes, and changes when the pitch moves
+		away from it by more than half a semitone plus hysteresis. A note lasts at least minLength seconds;
+		the movements of the pitch within a note are sent as pitch bend.
+		The level is read every sample, so note off is sample accurate, up to the fall time of the level follower.
+		The pitch is not: the tracker of the model makes a new estimate every pitchRate seconds (441 samples
+		by default) and glides to it, so a note starts up to the first estimate of the phrase after the voice,
+		and a note change is heard up to pitchRate plus the glide of the tracker after the singer changed note.
+		Lower pitchRate (see PitchTracker.setRate) to make notes follow the voice more closely.
+
+		Attributes:
+			model          reference to the model, its callback calls processBlock
+			sink           receiver of the events (see MidiSink)
+			hysteresis     extra distance, in semitones, needed to change note
+			minLength      minimum length of a note, in samples
+			bendRange      pitch bend range of the receiver, in semitones
+			bendStep       smallest change of the pitch bend value that is sent
+			velocity       velocity of the notes
+			threshold      level of the input, in dB, above which the voice is considered on
+			level          level of the input, following the voice within a few milliseconds
+			pitchTable     pitch of the last block
+			levelTable     level of the last block
+			voicedTable    voicing of the tracker in the last block
+			writers        TableFill objects filling the tables
+			pitch          numpy view on pitchTable
+			levels         numpy view on levelTable
+			phrase         numpy view on voicedTable
+			midi           pitch of the last block, as a MIDI note number
+			voiced         True for the samples of the last block where the gate is open
+			tracked        True for the samples of the last block with a pitch of the phrase being sung
+			note           note playing, None if there is none
+			noteStart      time of the note on of note
+			releasing      True once the gate has closed, the note is stopped as soon as it has lasted minLength
+			bend           last pitch bend value sent
+	"""
+	def __init__(self, model, sink, hysteresis=0.3, minLength=0.05, bendRange=2, bendStep=64, velocity=100, threshold=-40):
+		""" Init Method """
+		self.model = model
+		self.sink = sink
+		self.hysteresis = hysteresis
+		self.minLength = int(minLength * model.server.getSamplingRate())
+		self.bendRange = bendRange
+		self.bendStep = bendStep
+		self.velocity = velocity
+		self.threshold = threshold
+
+		size = model.server.getBufferSize()
+		self.level = Follower2(model.input, risetime=0.002, falltime=0.01)
+		self.pitchTable = DataTable(size=size)
+		self.levelTable = DataTable(size=size)
+		self.voicedTable = DataTable(size=size)
+		self.writers = [TableFill(model.freq, self.pitchTable), TableFill(self.level, self.levelTable),
+						TableFill(model.tracker.getVoiced(), self.voicedTable)]
+		# the tables are filled only between start and stop
+		self.level.stop()
+		for writer in self.writers:
+			writer.stop()
+		self.pitch = np.asarray(self.pitchTable.getBuffer())
+		self.levels = np.asarray(self.levelTable.getBuffer())
+		self.phrase = np.asarray(self.voicedTable.getBuffer())
+		self.midi = np.zeros(size, dtype=self.pitch.dtype)
+		self.voiced = np.zeros(size, dtype=bool)
+		self.tracked = np.zeros(size, dtype=bool)
+
+		self.note = None
+		self.noteStart = 0
+		self.releasing = False
+		self.bend = 8192
+
+	def start(self):
+		""" Method to start sending notes, the analysis of the input runs until stop is called """
+		self.level.play()
+		for writer in self.writers:
+			writer.play()
+		self.model.addBlockListener(self)
+
+	def stop(self):
+		""" Method to stop sending notes, the note playing is stopped """
+		self.model.removeBlockListener(self)
+		for writer in self.writers:
+			writer.stop()
+		self.level.stop()
+		if self.note is not None:
+			self.endNote(max(self.model.samples, self.noteStart))
+
+	def usesPitch(self):
+		""" Method to get if the analysis of the input must run """
+		return True
+
+	def beginNote(self, time, index):
+		""" Method to start the note sung at index of the last block """
+		self.note = int(round(self.midi[index]))
+		self.noteStart = time
+		self.releasing = False
+		self.sink.noteOn(time, self.note, self.velocity)
+		self.bend = 8192
+
+	def endNote(self, time):
+		""" Method to stop the note playing """
+		self.sink.noteOff(time, self.note)
+		self.note = None
+		self.releasing = False
+
+	def processBlock(self, start):
+		""" Method called by the callback of the model after every block, start is the index of its first sample """
+		n = len(self.midi)
+		np.maximum(self.pitch, 1.0, out=self.midi)
+		self.midi /= 440.0
+		np.log2(self.midi, out=self.midi)
+		self.midi *= 12
+		self.midi += 69
+		np.greater(self.levels, 10 ** (self.threshold / 20.), out=self.voiced)
+		# a pitch held from the previous phrase, or a pitch of 0 (analysis starting), is not a note
+		np.greater(self.phrase, 0.5, out=self.tracked)
+		self.voiced &= self.tracked
+		np.greater(self.pitch, 0, out=self.tracked)
+		self.voiced &= self.tracked
+
+		i = 0
+		while i < n:
+			if self.note is None:
+				onsets = np.flatnonzero(self.voiced[i:])
+				if not len(onsets):
+					break
+				i += onsets[0]
+				self.beginNote(start + i, i)
+				continue
+
+			# index, in the block, from which the note may stop or change
+			earliest = self.noteStart + self.minLength - start
+			if not self.releasing:
+				unvoiced = np.flatnonzero(~self.voiced[i:])
+				end = i + unvoiced[0] if len(unvoiced) else n
+				first = max(i, earliest)
+				if first < end:
+					moved = np.flatnonzero(np.abs(self.midi[first:end] - self.note) > 0.5 + self.hysteresis)
+					if len(moved):
+						i = first + moved[0]
+						self.endNote(start + i)
+						self.beginNote(start + i, i)
+						continue
+				if end == n:
+					break
+				self.releasing = True
+				i = end
+			# the gate has closed: the note stops once it has lasted minLength
+			i = max(i, earliest)
+			if i >= n:
+				break
+			self.endNote(start + i)
+
+		if self.note is not None and not self.releasing:
+			bend = int(np.clip(8192 + (self.midi[-1] - self.note) / self.bendRange * 8192, 0, 16383))
+			if abs(bend - self.bend) >= self.bendStep:
+				self.bend = bend
+				self.sink.pitchBend(start + n - 1, bend)
@@ -0,0 +1,231 @@
+from pyo import *
+from collections import deque
+from Spectrum import rfft_out
+import numpy as np
+import math
+
+# pitch detection algorithms available, from the most robust to the cheapest
+PITCH_METHODS = ('yin', 'autocorrelation', 'zeroCrossing')
+
+class PitchTracker():
+	""" Pitch detection stage driving the synth effects and the scale mode of the Harmonizer.
+		The detector is selectable: Yin (robust), autocorrelation computed with numpy on a decimated block,
+		or the zero-crossing rate of the low-passed input (cheapest). Yin and the zero-crossing rate analyse
+		every sample, rate only sets how often their output is read; the autocorrelation is the only detector
+		computed every rate seconds, and the only one decimated. A new estimate is used only if its confidence
+		is high enough, otherwise the last pitch is held. The autocorrelation gives its own confidence, the peak
+		of the normalised autocorrelation; Yin and the zero-crossing rate give none, their confidence is the level
+		of the input above threshold. The estimates are then median filtered, to remove octave errors and jitter,
+		and the output glides to the result. A silence (the input under threshold) ends a phrase: the output holds
+		the last pitch, but the next phrase starts from its own first estimate, neither filtered with nor gliding
+		from the previous one.
+
+		Attributes:
+			input          signal analysed
+			method         name of the detector, one of PITCH_METHODS
+			rate           time, in seconds, between two estimates
+			minFreq        lowest pitch detected, in Hz
+			maxFreq        highest pitch detected, in Hz
+			minConfidence  confidence (0 to 1) under which the last pitch is held
+			threshold      amplitude of the input under which the pitch is held
+			confidenceRange  dB above threshold at which Yin and the zero-crossing rate are fully trusted
+			decimation     decimation factor of the block analysed by the autocorrelation
+			glide          time, in seconds, the output takes to reach a new pitch (the first one of a phrase is reached at once)
+			filtered       input low-passed at maxFreq, read by the cheap detectors
+			level          amplitude of the input
+			detector       pyo object of the detector, None for the autocorrelation
+			table          last samples of filtered, analysed by the autocorrelation
+			filler         writer of table
+			block          numpy view on table
+			ordered, decimated, padded, spectrum, conjugate, power, correlation
+			               arrays of the autocorrelation, allocated with the detector so that analyze allocates none
+			history        last estimates accepted in the phrase, the output is their median
+			freq           output pitch, in Hz
+			voiced         1 from the first estimate accepted in a phrase to the end of the phrase, 0 while freq holds
+			               the pitch of a phrase that is over
+			analysis       periodic call computing a new estimate
+	"""
+	def __init__(self, input, method='yin', rate=0.01, medianSize=5, minConfidence=0.5, threshold=0.01,
+				 minFreq=70, maxFreq=1500, glide=0.02, decimation=4, confidenceRange=12):
+		""" Init Method """
+		self.input = input
+		self.rate = rate
+		self.minFreq = minFreq
+		self.maxFreq = maxFreq
+		self.minConfidence = minConfidence
+		self.threshold = threshold
+		self.confidenceRange = confidenceRange
+		self.decimation = decimation
+		self.glide = glide
+
+		self.filtered = Tone(input, freq=maxFreq)
+		self.level = Follower(input, freq=20)
+		self.detector = None
+		self.table = None
+		self.filler = None
+		self.history = deque(maxlen=medianSize)
+		self.freq = SigTo(0, time=glide)
+		self.voiced = Sig(0)
+		self.analysis = Pattern(self.analyze, time=rate)
+		self.setMethod(method)
+		self.stop()
+
+	def setMethod(self, method):
+		""" Method to select the detector, one of PITCH_METHODS """
+		if method not in PITCH_METHODS:
+			raise ValueError('unknown pitch detection method %s' % method)
+		playing = self.analysis.isPlaying()
+		self.method = method
+		self.detector = None
+		self.filler = None
+		self.table = None
+		if method == 'yin':
+			self.detector = Yin(self.input, minfreq=self.minFreq, maxfreq=self.maxFreq, cutoff=3000)
+		elif method == 'zeroCrossing':
+			self.detector = ZCross(self.filtered)
+		else:
+			# the block holds at least two periods of the lowest pitch
+			sr = self.input.getSamplingRate()
+			size = 1 << int(np.ceil(np.log2(2 * sr / self.minFreq)))
+			self.table = DataTable(size=size)
+			self.filler = TableFill(self.filtered, self.table)
+			self.block = np.asarray(self.table.getBuffer())
+			self.allocate(size)
+		self.history.clear()
+		if not playing:
+			self.stopDetector()
+
+	def getMethod(self):
+		""" Method to get the name of the detector """
+		return self.method
+
+	def setRate(self, rate):
+		""" Method to set the time, in seconds, between two estimates """
+		self.rate = rate
+		self.analysis.setTime(rate)
+
+	def allocate(self, size):
+		""" Method to allocate the arrays of the autocorrelation of a block of size samples """
+		n = size // self.decimation
+		self.ordered = np.zeros(size)
+		self.decimated = np.zeros(n)
+		# zero padded to twice the block, so that the circular correlation of the FFT is the linear one
+		self.padded = np.zeros(2 * n)
+		self.spectrum = np.zeros(n + 1, dtype=complex)
+		self.conjugate = np.zeros(n + 1, dtype=complex)
+		self.power = np.zeros(n + 1, dtype=complex)
+		self.correlation = np.zeros(2 * n)
+
+	def estimate(self):
+		""" Method to get the current estimate of the detector: (frequency in Hz, confidence from 0 to 1) """
+		level = self.level.get()
+		if level < self.threshold:
+			return 0.0, 0.0
+		sr = self.input.getSamplingRate()
+		if self.method == 'yin':
+			# Yin holds its last pitch on the frames it finds aperiodic, the level tells if there is a voice to track
+			return self.detector.get(), self.levelConfidence(level)
+		if self.method == 'zeroCrossing':
+			# two crossings per period, the rate is normalised by the buffer size
+			return self.detector.get() * sr / 2, self.levelConfidence(level)
+		return self.autocorrelate(sr)
+
+	def levelConfidence(self, level):
+		""" Method to get the confidence given by the level of the input: 0 at threshold, 1 confidenceRange dB above it """
+		return min(1.0, 20 * math.log10(level / self.threshold) / self.confidenceRange)
+
+	def autocorrelate(self, sr):
+		""" Method to estimate the pitch with the autocorrelation of the last block, decimated """
+		# the oldest samples start at the write position of the filler
+		position = self.filler.getCurrentPos()
+		size = len(self.block)
+		self.ordered[:size - position] = self.block[position:]
+		self.ordered[size - position:] = self.block[:position]
+		n = len(self.decimated)
+		np.mean(self.ordered[:n * self.decimation].reshape(n, self.decimation), axis=1, out=self.decimated)
+		self.decimated -= self.decimated.mean()
+		self.padded[:n] = self.decimated
+		rate = sr / self.decimation
+		if rfft_out:
+			np.fft.rfft(self.padded, out=self.spectrum)
+		else:
+			self.spectrum[:] = np.fft.rfft(self.padded)
+		np.multiply(self.spectrum, np.conj(self.spectrum, out=self.conjugate), out=self.power)
+		# numpy 2 has out for every FFT
+		if rfft_out:
+			np.fft.irfft(self.power, 2 * n, out=self.correlation)
+		else:
+			self.correlation[:] = np.fft.irfft(self.power, 2 * n)
+		correlation = self.correlation[:n]
+		if correlation[0] <= 0:
+			return 0.0, 0.0
+		low = max(1, int(rate / self.maxFreq))
+		high = min(n - 2, int(rate / self.minFreq))
+		lag = low + int(np.argmax(correlation[low:high + 1]))
+		# parabolic interpolation of the peak
+		left, centre, right = correlation[lag - 1:lag + 2]
+		curvature = left - 2 * centre + right
+		offset = 0.5 * (left - right) / curvature if curvature < 0 else 0.0
+		return rate / (lag + offset), max(0.0, centre / correlation[0])
+
+	def analyze(self):
+		""" Method called every rate seconds to update the pitch """
+		if self.level.get() < self.threshold:
+			# the phrase is over, the last pitch is held
+			if self.history:
+				self.history.clear()
+				self.voiced.setValue(0)
+			return
+		freq, confidence = self.estimate()
+		if confidence < self.minConfidence or not self.minFreq <= freq <= self.maxFreq:
+			# the last pitch is held
+			return
+		# the first pitch of a phrase doesn't glide from 0 or from the previous phrase, it would go through every note between
+		self.freq.setTime(self.glide if self.history else 0)
+		self.history.append(freq)
+		self.freq.setValue(float(np.median(self.history)))
+		self.voiced.setValue(1)
+
+	def stopDetector(self):
+		""" Method to stop the objects of the detector """
+		for obj in (self.detector, self.filler):
+			if obj is not None:
+				obj.stop()
+
+	def play(self):
+		""" Method to start the analysis """
+		self.filtered.play()
+		self.level.play()
+		for obj in (self.detector, self.filler):
+			if obj is not None:
+				obj.play()
+		self.freq.play()
+		self.voiced.play()
+		self.analysis.play()
+
+	def stop(self):
+		""" Method to stop the analysis, the pitch is 0 until it starts again """
+		self.analysis.stop()
+		self.stopDetector()
+		self.level.stop()
+		self.filtered.stop()
+		self.freq.stop()
+		self.voiced.stop()
+		self.voiced.setValue(0)
+		self.history.clear()
+
+	def isPlaying(self):
+		""" Method to get if the analysis is running """
+		return self.analysis.isPlaying()
+
+	def getSignal(self):
+		""" Method to get the pitch, in Hz """
+		return self.freq
+
+	def getVoiced(self):
+		""" Method to get the signal telling if the pitch belongs to the phrase being sung (1) or to a phrase that is over (0) """
+		return self.voiced
+
+	def get(self):
+		""" Method to get the current pitch, in Hz """
+		return self.freq.get()
@@ -0,0 +1,289 @@
+from pyo import *
+from Effects import Effect
+from PitchToMidi import MidiSink, PitchToMidi
+
+# number of voices of the pool, created once with the effect
+POLY_VOICES = 8
+
+# oscillators a voice can play, built from its pitch and its envelope
+VOICE_OSCILLATORS = {
+	'sine': lambda freq, envelope: Sine(freq, mul = envelope),
+	'blit': lambda freq, envelope: Blit(freq, harms = 40, mul = envelope),
+	'superSaw': lambda freq, envelope: SuperSaw(freq, detune = 0.5, bal = 0.7, mul = envelope),
+	'phasor': lambda freq, envelope: Phasor(freq, mul = envelope),
+	'rc': lambda freq, envelope: RCOsc(freq, sharp = 0.25, mul = envelope),
+}
+
+# interval: the voices of a note are released when the note stops
+# latch: the voices are held while the singer moves on, until releaseAll is called or they are stolen
+POLY_MODES = ('interval', 'latch')
+
+class PolySynthEFF(Effect):
+	""" Class that implements the Poly Synth effect: the notes sung (see PitchToMidi) are played by a pool of
+		POLY_VOICES oscillator voices, each note starting one voice per interval (e.g. a fifth and an octave above it).
+		Every voice has its own pitch, envelope and oscillators, all created with the effect, so that no pyo object
+		is created while playing. A voice plays only while its note is held or released: at the end of its release
+		it is stopped, so that the cost grows with the number of voices heard, not with the size of the pool.
+		When every voice is busy, the voice released first is stolen, or the oldest one if none is released.
+
+		Attributes:
+			model         reference to the model, its callback calls processBlock
+			converter     note detector feeding the pool
+			size          number of voices
+			freqs         pitch of each voice, in Hz
+			envelopes     envelope of each voice
+			oscillators   oscillators of each voice, keyed by waveform
+			mixes         voices mixed down to a single stream, keyed by waveform
+			output        mix of the current waveform
+			waveform      waveform of the voices, a key of VOICE_OSCILLATORS
+			mode          one of POLY_MODES
+			intervals     intervals, in semitones, of the voices started by a note
+			envelope      attack, decay, sustain and release of the envelopes
+			notes         MIDI note played by each voice, None if the voice is idle
+			sources       note sung that started each voice
+			releaseEnd    time at which the release of each voice ends, None while the voice is held
+			order         value of clock when each voice was started or released, to choose the voice to steal
+			clock         number of voices started or released so far
+			latest        last note sung, its voices follow the pitch bend
+			now           first sample of the last block
+			glide         time, in seconds, taken by a voice to follow the pitch bend
+	"""
+	DISCRETE_PARAMS = ('waveform', 'mode', 'intervals', 'attack', 'decay', 'sustain', 'release')
+
+	def __init__(self, model, size = POLY_VOICES, glide = 0.02):
+		""" Init Methdod """
+		super().__init__()
+		self.model = model
+		self.converter = PitchToMidi(model, self)
+		self.size = size
+		self.glide = glide
+		self.sr = model.server.getSamplingRate()
+
+		self.envelope = {'attack': 0.01, 'decay': 0.1, 'sustain': 0.7, 'release': 0.5}
+		self.freqs = [SigTo(0, time = glide) for i in range(size)]
+		# several voices are summed, each one is quieter than the single oscillator effects
+		self.envelopes = [Adsr(mul = 0.1, **self.envelope) for i in range(size)]
+		self.oscillators = {}
+		self.mixes = {}
+		for waveform, build in VOICE_OSCILLATORS.items():
+			self.oscillators[waveform] = [build(freq, envelope) for freq, envelope in zip(self.freqs, self.envelopes)]
+			self.mixes[waveform] = Mix(self.oscillators[waveform], voices = 1)
+		self.waveform = 'sine'
+		self.output = InputFader(self.mixes[self.waveform])
+
+		self.mode = 'interval'
+		self.intervals = [0, 7, 12]
+		self.notes = [None] * size
+		self.sources = [None] * size
+		self.releaseEnd = [None] * size
+		self.order = [0] * size
+		self.clock = 0
+		self.latest = None
+		self.now = 0
+		for voice in range(size):
+			self.silence(voice)
+
+	def setWaveform(self, waveform):
+		""" Method to set the waveform of the voices, a key of VOICE_OSCILLATORS """
+		if waveform not in VOICE_OSCILLATORS:
+			raise ValueError('unknown waveform %s' % waveform)
+		if waveform == self.waveform:
+			return
+		previous = self.waveform
+		self.waveform = waveform
+		for voice in range(self.size):
+			if self.notes[voice] is not None:
+				self.oscillators[previous][voice].stop()
+				self.oscillators[waveform][voice].play()
+		# the output always follows the waveform, so that enable plays the mix heard. While paused there is nothing to crossfade
+		playing = self.isPlaying()
+		if playing:
+			self.mixes[waveform].play()
+		self.output.setInput(self.mixes[waveform], self.glide if playing else 0)
+
+	def getWaveform(self):
+		""" Method to get the waveform of the voices """
+		return self.waveform
+
+	def setMode(self, mode):
+		""" Method to set the mode, one of POLY_MODES. Leaving the latch mode releases the notes held """
+		if mode not in POLY_MODES:
+			raise ValueError('unknown mode %s' % mode)
+		if self.mode == 'latch' and mode != 'latch':
+			self.releaseAll()
+		self.mode = mode
+
+	def getMode(self):
+		""" Method to get the mode """
+		return self.mode
+
+	def setIntervals(self, intervals):
+		""" Method to set the voices started by a note, intervals are in semitones from the note sung """
+		if not 1 <= len(intervals) <= self.size:
+			raise ValueError('the Poly Synth needs between 1 and %d intervals' % self.size)
+		self.intervals = list(intervals)
+
+	def getIntervals(self):
+		""" Method to get the intervals of the voices started by a note """
+		return self.intervals
+
+	def setEnvelope(self, stage, value):
+		""" Method to set a stage of the envelopes: 'attack', 'decay', 'sustain' or 'release' """
+		self.envelope[stage] = value
+		for envelope in self.envelopes:
+			getattr(envelope, 'set' + stage.capitalize())(value)
+
+	def setAttack(self, attack):
+		""" Method to set the attack time of the voices, in seconds """
+		self.setEnvelope('attack', attack)
+
+	def getAttack(self):
+		""" Method to get the attack time of the voices """
+		return self.envelope['attack']
+
+	def setDecay(self, decay):
+		""" Method to set the decay time of the voices, in seconds """
+		self.setEnvelope('decay', decay)
+
+	def getDecay(self):
+		""" Method to get the decay time of the voices """
+		return self.envelope['decay']
+
+	def setSustain(self, sustain):
+		""" Method to set the sustain level of the voices, from 0 to 1 """
+		self.setEnvelope('sustain', sustain)
+
+	def getSustain(self):
+		""" Method to get the sustain level of the voices """
+		return self.envelope['sustain']
+
+	def setRelease(self, release):
+		""" Method to set the release time of the voices, in seconds """
+		self.setEnvelope('release', release)
+
+	def getRelease(self):
+		""" Method to get the release time of the voices """
+		return self.envelope['release']
+
+	def getSoundingVoices(self):
+		""" Method to get the number of voices playing, held or released """
+		return sum(note is not None for note in self.notes)
+
+	def allocate(self, note):
+		""" Method to choose the voice playing note: the voice already playing it, an idle voice,
+		the voice released first or, if every voice is held, the oldest one. Ties go to the lowest voice """
+		if note in self.notes:
+			return self.notes.index(note)
+		if None in self.notes:
+			return self.notes.index(None)
+		released = [voice for voice in range(self.size) if self.releaseEnd[voice] is not None]
+		return min(released or range(self.size), key = lambda voice: self.order[voice])
+
+	def startVoice(self, voice, source, note):
+		""" Method to start a voice, or to restart it if it is stolen """
+		self.notes[voice] = note
+		self.sources[voice] = source
+		self.releaseEnd[voice] = None
+		self.clock += 1
+		self.order[voice] = self.clock
+		# a new note doesn't glide from the previous note of the voice
+		self.freqs[voice].setTime(0)
+		self.freqs[voice].setValue(midiToHz(note))
+		self.freqs[voice].play()
+		self.oscillators[self.waveform][voice].play()
+		self.envelopes[voice].play()
+
+	def releaseVoice(self, voice, time):
+		""" Method to start the release of a voice, it is stopped at the end of the release """
+		self.releaseEnd[voice] = time + int(self.envelope['release'] * self.sr)
+		self.clock += 1
+		self.order[voice] = self.clock
+		self.envelopes[voice].stop()
+
+	def silence(self, voice):
+		""" Method to stop a voice, its envelope stops itself at the end of its release """
+		self.notes[voice] = None
+		self.sources[voice] = None
+		self.releaseEnd[voice] = None
+		for oscillators in self.oscillators.values():
+			oscillators[voice].stop()
+		self.freqs[voice].stop()
+
+	def releaseAll(self):
+		""" Method to release every voice held, e.g. the notes latched """
+		for voice in range(self.size):
+			if self.notes[voice] is not None and self.releaseEnd[voice] is None:
+				self.releaseVoice(voice, self.now)
+
+	def noteOn(self, time, note, velocity):
+		""" Method called by the note detector when a note starts: a voice is started for every interval """
+		self.latest = note
+		for interval in self.intervals:
+			self.startVoice(self.allocate(note + interval), note, note + interval)
+
+	def noteOff(self, time, note):
+		""" Method called by the note detector when a note stops: its voices are released, unless they are latched """
+		if self.mode == 'latch':
+			return
+		for voice in range(self.size):
+			if self.sources[voice] == note and self.releaseEnd[voice] is None:
+				self.releaseVoice(voice, time)
+
+	def pitchBend(self, time, value):
+		""" Method called by the note detector when the pitch moves within a note: the voices of the note follow it """
+		bend = (value - 8192) / 8192 * self.converter.bendRange
+		for voice in range(self.size):
+			if self.sources[voice] == self.latest and self.releaseEnd[voice] is None:
+				self.freqs[voice].setTime(self.glide)
+				self.freqs[voice].setValue(midiToHz(self.notes[voice] + bend))
+
+	def processBlock(self, start):
+		""" Method called by the callback of the model after every block, it stops the voices whose release is over """
+		self.now = start
+		for voice in range(self.size):
+			if self.releaseEnd[voice] is not None and self.releaseEnd[voice] <= start:
+				self.silence(voice)
+
+	def usesPitch(self):
+		""" Method to get if the effect needs the pitch tracker of the model """
+		return True
+
+	def reset(self):
+		""" Method to reset the parameters of Poly Synth effect """
+		self.setWaveform('sine')
+		self.setMode('interval')
+		self.setIntervals([0, 7, 12])
+		self.setAttack(0.01)
+		self.setDecay(0.1)
+		self.setSustain(0.7)
+		self.setRelease(0.5)
+
+	def enable(self):
+		""" Method to start processing the Poly Synth effect signal. A Poly Synth still playing, e.g. switched back to
+		while it fades out, is left as it is: its voices and its note detector keep running """
+		if self.isPlaying():
+			return
+		self.output.play()
+		self.mixes[self.waveform].play()
+		self.model.addBlockListener(self)
+		self.converter.start()
+
+	def disable(self):
+		""" Method to stop processing the Poly Synth effect signal and every voice """
+		self.converter.stop()
+		self.model.removeBlockListener(self)
+		for voice in range(self.size):
+			if self.notes[voice] is not None:
+				self.envelopes[voice].stop()
+				self.silence(voice)
+		for mix in self.mixes.values():
+			mix.stop()
+		self.output.stop()
+
+	def isPlaying(self):
+		""" Method to get if the Poly Synth effect signal is processing or not """
+		return self.output.isPlaying()
+
+	def getSignal(self):
+		""" Method to get the Poly Synth effect signal """
+		return self.output
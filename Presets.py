@@ -0,0 +1,43 @@
+import json
+import os
+
+class PresetStore():
+	""" Presets saved in a JSON file, keyed by name. A preset is the state returned by Glovox.getPreset.
+		The file is rewritten on every change, through a temporary file, so that it is never left half written.
+
+		Attributes:
+			path      JSON file of the presets
+			presets   presets, keyed by name
+	"""
+	def __init__(self, path):
+		""" Init Method """
+		self.path = path
+		self.presets = {}
+		if os.path.exists(path):
+			with open(path) as presetFile:
+				self.presets = json.load(presetFile)
+
+	def write(self):
+		""" Method to write the presets into the file """
+		temporary = self.path + '.tmp'
+		with open(temporary, 'w') as presetFile:
+			json.dump(self.presets, presetFile, indent=1)
+		os.replace(temporary, self.path)
+
+	def save(self, name, preset):
+		""" Method to save a preset, replacing the one with the same name """
+		self.presets[name] = preset
+		self.write()
+
+	def delete(self, name):
+		""" Method to delete a preset """
+		del self.presets[name]
+		self.write()
+
+	def get(self, name):
+		""" Method to get a preset by name """
+		return self.presets[name]
+
+	def getNames(self):
+		""" Method to get the names of the presets, in the order they have been saved """
+		return list(self.presets)
@@ -0,0 +1,297 @@
+from pyo import *
+from RingBuffer import RingBuffer
+import numpy as np
+import threading
+import wave
+
+soundfile_present = True
+try:
+	import soundfile
+except ImportError:
+	soundfile_present = False
+
+# file formats of the recordings, FLAC needs soundfile
+RECORD_FORMATS = ('wav', 'flac')
+
+class WaveSegment():
+	""" 16 bits WAV file written with the standard library, used when soundfile isn't installed.
+		It has the write and close methods of soundfile.SoundFile.
+
+		Attributes:
+			file       wave writer
+	"""
+	def __init__(self, path, sr, channels):
+		""" Init Method """
+		self.file = wave.open(path, 'wb')
+		self.file.setnchannels(channels)
+		self.file.setsampwidth(2)
+		self.file.setframerate(sr)
+
+	def write(self, frames):
+		""" Method to append frames, one row per frame and one column per channel """
+		self.file.writeframes((np.clip(frames, -1, 1) * 32767).astype('<i2').tobytes())
+
+	def close(self):
+		""" Method to close the file """
+		self.file.close()
+
+class Recorder():
+	""" Records the output of the model (the main effect and the sends heard on top of it) and, optionally,
+		the dry input as a second channel. The callback only copies each block into a ring buffer:
+		a writer thread empties it into the file every period seconds, so that the audio thread never touches the disk.
+		Memory doesn't grow with the length of the recording: the ring buffer holds bufferTime seconds,
+		and the recording is split into segment files of segmentLength seconds (name-001.wav, name-002.wav...).
+		If the disk can't keep up, the samples overwritten before being written are skipped and counted.
+
+		Attributes:
+			model          reference to the model, its callback calls processBlock
+			path           name of the recording, the segment number and the format are appended to it
+			format         one of RECORD_FORMATS
+			channels       1 for the output only, 2 for the output and the dry input
+			segmentFrames  frames per segment file
+			period         time, in seconds, between two runs of the writer thread
+			sendGains      1 for each send output on top of the main effect, 0 otherwise, keyed by send
+			output         signal heard: the mixer of the model and its sends
+			tables         blocks of output and of the dry input
+			writers        TableFill objects filling the tables
+			blocks         numpy views on tables
+			frame          block interleaved for the ring buffer
+			ring           samples not written yet, interleaved
+			chunk          samples read by the writer thread at a time
+			cursor         index, in the ring buffer, of the next sample to write
+			lost           samples skipped because the writer thread was late
+			segment        file being written, None before start
+			segmentCount   number of segment files opened
+			segmentFilled  frames written in the current segment
+			files          paths of the segment files
+			done           set to stop the writer thread
+			thread         writer thread
+	"""
+	def __init__(self, model, path, format='wav', dry=False, segmentLength=1800, bufferTime=2.0, period=0.1):
+		""" Init Method """
+		if format not in RECORD_FORMATS:
+			raise ValueError('unknown format %s' % format)
+		if format == 'flac' and not soundfile_present:
+			raise ValueError('FLAC recordings need the soundfile module')
+		self.model = model
+		self.path = path
+		self.format = format
+		self.channels = 2 if dry else 1
+		sr = model.server.getSamplingRate()
+		size = model.server.getBufferSize()
+		self.segmentFrames = int(segmentLength * sr)
+		self.period = period
+
+		# the sends are built here, paused, so that they are recorded if they are enabled later
+		self.sendGains = {name: Sig(0) for name in ('reverb', 'delay')}
+		sends = [model.getEffect(name).getSendSignal() * gain for name, gain in self.sendGains.items()]
+		# mixer[0] is already the list of the streams of the output
+		self.output = Mix(model.mixer[0] + sends, voices=1)
+		sources = [self.output, model.input] if dry else [self.output]
+		self.tables = [DataTable(size=size) for source in sources]
+		self.writers = [TableFill(source, table) for source, table in zip(sources, self.tables)]
+		self.blocks = [np.asarray(table.getBuffer()) for table in self.tables]
+		self.frame = np.zeros(size * self.channels, dtype=np.float32)
+
+		frames = -(-int(bufferTime * sr) // size) * size
+		self.ring = RingBuffer(frames * self.channels)
+		self.chunk = np.zeros(self.ring.capacity, dtype=np.float32)
+		self.cursor = 0
+		self.lost = 0
+
+		self.segment = None
+		self.segmentCount = 0
+		self.segmentFilled = 0
+		self.files = []
+		self.done = threading.Event()
+		self.thread = None
+		self.pause()
+
+	def pause(self):
+		""" Method to stop the objects feeding the ring buffer """
+		for writer in self.writers:
+			writer.stop()
+		self.output.stop()
+		for gain in self.sendGains.values():
+			gain.stop()
+
+	def start(self):
+		""" Method to start recording into a new segment file """
+		self.ring.reset()
+		self.cursor = 0
+		self.lost = 0
+		self.openSegment()
+		for gain in self.sendGains.values():
+			gain.play()
+		self.output.play()
+		for writer in self.writers:
+			writer.play()
+		self.done.clear()
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+		self.model.addBlockListener(self)
+
+	def stop(self):
+		""" Method to stop recording, the samples not written yet are written before the file is closed """
+		self.model.removeBlockListener(self)
+		self.pause()
+		if self.thread is not None:
+			self.done.set()
+			self.thread.join()
+			self.thread = None
+		if self.segment is not None:
+			self.segment.close()
+			self.segment = None
+
+	def isRecording(self):
+		""" Method to get if the recorder is running """
+		return self.thread is not None
+
+	def getFiles(self):
+		""" Method to get the paths of the segment files written """
+		return list(self.files)
+
+	def getLost(self):
+		""" Method to get the number of frames skipped because the disk was too slow """
+		return self.lost // self.channels
+
+	def processBlock(self, start):
+		""" Method called by the callback of the model after every block, it copies the block into the ring buffer """
+		for name, gain in self.sendGains.items():
+			gain.setValue(1 if self.model.isSendOutput(name) else 0)
+		for channel, block in enumerate(self.blocks):
+			self.frame[channel::self.channels] = block
+		self.ring.write(self.frame)
+
+	def openSegment(self):
+		""" Method to close the current segment file and to open the next one """
+		if self.segment is not None:
+			self.segment.close()
+		self.segmentCount += 1
+		path = '%s-%03d.%s' % (self.path, self.segmentCount, self.format)
+		sr = self.model.server.getSamplingRate()
+		if soundfile_present:
+			self.segment = soundfile.SoundFile(path, 'w', samplerate=sr, channels=self.channels,
+											   format=self.format.upper(), subtype='PCM_24')
+		else:
+			self.segment = WaveSegment(path, sr, self.channels)
+		self.segmentFilled = 0
+		self.files.append(path)
+
+	def run(self):
+		""" Method run by the writer thread, it empties the ring buffer into the segment files """
+		while not self.done.wait(self.period):
+			self.drain()
+		self.drain()
+
+	def drain(self):
+		""" Method to write the samples of the ring buffer that haven't been written yet """
+		while True:
+			first, n = self.ring.readFrom(self.cursor, self.chunk)
+			self.lost += first - self.cursor
+			self.cursor = first + n
+			if n == 0:
+				return
+			frames = self.chunk[:n].reshape(-1, self.channels)
+			while len(frames):
+				if self.segmentFilled == self.segmentFrames:
+					self.openSegment()
+				count = min(len(frames), self.segmentFrames - self.segmentFilled)
+				self.segment.write(frames[:count])
+				self.segmentFilled += count
+				frames = frames[count:]
+
+class Looper():
+	""" Loop of fixed length played on top of the main effect. The first pass records the active effect,
+		the next ones play it back and, while overdubbing, add the active effect to it.
+		The table of the loop is created once: recording and overdubbing only write into it, from the callback,
+		at the position the loop is being played from. The loop is plugged into the mixer of the model,
+		so that the sends and the Recorder get it.
+
+		Attributes:
+			model      reference to the model, its callback calls processBlock
+			length     length of the loop, in samples, a whole number of buffers
+			table      samples of the loop
+			loop       numpy view on table
+			reader     loop playback
+			state      'stopped', 'recording', 'overdubbing' or 'playing'
+			pending    state to enter at the next block, None if there is none
+			position   index, in the loop, of the next block written
+	"""
+	def __init__(self, model, length=8.0, gain=1.0):
+		""" Init Method """
+		self.model = model
+		sr = model.server.getSamplingRate()
+		size = model.server.getBufferSize()
+		self.length = max(1, int(length * sr) // size) * size
+		# half a sample more, so that the size of the table isn't rounded down
+		self.table = NewTable(length=(self.length + 0.5) / sr)
+		self.loop = np.asarray(self.table.getBuffer())[:self.length]
+		self.reader = TableRead(self.table, freq=self.table.getRate(), loop=1, mul=gain)
+		self.reader.stop()
+		self.state = 'stopped'
+		self.pending = None
+		self.position = 0
+		model.mixer.addInput('looper', self.reader)
+		model.mixer.setAmp('looper', 0, 1)
+		model.addBlockListener(self)
+
+	def record(self):
+		""" Method to record a new loop from the next block, the previous one is erased """
+		self.pending = 'recording'
+
+	def overdub(self):
+		""" Method to add the active effect to the loop while it plays """
+		if self.state in ('playing', 'recording'):
+			self.pending = 'overdubbing'
+
+	def play(self):
+		""" Method to play the loop without adding anything to it """
+		if self.state == 'stopped':
+			self.pending = 'restart'
+		elif self.state != 'playing':
+			self.pending = 'playing'
+
+	def stop(self):
+		""" Method to stop the loop, play starts it again from the beginning """
+		self.pending = 'stopped'
+
+	def getState(self):
+		""" Method to get the state of the loop """
+		return self.state
+
+	def processBlock(self, start):
+		""" Method called by the callback of the model after every block, it writes the block of the active effect into the loop """
+		pending = self.pending
+		if pending is not None:
+			self.pending = None
+			if pending == 'stopped':
+				self.reader.stop()
+				self.state = 'stopped'
+				return
+			if pending in ('recording', 'restart'):
+				# the loop starts with the next block, the block written now was computed before it
+				if pending == 'recording':
+					self.loop[:] = 0
+				self.reader.reset()
+				self.reader.play()
+				self.position = 0
+				self.state = 'recording' if pending == 'recording' else 'playing'
+				return
+			self.state = pending
+		if self.state == 'stopped':
+			return
+
+		block = self.model.arr
+		n = len(block)
+		if self.state in ('recording', 'overdubbing'):
+			self.loop[self.position:self.position + n] += block
+		self.position = (self.position + n) % self.length
+		if self.state == 'recording' and self.position == 0:
+			self.state = 'playing'
+
+	def close(self):
+		""" Method to stop the loop and to unplug it from the model """
+		self.model.removeBlockListener(self)
+		self.reader.stop()
+		self.model.mixer.delInput('looper')
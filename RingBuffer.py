@@ -0,0 +1,110 @@
+import time
+import numpy as np
+
+class RingBuffer():
+	""" Fixed size buffer keeping the last samples written into it.
+		The samples are stored twice, one copy after the other, so that the last n samples
+		are always contiguous in memory and can be read as a view, without copying them.
+		There must be only one writer (the audio callback), writing never blocks.
+		Readers running in other threads use snapshot() or readFrom(), a seqlock: the writer bumps a sequence number
+		before and after each write (and reset) and the reader retries its copy until the sequence number is even
+		and unchanged, so it never makes the writer wait. If every retry fails, the reader is told so
+		instead of getting a torn frame.
+
+		Attributes:
+			capacity   number of samples kept
+			data       storage, two copies of the last capacity samples
+			position   index where the next sample will be written
+			written    number of samples written since the creation of the buffer
+			sequence   odd while a write is in progress, incremented twice by every write
+	"""
+	def __init__(self, capacity, dtype=np.float32):
+		""" Init Method """
+		self.capacity = capacity
+		self.data = np.zeros(2 * capacity, dtype=dtype)
+		self.position = 0
+		self.written = 0
+		self.sequence = 0
+
+	def write(self, block):
+		""" Method to append a block of samples, the oldest samples are overwritten """
+		n = len(block)
+		self.sequence += 1
+		p = self.position
+		# every sample counts as written, even the ones overwritten by the end of the block:
+		# the block is written where it ends, so that position stays written modulo capacity
+		self.written += n
+		if n > self.capacity:
+			p = (p + n - self.capacity) % self.capacity
+			block = block[-self.capacity:]
+			n = self.capacity
+
+		first = min(n, self.capacity - p)
+		self.data[p:p + first] = block[:first]
+		self.data[p + self.capacity:p + self.capacity + first] = block[:first]
+		rest = n - first
+		if rest > 0:
+			self.data[:rest] = block[first:]
+			self.data[self.capacity:self.capacity + rest] = block[first:]
+
+		self.position = (p + n) % self.capacity
+		self.sequence += 1
+
+	def getFrames(self, n=None, copy=False):
+		""" Method to get the last n samples, oldest first. By default a view on the buffer is returned """
+		if n is None or n > self.capacity:
+			n = self.capacity
+		end = self.position + self.capacity
+		frames = self.data[end - n:end]
+		if copy:
+			return frames.copy()
+		return frames
+
+	def snapshot(self, n=None, out=None, retries=100):
+		""" Method to copy the last n samples, oldest first, into out (allocated if not given).
+		The copy is retried while the writer is running. It returns out, holding a consistent frame,
+		or None if the writer kept interrupting the copy: out may then be torn, the caller should keep its previous frame """
+		if n is None or n > self.capacity:
+			n = self.capacity
+		if out is None:
+			out = np.empty(n, dtype=self.data.dtype)
+		for i in range(retries):
+			before = self.sequence
+			if before % 2 == 1:
+				# a write is in progress, let the audio thread finish it
+				time.sleep(0)
+				continue
+			end = self.position + self.capacity
+			np.copyto(out[:n], self.data[end - n:end])
+			if self.sequence == before:
+				return out
+		return None
+
+	def readFrom(self, start, out, retries=100):
+		""" Method to copy into out the samples written from the start-th one (counted since the creation of the buffer),
+		for a reader that consumes every sample instead of the last ones, e.g. a disk writer.
+		At most len(out) samples are copied; the ones overwritten before being read are skipped.
+		It returns the index of the first sample copied and the number of samples copied,
+		(start, 0) if the writer kept interrupting the copy: nothing has been read, the caller should try again later """
+		for i in range(retries):
+			before = self.sequence
+			if before % 2 == 1:
+				# a write is in progress, let the audio thread finish it
+				time.sleep(0)
+				continue
+			written = self.written
+			first = max(start, written - self.capacity)
+			n = max(0, min(written - first, len(out)))
+			begin = self.position + self.capacity - (written - first)
+			np.copyto(out[:n], self.data[begin:begin + n])
+			if self.sequence == before:
+				return first, n
+		return start, 0
+
+	def reset(self):
+		""" Method to fill the buffer with zeros """
+		self.sequence += 1
+		self.data[:] = 0
+		self.position = 0
+		self.written = 0
+		self.sequence += 1
@@ -0,0 +1,132 @@
+import inspect
+import threading
+import time
+import numpy as np
+
+# numpy 2 writes the FFT into a preallocated array, older versions allocate a new one at every frame
+rfft_out = 'out' in inspect.signature(np.fft.rfft).parameters
+
+class SpectrumAnalyzer():
+	""" Computes the spectrum of the last samples of the model in a background thread, so that the GUI thread only draws it.
+		Frames overlap: a new frame is analysed every hop samples. Each frame is windowed (Hann) and
+		transformed with a real FFT, magnitudes are expressed in dB, optionally grouped in log-spaced frequency bands,
+		and smoothed with an exponential peak decay. Every array is allocated once (with numpy 2, the FFT too).
+		The spectrum is computed into back, then swapped with front under lock, the readers copy front under lock:
+		a reader never gets a spectrum being computed.
+
+		Attributes:
+			model       reference to the model, frames are read with getFrames
+			size        number of samples of each frame
+			hop         number of new samples between two frames
+			decay       amount (0 to 1) of the previous peak kept at each frame, 0 disables the smoothing
+			freqVect    frequency of each bin of the spectrum
+			bands       first FFT bin of each log-spaced band, None when log binning is disabled
+			frame       last frame read from the model
+			window      Hann window
+			bins        FFT of the last frame
+			magnitude   magnitude of the FFT of the last frame
+			level       magnitude of the last frame, grouped in bands if log binning is enabled
+			peaks       smoothed magnitude
+			front       spectrum ready to be read
+			back        spectrum being computed
+			sequence    number of spectra computed
+			lock        guards the swap of front and back against the readers
+	"""
+	def __init__(self, model, size=4096, overlap=0.5, logBands=None, decay=0.8, minFreq=20.0):
+		""" Init Method """
+		self.model = model
+		self.size = size
+		self.hop = max(1, int(size * (1 - overlap)))
+		self.decay = decay
+		sr = self.model.server.getSamplingRate()
+
+		self.freqVect = np.fft.rfftfreq(size, 1./ sr)
+		self.bands = None
+		if logBands:
+			edges = np.geomspace(minFreq, sr / 2, logBands + 1)[:-1]
+			self.bands = np.unique(np.searchsorted(self.freqVect, edges))
+			self.freqVect = self.freqVect[self.bands]
+
+		self.frame = np.zeros(size, dtype=np.float32)
+		self.window = np.hanning(size).astype(np.float32)
+		self.bins = np.zeros(size // 2 + 1, dtype=np.complex64)
+		self.magnitude = np.zeros(size // 2 + 1, dtype=np.float32)
+		self.level = np.zeros(len(self.freqVect), dtype=np.float32)
+		self.peaks = np.zeros(len(self.freqVect), dtype=np.float32)
+		self.front = np.full(len(self.freqVect), -120, dtype=np.float32)
+		self.back = self.front.copy()
+		self.sequence = 0
+		self.lock = threading.Lock()
+
+		self.running = False
+		self.thread = None
+
+	def start(self):
+		""" Method to start the analysis thread """
+		if self.running:
+			return
+		self.running = True
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+
+	def stop(self):
+		""" Method to stop the analysis thread """
+		self.running = False
+		if self.thread is not None:
+			self.thread.join()
+			self.thread = None
+
+	def run(self):
+		""" Analysis loop, a frame is computed as soon as hop new samples are available """
+		sr = self.model.server.getSamplingRate()
+		lastWritten = -self.hop
+		while self.running:
+			written = self.model.getFrameCount()
+			if written - lastWritten < self.hop:
+				time.sleep(self.hop / sr / 4)
+				continue
+			lastWritten = written
+			self.compute()
+
+	def compute(self):
+		""" Method to compute the spectrum of the last frame and publish it """
+		# the copy has been torn by the callback: the previous spectrum is kept
+		if self.model.getFrames(self.size, self.frame) is None:
+			return
+		np.multiply(self.frame, self.window, out=self.frame)
+		if rfft_out:
+			np.fft.rfft(self.frame, out=self.bins)
+		else:
+			self.bins[:] = np.fft.rfft(self.frame)
+		np.abs(self.bins, out=self.magnitude)
+
+		if self.bands is not None:
+			np.maximum.reduceat(self.magnitude, self.bands, out=self.level)
+		else:
+			self.level[:] = self.magnitude
+
+		# peaks fall down exponentially instead of jumping to the new value
+		self.peaks *= self.decay
+		np.maximum(self.level, self.peaks, out=self.peaks)
+
+		# amplitude in dB, relative to a full scale sine
+		np.maximum(self.peaks, 1e-6, out=self.back)
+		np.log10(self.back, out=self.back)
+		self.back *= 20
+		self.back -= 20 * np.log10(self.size / 4)
+
+		with self.lock:
+			self.front, self.back = self.back, self.front
+			self.sequence += 1
+
+	def getSpectrum(self, out=None):
+		""" Method to copy the last spectrum, in dB, into out (allocated if not given) """
+		if out is None:
+			out = np.empty_like(self.front)
+		with self.lock:
+			np.copyto(out, self.front)
+		return out
+
+	def getFrequencies(self):
+		""" Method to get the frequency of each value of the spectrum """
+		return self.freqVect
@@ -0,0 +1,89 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Glovox import Glovox, MAIN_EFFECTS
+from Effects import CHORDS
+
+# Batch processing: renders every WAV file of a directory through an effect, without the GUI
+
+def renderFile(job):
+	""" Function to render one file, it runs in a worker process with its own offline server """
+	infile, outfile, options = job
+	# a crossfade of one sample: the output is the effect alone from the first sample
+	model = Glovox(mode='offline', infile=infile, outfile=outfile, fadeSamples=1)
+	# the switch resets the effect, so its parameters are set after it. Nothing is computed before render:
+	# with glides of one sample, the first sample already has the values set, as a preset recalled long ago
+	model.switchTo(options.effect)
+
+	if options.effect == 'distortion':
+		model.getDistortion().setDrive(options.drive)
+		model.getDistortion().setSlope(options.slope)
+	elif options.effect == 'chords':
+		model.getChords().setChord(options.chord)
+
+	if options.reverb:
+		reverb = model.getReverb()
+		reverb.setRevTime(options.revtime)
+		reverb.setCutoff(options.cutoff)
+		reverb.setRoomSize(options.room)
+		reverb.setBal(options.revbal)
+		model.enableReverb()
+	if options.delay:
+		delay = model.getDelay()
+		delay.setDelayAmount(options.delaytime)
+		delay.setFeedback(options.feedback)
+		model.enableDelay()
+	model.setSmoothTime(1 / model.server.getSamplingRate())
+
+	start = time.perf_counter()
+	speed = model.render()
+	return infile, time.perf_counter() - start, speed
+
+def parseArguments(argv):
+	""" Function to parse the command line """
+	parser = argparse.ArgumentParser(description='Render every WAV file of a directory through a Glovox effect.')
+	parser.add_argument('indir', help='directory containing the WAV files to render')
+	parser.add_argument('outdir', help='directory where the rendered files are written')
+	parser.add_argument('--effect', default='noEffect', choices=[name for name, label in MAIN_EFFECTS])
+	parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+
+	distortion = parser.add_argument_group('Distortion')
+	distortion.add_argument('--drive', type=float, default=0.75)
+	distortion.add_argument('--slope', type=float, default=0.5)
+
+	chords = parser.add_argument_group('Harmonizer')
+	chords.add_argument('--chord', default='Major', choices=list(CHORDS))
+
+	reverb = parser.add_argument_group('Reverb')
+	reverb.add_argument('--reverb', action='store_true', help='enable the reverb')
+	reverb.add_argument('--revtime', type=float, default=1.0)
+	reverb.add_argument('--cutoff', type=float, default=5000)
+	reverb.add_argument('--room', type=float, default=1.0)
+	reverb.add_argument('--revbal', type=float, default=0.5)
+
+	delay = parser.add_argument_group('Delay')
+	delay.add_argument('--delay', action='store_true', help='enable the delay')
+	delay.add_argument('--delaytime', type=float, default=0.25)
+	delay.add_argument('--feedback', type=float, default=0.0)
+	return parser.parse_args(argv)
+
+def main(argv):
+	""" Function to render the files in parallel and report the throughput of each one """
+	options = parseArguments(argv)
+	os.makedirs(options.outdir, exist_ok=True)
+	infiles = sorted(glob.glob(os.path.join(options.indir, '*.wav')))
+	jobs = [(infile, os.path.join(options.outdir, os.path.basename(infile)), options) for infile in infiles]
+
+	start = time.perf_counter()
+	# pyo allows one server per process: every file gets a fresh worker
+	with ProcessPoolExecutor(max_workers=options.workers, max_tasks_per_child=1) as pool:
+		for infile, elapsed, speed in pool.map(renderFile, jobs):
+			print('%s: %.2f s, %.1fx real time' % (os.path.basename(infile), elapsed, speed))
+	print('%d files rendered in %.2f s' % (len(jobs), time.perf_counter() - start))
+
+if __name__ == '__main__':
+	main(sys.argv[1:])
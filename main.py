@@ -1,9 +1,12 @@
+import os
 import sys
 
 from PyQt5.QtWidgets import QApplication 
 
 from MainWindow import MainWindow
-from Glovox import Glovox
+from Glovox import Glovox, loadConfig
+from Midi import MidiControl
+from PitchToMidi import PitchToMidi, ServerMidiSink
 
 qdark_present = True
 try:
@@ -16,7 +19,17 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
 
 	#The Model
-    model = Glovox() 
+    # server settings (backend, buffer size, sampling rate...) are read from config.json, if present
+    configPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+    config = loadConfig(configPath) if os.path.exists(configPath) else {}
+    model = Glovox(**config)
+
+    # foot controllers and MIDI surfaces drive the model directly, without the GUI
+    midi = MidiControl(model)
+    # with a MIDI output device, the voice is also sent as notes to external synths
+    if config.get('midiOutputDevice') is not None:
+        pitchToMidi = PitchToMidi(model, ServerMidiSink(model))
+        pitchToMidi.start()
 
     if qdark_present: # if this style has been imported, the GUI will use it
         app.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
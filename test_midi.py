@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('pyo')
+pytest.importorskip('numpy')
+
+from Glovox import Glovox, MAIN_EFFECTS
+from Midi import MidiControl
+
+# TESTS OF THE MIDI CONTROL, WITH INJECTED MESSAGES
+
+def test_midi_messages(messages=200):
+	""" Test that Program Change switches effect and Control Change sets a parameter before the next buffer """
+	model = Glovox(audio='manual')
+	midi = MidiControl(model, listen=False)
+	names = [name for name, label in MAIN_EFFECTS]
+	try:
+		for i in range(messages):
+			if i % 2 == 0:
+				program = (i // 2) % len(names)
+				midi.programChange(program)
+			else:
+				midi.controlChange(1, i % 128)
+			# the first message for an effect builds it in the stager thread
+			midi.waitStaged()
+			model.server.process()
+
+			if i % 2 == 0:
+				assert model.getActiveName() == names[program], 'Program Change not applied within one buffer'
+			else:
+				assert abs(model.getDistortion().getDrive() - (i % 128) / 127) < 1e-9, 'Control Change not applied within one buffer'
+	finally:
+		midi.stop()
+		model.close()
+		model.server.shutdown()
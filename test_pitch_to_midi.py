@@ -0,0 +1,36 @@
+import os
+import pytest
+
+pytest.importorskip('pyo')
+pytest.importorskip('numpy')
+
+from Benchmarks import writeMelody
+from Glovox import Glovox
+from PitchToMidi import PitchToMidi, RecordingSink
+
+# TESTS OF THE PITCH TO MIDI CONVERSION, ON A SYNTHETIC MELODY RENDERED OFFLINE
+
+def test_pitch_to_midi(tmp_path, bufferSize=256, sr=44100, tolerance=0.08):
+	""" Test the note events sent for a melody: every note on and note off, in order, each one within tolerance
+	seconds of the voice. The pitch bends are not checked """
+	# A3, then B3 after a rest, then C4 sung legato
+	melody = [(0, 0.2), (220, 0.4), (0, 0.1), (247, 0.4), (262, 0.4), (0, 0.2)]
+	expected = [('noteOn', 0.2, 57), ('noteOff', 0.6, 57), ('noteOn', 0.7, 59),
+				('noteOff', 1.1, 59), ('noteOn', 1.1, 60), ('noteOff', 1.5, 60)]
+	infile = os.path.join(str(tmp_path), 'melody.wav')
+	writeMelody(infile, melody, sr)
+
+	model = Glovox(mode='offline', infile=infile, outfile=os.path.join(str(tmp_path), 'out.wav'), bufferSize=bufferSize)
+	sink = RecordingSink()
+	converter = PitchToMidi(model, sink)
+	converter.start()
+	model.render()
+	converter.stop()
+	model.close()
+	model.server.shutdown()
+
+	rate = model.server.getSamplingRate()
+	events = [(event[0], event[1] / rate, event[2]) for event in sink.events if event[0] != 'pitchBend']
+	assert [(kind, note) for kind, time, note in events] == [(kind, note) for kind, time, note in expected], 'events sent: %s' % events
+	for (kind, time, note), (expectedKind, expectedTime, expectedNote) in zip(events, expected):
+		assert abs(time - expectedTime) < tolerance, '%s %d at %.3f s instead of %.3f s' % (kind, note, time, expectedTime)
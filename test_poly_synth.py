@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip('pyo')
+pytest.importorskip('numpy')
+
+from Glovox import Glovox
+from PolySynth import PolySynthEFF
+
+# TESTS OF THE VOICE POOL OF THE POLY SYNTH
+
+@pytest.fixture
+def poly():
+	""" Poly Synth of 4 voices, one voice per note, on a model with a manual server """
+	model = Glovox(audio='manual')
+	poly = PolySynthEFF(model, size=4)
+	poly.disable()
+	poly.enable()
+	poly.setIntervals([0])
+	yield poly
+	poly.disable()
+	model.close()
+	model.server.shutdown()
+
+def test_voices_stop_after_release(poly):
+	""" Test that every voice is stopped once the release of the notes is over """
+	model = poly.model
+	for note in range(60, 64):
+		poly.noteOn(model.samples, note, 100)
+	for i in range(10):
+		model.server.process()
+	poly.setMode('latch')
+	poly.setMode('interval')
+	for i in range(int(poly.getRelease() * model.server.getSamplingRate() / model.server.getBufferSize()) + 2):
+		model.server.process()
+	assert poly.getSoundingVoices() == 0, 'voices still playing after their release'
+
+def test_oldest_voices_are_stolen(poly):
+	""" Test that 6 notes held on 4 voices steal the two oldest voices, in order """
+	poly.setMode('latch')
+	for note in range(60, 66):
+		poly.noteOn(poly.model.samples, note, 100)
+	assert poly.notes == [64, 65, 62, 63], 'voices stolen: %s' % poly.notes
+
+def test_released_voice_is_stolen_first(poly):
+	""" Test that a released voice is stolen before the older held ones """
+	poly.setMode('interval')
+	for note in range(60, 64):
+		poly.noteOn(poly.model.samples, note, 100)
+	poly.noteOff(poly.model.samples, 61)
+	poly.noteOn(poly.model.samples, 64, 100)
+	assert poly.notes == [60, 64, 62, 63], 'voices stolen after a release: %s' % poly.notes
+
+def test_enable_twice(poly):
+	""" Test that enabling a playing Poly Synth, as switching back to it while it fades out does, registers it once """
+	poly.enable()
+	assert poly.model.blockListeners.count(poly) == 1
+	assert poly.model.blockListeners.count(poly.converter) == 1
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip('pyo')
+pytest.importorskip('numpy')
+
+from Glovox import Glovox
+
+# TESTS OF THE PRESETS
+
+def test_preset_recall(recalls=50):
+	""" Test that a recalled preset is applied as a whole before the next buffer: effect, parameters and sends """
+	model = Glovox(audio='manual')
+	model.switchToDistortion()
+	model.getDistortion().setDrive(0.3)
+	model.enableReverb()
+	model.getReverb().setRevTime(3.0)
+	distortion = model.getPreset()
+	model.switchToChords()
+	model.getChords().setChord('Minor 7th')
+	model.disableReverb()
+	chords = model.getPreset()
+	model.server.process()
+
+	for i in range(recalls):
+		preset = distortion if i % 2 == 0 else chords
+		model.recallPreset(preset)
+		model.server.process()
+
+		assert model.getActiveName() == preset['effect'], 'the preset has not been applied within one buffer'
+		for name, params in preset['params'].items():
+			for param, value in params.items():
+				assert value is None or model.getEffect(name).get(param) == value, '%s %s not recalled' % (name, param)
+		assert model.isReverbEnabled() == preset['sends']['reverb']
+
+	model.close()
+	model.server.shutdown()
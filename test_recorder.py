@@ -0,0 +1,68 @@
+import os
+import wave
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pyo')
+
+from Benchmarks import writeMelody
+from Glovox import Glovox
+from Recorder import Recorder, Looper, soundfile_present
+
+# TESTS OF THE RECORDER AND OF THE LOOPER, ON A SYNTHETIC MELODY RENDERED OFFLINE
+
+def bestLag(signal, reference, maxLag):
+	""" Function to get the lag, from -maxLag to maxLag samples, at which signal matches reference best, and the error there """
+	n = min(len(signal), len(reference)) - 2 * maxLag
+	errors = {lag: float(np.max(np.abs(signal[maxLag + lag:maxLag + lag + n] - reference[maxLag:maxLag + n])))
+			  for lag in range(-maxLag, maxLag + 1)}
+	lag = min(errors, key=errors.get)
+	return lag, errors[lag]
+
+def readSegment(path):
+	""" Function to read a recorded segment as float frames, one column per channel """
+	if soundfile_present:
+		import soundfile
+		return soundfile.read(path, dtype='float32')[0]
+	with wave.open(path) as segment:
+		return (np.frombuffer(segment.readframes(segment.getnframes()), dtype='<i2') / 32767.).reshape(-1, 2)
+
+def test_recorder_and_looper(tmp_path, bufferSize=256, segmentLength=0.5, loopLength=0.5):
+	""" Test that the recording is split into segments without losing samples, that both channels hold
+	the melody (the clean effect is active), and that the first pass of the loop holds the start of the melody """
+	sr = 44100
+	folder = str(tmp_path)
+	melody = [(0, 0.1), (220, 0.4), (0, 0.1), (247, 0.4), (262, 0.4), (0, 0.1)]
+	infile = os.path.join(folder, 'melody.wav')
+	writeMelody(infile, melody, sr)
+	with wave.open(infile) as source:
+		reference = np.frombuffer(source.readframes(source.getnframes()), dtype='<i2') / 32767.
+
+	model = Glovox(mode='offline', infile=infile, outfile=os.path.join(folder, 'out.wav'), bufferSize=bufferSize)
+	# offline rendering runs much faster than real time: the ring buffer holds the whole melody
+	recorder = Recorder(model, os.path.join(folder, 'take'), dry=True, segmentLength=segmentLength,
+						bufferTime=len(reference) / sr + 1)
+	# the loop is muted, so that the output recorded is the melody alone
+	looper = Looper(model, length=loopLength, gain=0)
+	recorder.start()
+	looper.record()
+	model.render()
+	recorder.stop()
+	loop = looper.loop.copy()
+	looper.close()
+	model.close()
+	model.server.shutdown()
+
+	chunks = [readSegment(path) for path in recorder.getFiles()]
+	frames = np.concatenate(chunks)
+	segmentFrames = int(segmentLength * sr)
+	assert recorder.getLost() == 0, '%d frames lost' % recorder.getLost()
+	assert all(len(chunk) == segmentFrames for chunk in chunks[:-1]), 'segments of %s frames' % [len(chunk) for chunk in chunks]
+	assert abs(len(frames) - len(reference)) <= 2 * bufferSize, 'recorded %d frames of %d' % (len(frames), len(reference))
+
+	maxLag = 4 * bufferSize
+	dryLag, dryError = bestLag(frames[:, 1], reference, maxLag)
+	wetLag, wetError = bestLag(frames[:, 0], reference, maxLag)
+	loopLag, loopError = bestLag(loop, reference[:len(loop) + 2 * maxLag], maxLag)
+	assert dryError < 1e-3 and wetError < 1e-3, 'recorded channels differ from the melody by %.4f and %.4f' % (wetError, dryError)
+	assert loopError < 1e-3, 'loop differs from the melody by %.4f' % loopError
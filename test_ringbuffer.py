@@ -0,0 +1,95 @@
+import threading
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from RingBuffer import RingBuffer
+
+# TESTS OF THE RING BUFFER SHARED BY THE CALLBACK AND THE READERS
+
+def test_snapshot_keeps_the_last_samples():
+	""" Test that snapshot copies the last samples, oldest first, across the end of the storage """
+	ring = RingBuffer(8)
+	ring.write(np.arange(6, dtype=np.float32))
+	ring.write(np.arange(6, 11, dtype=np.float32))
+	assert list(ring.snapshot(4)) == [7, 8, 9, 10]
+	assert list(ring.snapshot()) == list(range(3, 11))
+
+def test_read_from_skips_overwritten_samples():
+	""" Test that readFrom returns the samples not read yet, and skips the ones overwritten before being read """
+	ring = RingBuffer(8)
+	out = np.zeros(8, dtype=np.float32)
+	ring.write(np.arange(5, dtype=np.float32))
+	assert ring.readFrom(2, out) == (2, 3)
+	assert list(out[:3]) == [2, 3, 4]
+	ring.write(np.arange(5, 15, dtype=np.float32))
+	assert ring.readFrom(5, out) == (7, 8)
+	assert list(out) == list(range(7, 15))
+
+def test_failed_reads_are_reported():
+	""" Test that a reader that can't get a consistent copy is told so instead of getting a torn frame """
+	ring = RingBuffer(8)
+	ring.write(np.arange(8, dtype=np.float32))
+	# a writer that never finishes its write: the sequence number stays odd
+	ring.sequence = 1
+	out = np.zeros(4, dtype=np.float32)
+	assert ring.snapshot(4, out, retries=3) is None
+	assert ring.readFrom(0, out, retries=3) == (0, 0)
+
+def test_reset_is_seen_by_readers():
+	""" Test that reset changes the sequence number, as a write does """
+	ring = RingBuffer(8)
+	ring.write(np.ones(4, dtype=np.float32))
+	before = ring.sequence
+	ring.reset()
+	assert ring.sequence == before + 2
+	assert ring.written == 0
+
+def test_frames_contention(readers=4, buffers=20000):
+	""" Test that hammering getFrames from several threads while the server computes buffers gives no torn frame
+	and doesn't make the callback miss its deadline. The overruns are counted by the load meter of the model,
+	with the CPU time of the thread computing the buffers """
+	pytest.importorskip('pyo')
+	from pyo import Phasor
+	from Glovox import Glovox
+
+	model = Glovox(audio='manual')
+	# a ramp makes torn frames easy to spot: every frame must be increasing
+	ramp = Phasor(freq=model.server.getSamplingRate() / model.getWaveformSize())
+	model.rec.setInput(ramp, fadetime=0)
+	for i in range(model.getWaveformSize() // model.server.getBufferSize() + 1):
+		model.server.process()
+	model.resetLoadStats()
+
+	done = threading.Event()
+	torn = [0] * readers
+	reads = [0] * readers
+	failed = [0] * readers
+
+	def read(reader):
+		frames = np.zeros(1024, dtype=np.float32)
+		while not done.is_set():
+			if model.getFrames(1024, frames) is None:
+				failed[reader] += 1
+				continue
+			# a single wrap of the ramp is allowed inside a frame
+			if np.count_nonzero(np.diff(frames) < 0) > 1:
+				torn[reader] += 1
+			reads[reader] += 1
+
+	threads = [threading.Thread(target=read, args=(reader,)) for reader in range(readers)]
+	for thread in threads:
+		thread.start()
+	for i in range(buffers):
+		model.server.process()
+	done.set()
+	for thread in threads:
+		thread.join()
+	overruns = model.getOverruns()
+	model.close()
+	model.server.shutdown()
+
+	assert sum(reads) > 0, 'no frame read (%d failed reads)' % sum(failed)
+	assert sum(torn) == 0, '%d torn frames in %d reads' % (sum(torn), sum(reads))
+	# a buffer of the clean effect takes a small fraction of the deadline, spikes (e.g. the garbage collector) are rare
+	assert overruns <= buffers // 1000, '%d overruns in %d buffers' % (overruns, buffers)
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip('pyo')
+pytest.importorskip('numpy')
+
+from Benchmarks import benchSwitchLatency
+from Effects import CHORDS
+from Glovox import Glovox, MAIN_EFFECTS
+
+# TESTS OF THE SWITCHES BETWEEN MAIN EFFECTS
+
+def test_switch_latency():
+	""" Test that every switch is over, the output being the new effect alone, right after the crossfade """
+	fadeSamples, bufferSize = 256, 256
+	results = benchSwitchLatency(switches=30, fadeSamples=fadeSamples, bufferSize=bufferSize)
+	assert len(results['latencies']) == 30
+	# the blocks of the crossfade, one block because the mixer, created before the effects, reads them one block late,
+	# and one block because the probe runs in the callback, before the server computes a block: it sees each block
+	# of the output at the callback following it
+	assert max(results['latencies']) <= -(-fadeSamples // bufferSize) + 2, 'switch latencies: %s' % results['latencies']
+
+def test_switch_leak(switches=10000):
+	""" Test that switching effects and chords doesn't leave pyo objects behind.
+	Every effect is built first, then the number of live pyo objects must not grow """
+	model = Glovox(audio='manual')
+	names = [name for name, label in MAIN_EFFECTS]
+	for name in names:
+		model.switchTo(name)
+		model.server.process()
+	before = model.countPyoObjects()
+
+	chords = list(CHORDS)
+	for i in range(switches):
+		model.switchTo(names[i % len(names)])
+		if i % len(names) == 0:
+			model.setHarmonizerChord(chords[i % len(chords)])
+		model.server.process()
+	after = model.countPyoObjects()
+
+	model.close()
+	model.server.shutdown()
+	assert after <= before, 'pyo objects leaked: %d new objects' % (after - before)